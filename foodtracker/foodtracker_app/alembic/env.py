@@ -1,3 +1,4 @@
+import re
 from logging.config import fileConfig
 
 from alembic import context
@@ -7,10 +8,20 @@ from sqlalchemy import engine_from_config, pool
 from sqlalchemy.engine.url import make_url
 
 from foodtracker_app.models.category import Category  # noqa: F401
+from foodtracker_app.models.email_outbox import EmailOutbox  # noqa: F401
 from foodtracker_app.models.financial_stats import FinancialStat  # noqa: F401
+from foodtracker_app.models.notification_log import (  # noqa: F401
+    NotificationLog,
+    NotificationRun,
+)
 from foodtracker_app.models.pantry import Pantry  # noqa: F401
 from foodtracker_app.models.pantry_user import PantryUser  # noqa: F401
 from foodtracker_app.models.product import Product  # noqa: F401
+from foodtracker_app.models.product_archive import (  # noqa: F401
+    ProductArchive,
+    ProductRollup,
+)
+from foodtracker_app.models.product_tombstone import ProductTombstone  # noqa: F401
 from foodtracker_app.models.user import User  # noqa: F401
 
 config = context.config
@@ -34,6 +45,15 @@ print("Alembic database URL:", url.render_as_string(hide_password=True))
 config.set_main_option("sqlalchemy.url", rendered_url.replace("%", "%%"))
 
 
+# Partycje tabeli products (migracja f7c3b58d2e19) nie mają modeli -
+# autogenerate nie powinien proponować ich usunięcia.
+PRODUCT_PARTITION = re.compile(r"products_p\d+")
+
+
+def include_name(name, type_, parent_names) -> bool:
+    return not (type_ == "table" and PRODUCT_PARTITION.fullmatch(name))
+
+
 def run_migrations_offline() -> None:
     """Run migrations without opening a database connection."""
     url = config.get_main_option("sqlalchemy.url")
@@ -56,7 +76,11 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_name=include_name,
+        )
         with context.begin_transaction():
             context.run_migrations()
 
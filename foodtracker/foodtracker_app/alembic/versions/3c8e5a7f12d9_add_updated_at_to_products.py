@@ -0,0 +1,55 @@
+"""Add updated_at to products
+
+Revision ID: 3c8e5a7f12d9
+Revises: 9b1f3c2d7e41
+Create Date: 2026-10-18 11:40:05.118392
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import foodtracker_app
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3c8e5a7f12d9"
+down_revision: Union[str, None] = "9b1f3c2d7e41"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Kolumna przechowuje czas UTC bez strefy (TZDateTime).
+    op.add_column(
+        "products",
+        sa.Column(
+            "updated_at",
+            foodtracker_app.db.database.TZDateTime(),
+            server_default=sa.text("timezone('utc', now())"),
+            nullable=False,
+        ),
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_products_pantry_id_updated_at",
+            "products",
+            ["pantry_id", "updated_at"],
+            unique=False,
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_products_pantry_id_updated_at",
+            table_name="products",
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
+    op.drop_column("products", "updated_at")
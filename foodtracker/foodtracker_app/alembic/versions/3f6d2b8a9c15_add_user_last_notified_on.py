@@ -0,0 +1,29 @@
+"""Add users.last_notified_on
+
+Revision ID: 3f6d2b8a9c15
+Revises: f7c3b58d2e19
+Create Date: 2026-10-19 23:41:12.604218
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f6d2b8a9c15"
+down_revision: Union[str, None] = "f7c3b58d2e19"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("users", sa.Column("last_notified_on", sa.Date(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("users", "last_notified_on")
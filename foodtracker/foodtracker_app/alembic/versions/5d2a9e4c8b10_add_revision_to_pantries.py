@@ -0,0 +1,33 @@
+"""Add revision to pantries
+
+Revision ID: 5d2a9e4c8b10
+Revises: 3c8e5a7f12d9
+Create Date: 2026-10-18 13:05:41.502117
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5d2a9e4c8b10"
+down_revision: Union[str, None] = "3c8e5a7f12d9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Stała wartość domyślna - w Postgresie bez przepisywania tabeli.
+    op.add_column(
+        "pantries",
+        sa.Column("revision", sa.BigInteger(), server_default="0", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("pantries", "revision")
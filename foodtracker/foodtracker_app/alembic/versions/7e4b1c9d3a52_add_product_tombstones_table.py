@@ -0,0 +1,49 @@
+"""Add product_tombstones table
+
+Revision ID: 7e4b1c9d3a52
+Revises: 5d2a9e4c8b10
+Create Date: 2026-10-18 14:22:10.734905
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import foodtracker_app
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7e4b1c9d3a52"
+down_revision: Union[str, None] = "5d2a9e4c8b10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "product_tombstones",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("pantry_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "deleted_at", foodtracker_app.db.database.TZDateTime(), nullable=False
+        ),
+        sa.ForeignKeyConstraint(["pantry_id"], ["pantries.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_product_tombstones_pantry_id_deleted_at",
+        "product_tombstones",
+        ["pantry_id", "deleted_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_product_tombstones_pantry_id_deleted_at", table_name="product_tombstones"
+    )
+    op.drop_table("product_tombstones")
@@ -0,0 +1,76 @@
+"""Add indexes for hot queries
+
+Revision ID: 9b1f3c2d7e41
+Revises: 4adab9e091e7
+Create Date: 2026-10-18 09:12:37.402113
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9b1f3c2d7e41"
+down_revision: Union[str, None] = "4adab9e091e7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (nazwa, tabela, kolumny, warunek indeksu częściowego)
+# financial_stats(pantry_id) ma już indeks dzięki ograniczeniu UNIQUE.
+INDEXES = [
+    (
+        "ix_products_pantry_id_expiration_date",
+        "products",
+        ["pantry_id", "expiration_date"],
+        None,
+    ),
+    (
+        "ix_products_pantry_id_current_amount",
+        "products",
+        ["pantry_id", "current_amount"],
+        None,
+    ),
+    (
+        "ix_products_active_by_expiration",
+        "products",
+        ["pantry_id", "expiration_date"],
+        "current_amount > 0",
+    ),
+    ("ix_pantry_users_user_id", "pantry_users", ["user_id"], None),
+    ("ix_pantries_owner_id", "pantries", ["owner_id"], None),
+    ("ix_users_verification_token", "users", ["verification_token"], None),
+    ("ix_users_reset_password_token", "users", ["reset_password_token"], None),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY nie może działać wewnątrz transakcji,
+    # dlatego na Postgresie indeksy budujemy w trybie autocommit.
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None,
+                sqlite_where=sa.text(where) if where else None,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _columns, _where in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                if_exists=True,
+                postgresql_concurrently=True,
+            )
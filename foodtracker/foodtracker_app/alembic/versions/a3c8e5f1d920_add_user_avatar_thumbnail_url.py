@@ -0,0 +1,31 @@
+"""Add users.avatar_thumbnail_url
+
+Revision ID: a3c8e5f1d920
+Revises: 7e4b1c9d3a52
+Create Date: 2026-10-19 09:41:27.118402
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a3c8e5f1d920"
+down_revision: Union[str, None] = "7e4b1c9d3a52"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "users", sa.Column("avatar_thumbnail_url", sa.String(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("users", "avatar_thumbnail_url")
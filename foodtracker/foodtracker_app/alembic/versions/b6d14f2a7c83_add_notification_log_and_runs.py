@@ -0,0 +1,62 @@
+"""Add notification_log and notification_runs tables
+
+Revision ID: b6d14f2a7c83
+Revises: a3c8e5f1d920
+Create Date: 2026-10-19 11:05:43.520917
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import foodtracker_app
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b6d14f2a7c83"
+down_revision: Union[str, None] = "a3c8e5f1d920"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "notification_log",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("threshold", sa.Integer(), nullable=False),
+        sa.Column("sent_at", foodtracker_app.db.database.TZDateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["product_id"], ["products.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "user_id",
+            "product_id",
+            "threshold",
+            name="uq_notification_log_user_product_threshold",
+        ),
+    )
+    op.create_table(
+        "notification_runs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("run_key", sa.String(), nullable=False),
+        sa.Column("last_user_id", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column(
+            "started_at", foodtracker_app.db.database.TZDateTime(), nullable=False
+        ),
+        sa.Column(
+            "finished_at", foodtracker_app.db.database.TZDateTime(), nullable=True
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("run_key"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("notification_runs")
+    op.drop_table("notification_log")
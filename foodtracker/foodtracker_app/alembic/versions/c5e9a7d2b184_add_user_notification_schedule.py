@@ -0,0 +1,49 @@
+"""Add users.timezone and users.notification_hour
+
+Revision ID: c5e9a7d2b184
+Revises: b6d14f2a7c83
+Create Date: 2026-10-19 14:22:05.519037
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c5e9a7d2b184"
+down_revision: Union[str, None] = "b6d14f2a7c83"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "users",
+        sa.Column(
+            "timezone", sa.String(), nullable=False, server_default="Europe/Warsaw"
+        ),
+    )
+    # Dotychczasowa wysyłka o 08:00 UTC to 10:00 w Polsce.
+    op.add_column(
+        "users",
+        sa.Column(
+            "notification_hour", sa.Integer(), nullable=False, server_default="10"
+        ),
+    )
+    op.create_index(
+        "ix_users_notification_bucket",
+        "users",
+        ["notification_hour", "timezone"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_users_notification_bucket", table_name="users")
+    op.drop_column("users", "notification_hour")
+    op.drop_column("users", "timezone")
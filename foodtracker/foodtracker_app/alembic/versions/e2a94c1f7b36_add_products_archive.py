@@ -0,0 +1,123 @@
+"""Add products_archive and product_rollups tables
+
+Revision ID: e2a94c1f7b36
+Revises: d81f3b6e0a47
+Create Date: 2026-10-19 18:42:11.503126
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import foodtracker_app
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e2a94c1f7b36"
+down_revision: Union[str, None] = "d81f3b6e0a47"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _amount(name: str) -> sa.Column:
+    return sa.Column(
+        name, sa.Numeric(precision=14, scale=2), nullable=False, server_default="0"
+    )
+
+
+def _count(name: str) -> sa.Column:
+    return sa.Column(name, sa.Integer(), nullable=False, server_default="0")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "products_archive",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("pantry_id", sa.Integer(), nullable=False),
+        sa.Column("category_id", sa.Integer(), nullable=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("external_id", sa.String(), nullable=True),
+        sa.Column("expiration_date", sa.Date(), nullable=False),
+        sa.Column("price", sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column("unit", sa.String(length=10), nullable=False),
+        sa.Column("initial_amount", sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column("wasted_amount", sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column("wasted_value", sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column(
+            "consumed_at", foodtracker_app.db.database.TZDateTime(), nullable=False
+        ),
+        sa.Column(
+            "archived_at", foodtracker_app.db.database.TZDateTime(), nullable=False
+        ),
+        sa.ForeignKeyConstraint(["category_id"], ["categories.id"]),
+        sa.ForeignKeyConstraint(["pantry_id"], ["pantries.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_products_archive_pantry_id_created_at",
+        "products_archive",
+        ["pantry_id", "created_at"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_products_archive_pantry_id_wasted_value",
+        "products_archive",
+        ["pantry_id", "wasted_value"],
+        unique=False,
+    )
+
+    op.create_table(
+        "product_rollups",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("pantry_id", sa.Integer(), nullable=False),
+        sa.Column("category_id", sa.Integer(), nullable=True),
+        sa.Column("unit", sa.String(length=10), nullable=False),
+        _count("products_count"),
+        _amount("initial_amount"),
+        _amount("saved_amount"),
+        _amount("wasted_amount"),
+        _count("mostly_used_count"),
+        _count("mostly_wasted_count"),
+        _amount("spent_value"),
+        _count("cheese_products"),
+        _count("night_actions"),
+        _count("sunday_adds"),
+        _count("weekend_adds"),
+        _count("morning_caffeine_add"),
+        _count("healthy_monday_add"),
+        sa.ForeignKeyConstraint(["category_id"], ["categories.id"]),
+        sa.ForeignKeyConstraint(["pantry_id"], ["pantries.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_product_rollups_pantry_id",
+        "product_rollups",
+        ["pantry_id", "category_id", "unit"],
+        unique=False,
+    )
+
+    op.create_index(
+        "ix_products_consumed_updated_at",
+        "products",
+        ["updated_at"],
+        unique=False,
+        postgresql_where=sa.text("current_amount = 0"),
+        sqlite_where=sa.text("current_amount = 0"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_products_consumed_updated_at", table_name="products")
+    op.drop_index("ix_product_rollups_pantry_id", table_name="product_rollups")
+    op.drop_table("product_rollups")
+    op.drop_index(
+        "ix_products_archive_pantry_id_wasted_value", table_name="products_archive"
+    )
+    op.drop_index(
+        "ix_products_archive_pantry_id_created_at", table_name="products_archive"
+    )
+    op.drop_table("products_archive")
@@ -0,0 +1,139 @@
+"""Optionally hash-partition products by pantry_id
+
+Revision ID: f7c3b58d2e19
+Revises: e2a94c1f7b36
+Create Date: 2026-10-19 20:17:03.118452
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+from foodtracker_app.settings import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f7c3b58d2e19"
+down_revision: Union[str, None] = "e2a94c1f7b36"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Migracja działa tylko na Postgresie i tylko przy PRODUCTS_HASH_PARTITIONS > 0.
+# Przepisuje całą tabelę pod blokadą ACCESS EXCLUSIVE - uruchamiać w oknie
+# serwisowym. Żeby zmienić decyzję później:
+#   alembic downgrade e2a94c1f7b36 && alembic upgrade head
+#
+# Klucz partycjonowania musi wchodzić w skład klucza głównego, więc PK
+# zmienia się na (id, pantry_id); id dalej pochodzi z jednej sekwencji i jest
+# unikalne. Klucz obcy notification_log.product_id -> products.id nie może
+# wskazywać na samo id, dlatego jest usuwany, a osierocone wpisy dziennika
+# sprząta zadanie maintenance.cleanup_expired.
+
+# (nazwa, kolumny, warunek indeksu częściowego) - jak w models/product.py
+PRODUCT_INDEXES = [
+    ("ix_products_id", ["id"], None),
+    ("ix_products_pantry_id_expiration_date", ["pantry_id", "expiration_date"], None),
+    ("ix_products_pantry_id_current_amount", ["pantry_id", "current_amount"], None),
+    ("ix_products_pantry_id_updated_at", ["pantry_id", "updated_at"], None),
+    (
+        "ix_products_active_by_expiration",
+        ["pantry_id", "expiration_date"],
+        "current_amount > 0",
+    ),
+    ("ix_products_consumed_updated_at", ["updated_at"], "current_amount = 0"),
+]
+NOTIFICATION_LOG_FK = "notification_log_product_id_fkey"
+
+
+def _is_partitioned(offline_default: bool) -> bool:
+    # W trybie --sql nie ma połączenia, więc zakładamy stan wyjściowy.
+    if context.is_offline_mode():
+        return offline_default
+    return op.get_bind().scalar(
+        sa.text(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+            "WHERE partrelid = 'products'::regclass)"
+        )
+    )
+
+
+def _rebuild_products(partition_clause: str, partitions: int) -> None:
+    """
+    Tworzy nową tabelę o tych samych kolumnach, domyślnych wartościach
+    i ograniczeniach CHECK, przenosi dane i podmienia ją pod nazwą products.
+    """
+    op.execute("LOCK TABLE products IN ACCESS EXCLUSIVE MODE")
+    op.execute(
+        "CREATE TABLE products_new "
+        "(LIKE products INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        f"{partition_clause}"
+    )
+    for remainder in range(partitions):
+        op.execute(
+            f"CREATE TABLE products_p{remainder} PARTITION OF products_new "
+            f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+        )
+    op.execute("INSERT INTO products_new SELECT * FROM products")
+    # Sekwencja id należy do starej tabeli - bez tego DROP usunąłby ją razem z nią.
+    op.execute("ALTER SEQUENCE products_id_seq OWNED BY products_new.id")
+    op.drop_table("products")
+    op.rename_table("products_new", "products")
+
+
+def _create_keys_and_indexes(primary_key: list[str]) -> None:
+    op.create_primary_key("products_pkey", "products", primary_key)
+    op.create_foreign_key(
+        "products_pantry_id_fkey", "products", "pantries", ["pantry_id"], ["id"]
+    )
+    op.create_foreign_key(
+        "products_category_id_fkey", "products", "categories", ["category_id"], ["id"]
+    )
+    for name, columns, where in PRODUCT_INDEXES:
+        op.create_index(
+            name,
+            "products",
+            columns,
+            unique=False,
+            postgresql_where=sa.text(where) if where else None,
+        )
+    # Autovacuum nie analizuje tabel partycjonowanych (tylko partycje),
+    # więc statystyki rodzica zbieramy ręcznie.
+    op.execute("ANALYZE products")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    partitions = settings.PRODUCTS_HASH_PARTITIONS
+    if op.get_context().dialect.name != "postgresql" or partitions <= 0:
+        return
+    if _is_partitioned(offline_default=False):
+        return
+
+    op.drop_constraint(NOTIFICATION_LOG_FK, "notification_log", type_="foreignkey")
+    _rebuild_products("PARTITION BY HASH (pantry_id)", partitions)
+    _create_keys_and_indexes(["id", "pantry_id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_context().dialect.name != "postgresql":
+        return
+    if not _is_partitioned(offline_default=settings.PRODUCTS_HASH_PARTITIONS > 0):
+        return
+
+    _rebuild_products("", 0)
+    _create_keys_and_indexes(["id"])
+    op.execute(
+        "DELETE FROM notification_log WHERE NOT EXISTS "
+        "(SELECT 1 FROM products WHERE products.id = notification_log.product_id)"
+    )
+    op.create_foreign_key(
+        NOTIFICATION_LOG_FK,
+        "notification_log",
+        "products",
+        ["product_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
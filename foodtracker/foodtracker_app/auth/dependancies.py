@@ -1,9 +1,11 @@
-from fastapi import Depends, HTTPException, status
+from datetime import date
+
+from fastapi import Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordBearer
-from foodtracker_app.auth.utils import decode_token
+from foodtracker_app.auth.principal import resolve_principal
 from foodtracker_app.db.database import get_async_session
+from foodtracker_app.db.routing import get_read_session
 from foodtracker_app.models import User, Pantry, Product, PantryUser
-from jose import JWTError
 from pydantic import BaseModel
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -17,7 +19,9 @@ class TokenData(BaseModel):
 
 
 async def get_current_user(
-    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_session)
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_session),
 ) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -25,13 +29,11 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    try:
-        payload = decode_token(token)
-        email: str = payload.get("sub")
-        if not email:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
+    # Token został już zdekodowany w principal_middleware - bez ponownej weryfikacji.
+    principal = await resolve_principal(request)
+    if principal is None:
+        raise request.state.principal_error or credentials_exception
+    email = principal.email
 
     stmt = (
         select(User)
@@ -77,6 +79,63 @@ async def get_pantry_for_user(
     return pantry
 
 
+async def get_pantry_id_for_user(
+    pantry_id: int, user: User = Depends(get_current_user)
+) -> int:
+    """
+    Lekka wersja get_pantry_for_user - sprawdza tylko członkostwo
+    (już załadowane z użytkownikiem), bez wczytywania produktów.
+    """
+    if pantry_id not in {assoc.pantry_id for assoc in user.pantry_associations}:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Spiżarnia nie znaleziona lub brak dostępu.",
+        )
+    return pantry_id
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+async def pantry_etag(
+    pantry_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_session),
+    user: User = Depends(get_current_user),
+) -> str:
+    """
+    ETag odczytów spiżarni oparty o jej rewizję. Sprawdza dostęp i rewizję
+    jednym zapytaniem po kluczu głównym - przy zgodnym `If-None-Match`
+    zwraca 304, zanim endpoint dotknie tabeli produktów.
+    Data w tagu unieważnia go o północy (np. `days_left`).
+    """
+    revision = await db.scalar(
+        select(Pantry.revision)
+        .join(PantryUser, PantryUser.pantry_id == Pantry.id)
+        .where(Pantry.id == pantry_id, PantryUser.user_id == user.id)
+    )
+    if revision is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Spiżarnia nie znaleziona lub brak dostępu.",
+        )
+
+    etag = f'W/"{pantry_id}-{revision}-{date.today().isoformat()}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+    return etag
+
+
 async def require_pantry_owner(
     pantry: Pantry = Depends(get_pantry_for_user),
     user: User = Depends(get_current_user),
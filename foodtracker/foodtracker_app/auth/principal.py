@@ -0,0 +1,49 @@
+from dataclasses import dataclass
+
+from fastapi import HTTPException, Request
+from fastapi.security.utils import get_authorization_scheme_param
+from foodtracker_app.auth.revocation import token_denylist
+from foodtracker_app.auth.utils import ACCESS_TOKEN_TYPE, decode_token
+
+
+@dataclass(frozen=True)
+class Principal:
+    email: str
+    claims: dict
+
+
+def get_bearer_token(request: Request) -> str | None:
+    scheme, token = get_authorization_scheme_param(request.headers.get("Authorization"))
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return token
+
+
+async def resolve_principal(request: Request) -> Principal | None:
+    """
+    Dekoduje JWT z nagłówka Authorization najwyżej raz na żądanie i sprawdza,
+    czy nie został unieważniony. Przyjmowane są tylko tokeny dostępowe
+    (refresh token ma typ "refresh"). Wynik (lub błąd weryfikacji) trafia do
+    request.state, skąd korzystają z niego klucz limitera i get_current_user.
+    """
+    if hasattr(request.state, "principal"):
+        return request.state.principal
+
+    principal = None
+    error = None
+    token = get_bearer_token(request)
+    if token:
+        try:
+            claims = decode_token(token)
+            if claims.get("typ") != ACCESS_TOKEN_TYPE:
+                raise HTTPException(status_code=401, detail="Invalid token type")
+            if await token_denylist.is_revoked(claims.get("jti")):
+                raise HTTPException(status_code=401, detail="Token has been revoked")
+            if claims.get("sub"):
+                principal = Principal(email=claims["sub"], claims=claims)
+        except HTTPException as e:
+            error = e
+
+    request.state.principal = principal
+    request.state.principal_error = error
+    return principal
@@ -0,0 +1,223 @@
+import logging
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from uuid import uuid4
+
+import redis.asyncio as aioredis
+from fastapi import HTTPException, Response, status
+
+from foodtracker_app.auth.utils import (
+    REFRESH_TOKEN_TYPE,
+    create_refresh_token,
+    decode_token,
+)
+from foodtracker_app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "foodtracker:refresh:family:"
+
+# KEYS[1] - rodzina tokenów; wartość "jti_ważny|jti_poprzedni|czas_rotacji"
+# (starsze rodziny mają w wartości samo jti_ważny).
+# ARGV: jti_przedstawiony, jti_nowy, teraz, okno_łaski_s
+# Zwraca {1, jti_nowy} - rotacja, {2, jti_ważny} - poprzedni token w oknie
+# łaski, {0, ''} - rodzina nie istnieje, {-1, ''} - ponowne użycie (rodzina usunięta)
+ROTATE_SCRIPT = """
+local value = redis.call('GET', KEYS[1])
+if not value then
+    return {0, ''}
+end
+local current, previous, rotated_at = string.match(value, '^([^|]+)|([^|]*)|(.*)$')
+if not current then
+    current, previous, rotated_at = value, '', '0'
+end
+if current == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[2] .. '|' .. ARGV[1] .. '|' .. ARGV[3], 'KEEPTTL')
+    return {1, ARGV[2]}
+end
+if previous == ARGV[1]
+    and tonumber(ARGV[3]) - tonumber(rotated_at) <= tonumber(ARGV[4]) then
+    return {2, current}
+end
+redis.call('DEL', KEYS[1])
+return {-1, ''}
+"""
+
+ROTATED = 1
+GRACE = 2
+UNKNOWN_FAMILY = 0
+REUSED = -1
+
+
+def set_refresh_cookie(response: Response, refresh_token: str) -> None:
+    response.set_cookie(
+        key="refresh_token",
+        value=refresh_token,
+        httponly=True,
+        secure=settings.IS_PRODUCTION,
+        samesite="strict",
+        path="/auth",
+    )
+
+
+class _MemoryFamilies:
+    """Rodziny w pamięci procesu (testy / SKIP_REDIS), ograniczone rozmiarem."""
+
+    def __init__(self, max_keys: int = settings.MEMORY_FALLBACK_MAX_KEYS):
+        self.max_keys = max_keys
+        # rodzina -> (jti ważny, jti poprzedni, czas rotacji, wygasa)
+        self._families: OrderedDict[str, tuple[str, str, float, float]] = OrderedDict()
+
+    def create(self, family: str, jti: str, expires_at: float) -> None:
+        self._families[family] = (jti, "", 0.0, expires_at)
+        while len(self._families) > self.max_keys:
+            self._families.popitem(last=False)
+
+    def rotate(
+        self, family: str, jti: str, new_jti: str, now: float, grace: float
+    ) -> tuple[int, str]:
+        entry = self._families.get(family)
+        if entry is None or entry[3] <= now:
+            self._families.pop(family, None)
+            return UNKNOWN_FAMILY, ""
+        current, previous, rotated_at, expires_at = entry
+        if current == jti:
+            self._families[family] = (new_jti, jti, now, expires_at)
+            return ROTATED, new_jti
+        if previous == jti and now - rotated_at <= grace:
+            return GRACE, current
+        del self._families[family]
+        return REUSED, ""
+
+    def revoke(self, family: str) -> None:
+        self._families.pop(family, None)
+
+
+def _refresh_claims(refresh_token: str) -> dict:
+    """Claims refresh tokenu; token dostępowy lub niepoprawny - 401."""
+    claims = decode_token(refresh_token)
+    if claims.get("typ") != REFRESH_TOKEN_TYPE:
+        raise HTTPException(status_code=401, detail="Invalid token type")
+    return claims
+
+
+class RefreshTokenStore:
+    """
+    Rodziny refresh tokenów. Logowanie zakłada rodzinę, a każde odświeżenie
+    wymienia token na nowy (rotacja) - w rodzinie ważny jest tylko ostatni.
+    Przedstawienie starszego tokenu oznacza wyciek: cała rodzina jest
+    unieważniana. Wyjątkiem jest token poprzedni przez
+    REFRESH_TOKEN_REUSE_GRACE_SECONDS po rotacji - równoległe odświeżenia
+    z tym samym ciasteczkiem dostają wtedy ten sam, już wymieniony token.
+    Stan to jeden klucz w Redisie na rodzinę (TTL = czas życia rodziny),
+    więc odświeżanie nie dotyka bazy danych.
+    """
+
+    def __init__(self, redis_url: str | None):
+        self._redis = aioredis.from_url(redis_url) if redis_url else None
+        self._rotate = (
+            self._redis.register_script(ROTATE_SCRIPT) if self._redis else None
+        )
+        self._memory = _MemoryFamilies()
+
+    @staticmethod
+    def _key(family: str) -> str:
+        return f"{KEY_PREFIX}{family}"
+
+    @staticmethod
+    def _unavailable(e: Exception) -> HTTPException:
+        logger.error(f"Redis niedostępny, odświeżanie tokenów wstrzymane: {e}")
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Usługa chwilowo niedostępna. Spróbuj ponownie.",
+        )
+
+    async def issue(self, email: str, provider: str | None = None) -> str:
+        """Zakłada nową rodzinę (logowanie) i zwraca jej pierwszy token."""
+        family = uuid4().hex
+        jti = str(uuid4())
+        lifetime = timedelta(days=settings.refresh_token_expire_days)
+
+        if self._redis is not None:
+            try:
+                await self._redis.set(
+                    self._key(family), jti, ex=int(lifetime.total_seconds())
+                )
+            except Exception as e:
+                raise self._unavailable(e)
+        else:
+            self._memory.create(family, jti, time.time() + lifetime.total_seconds())
+
+        return create_refresh_token(
+            {"sub": email, "provider": provider, "fam": family, "jti": jti},
+            expires_delta=lifetime,
+        )
+
+    async def rotate(self, refresh_token: str) -> tuple[str, dict]:
+        """
+        Wymienia token na nowy z tej samej rodziny. Nowy token wygasa razem
+        z rodziną - odświeżanie nie wydłuża sesji ponad czas od logowania.
+        """
+        try:
+            claims = _refresh_claims(refresh_token)
+        except HTTPException:
+            raise HTTPException(status_code=401, detail="Refresh token niepoprawny")
+
+        family = claims.get("fam")
+        if not family or not claims.get("sub"):
+            raise HTTPException(status_code=401, detail="Refresh token niepoprawny")
+
+        new_jti = str(uuid4())
+        now = time.time()
+        grace = settings.REFRESH_TOKEN_REUSE_GRACE_SECONDS
+        if self._redis is not None:
+            try:
+                result, jti = await self._rotate(
+                    keys=[self._key(family)],
+                    args=[claims.get("jti"), new_jti, now, grace],
+                )
+            except Exception as e:
+                raise self._unavailable(e)
+            jti = jti.decode() if isinstance(jti, bytes) else jti
+        else:
+            result, jti = self._memory.rotate(
+                family, claims.get("jti"), new_jti, now, grace
+            )
+
+        if result not in (ROTATED, GRACE):
+            if result == REUSED:
+                logger.warning(
+                    f"Ponowne użycie refresh tokenu - unieważniono rodzinę {family}"
+                )
+            raise HTTPException(status_code=401, detail="Refresh token unieważniony")
+
+        new_token = create_refresh_token(
+            {
+                "sub": claims["sub"],
+                "provider": claims.get("provider"),
+                "fam": family,
+                "jti": jti,
+            },
+            expires_delta=timedelta(seconds=max(1, claims["exp"] - now)),
+        )
+        return new_token, claims
+
+    async def revoke(self, refresh_token: str) -> None:
+        """Unieważnia całą rodzinę tokenu (wylogowanie)."""
+        try:
+            family = _refresh_claims(refresh_token).get("fam")
+        except HTTPException:
+            return
+        if not family:
+            return
+
+        self._memory.revoke(family)
+        if self._redis is not None:
+            try:
+                await self._redis.delete(self._key(family))
+            except Exception as e:
+                logger.warning(f"Nie udało się unieważnić rodziny tokenów: {e}")
+
+
+refresh_tokens = RefreshTokenStore(None if settings.SKIP_REDIS else settings.REDIS_URL)
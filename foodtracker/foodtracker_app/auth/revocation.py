@@ -0,0 +1,69 @@
+import logging
+import time
+from collections import OrderedDict
+
+import redis.asyncio as aioredis
+
+from foodtracker_app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "foodtracker:jwt:revoked:"
+
+
+class TokenDenylist:
+    """
+    Unieważnione tokeny (po `jti`). Wpis w Redisie żyje tylko do `exp` tokenu -
+    później token i tak jest odrzucany przy weryfikacji. Sprawdzenie to jedno
+    EXISTS na żądanie. Lokalna kopia w pamięci działa bez Redisa i od razu
+    w procesie, który unieważnił token.
+    """
+
+    def __init__(self, redis_url: str | None):
+        self._redis = aioredis.from_url(redis_url) if redis_url else None
+        self._memory: OrderedDict[str, float] = OrderedDict()
+
+    def _remember(self, jti: str, expires_at: float) -> None:
+        self._memory[jti] = expires_at
+        while len(self._memory) > settings.MEMORY_FALLBACK_MAX_KEYS:
+            self._memory.popitem(last=False)
+
+    def _memory_revoked(self, jti: str) -> bool:
+        expires_at = self._memory.get(jti)
+        if expires_at is None:
+            return False
+        if expires_at <= time.time():
+            del self._memory[jti]
+            return False
+        return True
+
+    async def revoke(self, claims: dict) -> None:
+        jti = claims.get("jti")
+        expires_at = claims.get("exp")
+        if not jti or expires_at is None:
+            return
+        ttl = int(float(expires_at) - time.time()) + 1
+        if ttl <= 0:
+            return
+
+        self._remember(jti, float(expires_at))
+        if self._redis is not None:
+            try:
+                await self._redis.set(f"{KEY_PREFIX}{jti}", "1", ex=ttl)
+            except Exception as e:
+                logger.warning(f"Nie udało się zapisać unieważnienia tokenu: {e}")
+
+    async def is_revoked(self, jti: str | None) -> bool:
+        if not jti:
+            return False
+        if self._memory_revoked(jti):
+            return True
+        if self._redis is not None:
+            try:
+                return bool(await self._redis.exists(f"{KEY_PREFIX}{jti}"))
+            except Exception as e:
+                logger.warning(f"Redis niedostępny, lista unieważnień lokalna: {e}")
+        return False
+
+
+token_denylist = TokenDenylist(None if settings.SKIP_REDIS else settings.REDIS_URL)
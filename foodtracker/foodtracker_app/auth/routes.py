@@ -4,12 +4,16 @@ from decimal import Decimal
 from typing import List
 from zoneinfo import ZoneInfo
 
-import magic
 from fastapi import APIRouter, Body, Cookie, Depends, File, HTTPException
 from fastapi import Query, Request, Response, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
-from foodtracker_app.auth.dependancies import get_current_user, get_pantry_for_user
-from foodtracker_app.schemas.pantry import PantryCreate
+from foodtracker_app.auth.dependancies import (
+    get_current_user,
+    get_pantry_for_user,
+    get_pantry_id_for_user,
+    pantry_etag,
+)
 from foodtracker_app.auth.schemas import (
     Achievement,
     ChangePasswordRequest,
@@ -17,6 +21,7 @@ from foodtracker_app.auth.schemas import (
     ProductActionRequest,
     ProductActionUndoRequest,
     ProductActionResponse,
+    ProductChanges,
     ProductCreate,
     ProductExpiringSoon,
     ProductOut,
@@ -27,29 +32,51 @@ from foodtracker_app.auth.schemas import (
     UserSettingsUpdate,
     ProductUpdate,
 )
+from foodtracker_app.auth.refresh_tokens import refresh_tokens, set_refresh_cookie
+from foodtracker_app.auth.revocation import token_denylist
 from foodtracker_app.auth.utils import (
     create_access_token,
-    create_refresh_token,
-    decode_token,
-    hash_password,
+    hash_password_async,
     send_reset_password_email,
     trigger_verification_email,
-    verify_password,
+    verify_and_update_password,
+    verify_password_async,
+)
+from foodtracker_app.core.login_throttle import login_throttle
+from foodtracker_app.core.security import (
+    count_registration,
+    get_client_ip,
+    limit_registration,
 )
 from foodtracker_app.db.database import get_async_session
-from foodtracker_app.models import User, Product, Pantry, FinancialStat
+from foodtracker_app.db.routing import get_read_session
+from foodtracker_app.models import (
+    User,
+    PantryUser,
+    Product,
+    Pantry,
+    FinancialStat,
+    ProductArchive,
+    ProductRollup,
+    ProductTombstone,
+)
 from foodtracker_app.services import (
     achievement_service,
+    avatar_service,
+    pantry_events,
     pantry_service,
     product_service,
+    registration_service,
     statistics_service,
 )
-from foodtracker_app.services.cloudinary_service import upload_image
+from foodtracker_app.services.avatar_storage import AvatarStorage, get_avatar_storage
+from foodtracker_app.services.avatar_tasks import process_avatar_task
 from foodtracker_app.schemas.statistics import CategoryWasteStat, MostWastedProductStat
 from foodtracker_app.settings import settings
+from foodtracker_app.utils.fast_json import fast_response
 from foodtracker_app.utils.recaptcha import verify_recaptcha
 from rate_limiter import limiter
-from sqlalchemy import Date, case, cast, func, and_
+from sqlalchemy import Date, case, cast, func, and_, union_all
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
@@ -59,36 +86,35 @@ auth_router = APIRouter()
 product_router = APIRouter()
 
 
-@auth_router.post("/me/avatar", tags=["Auth"])
+@auth_router.post("/me/avatar", status_code=status.HTTP_202_ACCEPTED, tags=["Auth"])
 async def upload_avatar(
     file: UploadFile = File(...),
     user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_async_session),
+    storage: AvatarStorage = Depends(get_avatar_storage),
 ):
-    MAX_FILE_SIZE = 5 * 1024 * 1024
-    file_content = await file.read()
-    if len(file_content) > MAX_FILE_SIZE:
-        raise HTTPException(413, "Plik jest za duży. Maksymalny rozmiar to 5MB.")
-
-    mime_type = magic.from_buffer(file_content, mime=True)
-    if mime_type not in {"image/png", "image/jpeg"}:
-        raise HTTPException(400, "Niepoprawny typ MIME. Dozwolone: PNG, JPG.")
-
-    public_id = f"user_{user.id}"
-
-    avatar_url = upload_image(file_content, public_id)
-
-    if not avatar_url:
-        raise HTTPException(status_code=500, detail="Nie udało się wgrać obrazka.")
-
-    user.avatar_url = avatar_url
-    await db.commit()
+    version = avatar_service.new_avatar_version()
+    staged_key = await avatar_service.stage_upload(file, storage, user.id, version)
+    # Publikacja w brokerze to synchroniczne I/O - poza pętlą zdarzeń.
+    await run_in_threadpool(process_avatar_task.delay, user.id, staged_key, version)
 
-    return {"avatar_url": user.avatar_url}
+    # Docelowy adres tej wersji awatara - worker zapisze w profilu dokładnie
+    # ten URL, więc klient czeka, aż /auth/me go zwróci.
+    return {
+        "avatar_url": storage.versioned_url(
+            avatar_service.avatar_key(user.id),
+            avatar_service.AVATAR_CONTENT_TYPE,
+            version,
+        ),
+        "status": "processing",
+    }
 
 
 @limiter.limit("5/day")
-@auth_router.post("/register", status_code=status.HTTP_201_CREATED)
+@auth_router.post(
+    "/register",
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limit_registration)],
+)
 async def register(
     request: Request, payload: dict, db: AsyncSession = Depends(get_async_session)
 ):
@@ -107,19 +133,10 @@ async def register(
     if result.scalar_one_or_none():
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    new_user = User(
-        email=email, hashed_password=hash_password(password), social_provider="password"
-    )
-    db.add(new_user)
-    await db.commit()
-    await db.refresh(new_user)
-
-    default_pantry_data = PantryCreate(name="Moja Spiżarnia")
-    await pantry_service.create_pantry(
-        db=db, user=new_user, pantry_data=default_pantry_data
+    await registration_service.register_user(
+        db, email, await hash_password_async(password)
     )
-
-    await trigger_verification_email(new_user, db)
+    await count_registration(request)
     return {"message": "User created successfully. Sprawdź email, by aktywować konto."}
 
 
@@ -136,8 +153,8 @@ async def verify_account(token: str, db: AsyncSession = Depends(get_async_sessio
             return {"status": "used"}
 
         user.is_verified = True
+        # Wygaśnięcie zostaje - po nim zadanie sprzątające usunie zużyty token.
         user.verification_token = f"used:{token}"
-        user.token_expires_at = None
         await db.commit()
         return {"status": "success"}
 
@@ -177,16 +194,28 @@ async def resend_verification_email(
 
 @auth_router.post("/login", tags=["Auth"])
 async def login(
-    user_credentials: UserCreate, db: AsyncSession = Depends(get_async_session)
+    request: Request,
+    user_credentials: UserCreate,
+    db: AsyncSession = Depends(get_async_session),
 ):
+    client_ip = get_client_ip(request)
+    await login_throttle.check(user_credentials.email, client_ip)
+
     result = await db.execute(select(User).where(User.email == user_credentials.email))
     db_user = result.scalar_one_or_none()
 
-    if not db_user or not verify_password(
-        user_credentials.password, db_user.hashed_password
-    ):
+    is_valid, new_hash = await verify_and_update_password(
+        user_credentials.password, db_user.hashed_password if db_user else None
+    )
+    if not is_valid:
+        await login_throttle.register_failure(user_credentials.email, client_ip)
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
+    await login_throttle.register_success(user_credentials.email)
+    if new_hash:
+        db_user.hashed_password = new_hash
+        await db.commit()
+
     if not db_user.is_verified:
         raise HTTPException(
             status_code=403, detail="Zweryfikuj email przed zalogowaniem"
@@ -199,27 +228,26 @@ async def login(
     access_token = create_access_token(
         {"sub": db_user.email, "provider": user_provider_value}
     )
-    refresh_token = create_refresh_token(
-        {"sub": db_user.email, "provider": user_provider_value}
-    )
+    refresh_token = await refresh_tokens.issue(db_user.email, user_provider_value)
 
     response = JSONResponse(
         content={"access_token": access_token, "token_type": "bearer"}
     )
-    response.set_cookie(
-        key="refresh_token",
-        value=refresh_token,
-        httponly=True,
-        secure=settings.IS_PRODUCTION,
-        samesite="strict",
-        path="/auth",
-    )
+    set_refresh_cookie(response, refresh_token)
     return response
 
 
 @auth_router.post("/logout", tags=["Auth"])
-async def logout(response: Response, user: User = Depends(get_current_user)):
-    response.delete_cookie("refresh_token", path="/", domain=None)
+async def logout(
+    request: Request,
+    response: Response,
+    refresh_token: str = Cookie(None),
+    user: User = Depends(get_current_user),
+):
+    await token_denylist.revoke(request.state.principal.claims)
+    if refresh_token:
+        await refresh_tokens.revoke(refresh_token)
+    response.delete_cookie("refresh_token", path="/auth", domain=None)
     return {"message": f"User {user.email} logged_out"}
 
 
@@ -232,6 +260,8 @@ async def get_me(user: User = Depends(get_current_user)):
         "avatar_url": user.avatar_url,
         "provider": user.social_provider if user.social_provider else "password",
         "send_expiration_notifications": user.send_expiration_notifications,  # <<< DODAJ TĘ LINIĘ
+        "timezone": user.timezone,
+        "notification_hour": user.notification_hour,
     }
 
 
@@ -245,6 +275,10 @@ async def update_user_settings(
     Aktualizuje ustawienia powiadomień dla zalogowanego użytkownika.
     """
     user.send_expiration_notifications = settings_data.send_expiration_notifications
+    if settings_data.timezone is not None:
+        user.timezone = settings_data.timezone
+    if settings_data.notification_hour is not None:
+        user.notification_hour = settings_data.notification_hour
     await db.commit()
     await db.refresh(user)
 
@@ -255,6 +289,8 @@ async def update_user_settings(
         "avatar_url": user.avatar_url,
         "provider": user.social_provider if user.social_provider else "password",
         "send_expiration_notifications": user.send_expiration_notifications,
+        "timezone": user.timezone,
+        "notification_hour": user.notification_hour,
     }
 
 
@@ -318,6 +354,9 @@ async def create_product(
     new_product = await product_service.create_product(
         db=db, pantry_id=pantry.id, product_data=product_data
     )
+    await pantry_events.publish_product_event(
+        pantry.id, pantry_events.PRODUCT_CREATED, new_product
+    )
     return new_product
 
 
@@ -344,6 +383,7 @@ async def _handle_product_action(
     if action_type == "waste":
         product.wasted_amount += amount
 
+    await pantry_service.bump_revision(db, product.pantry_id)
     await db.commit()
     await db.refresh(product)
     await db.refresh(financial_stat)
@@ -367,8 +407,8 @@ async def use_product(
     db: AsyncSession = Depends(get_async_session),
     user: User = Depends(get_current_user),
 ):
-    product_to_use = await db.get(Product, product_id)
-    if not product_to_use or product_to_use.pantry_id != pantry.id:
+    product_to_use = await product_service.get_pantry_product(db, pantry.id, product_id)
+    if not product_to_use:
         raise HTTPException(
             status_code=404, detail="Produkt nie znaleziony w tej spiżarni"
         )
@@ -386,9 +426,13 @@ async def use_product(
         db.add(financial_stat)
         await db.commit()
         await db.refresh(financial_stat)
-    return await _handle_product_action(
+    result = await _handle_product_action(
         "use", product_to_use, financial_stat, amount_to_use, user, db
     )
+    await pantry_events.publish_product_event(
+        pantry.id, pantry_events.PRODUCT_USED, result["product"]
+    )
+    return result
 
 
 @product_router.post("/waste/{product_id}", response_model=ProductActionResponse)
@@ -399,8 +443,10 @@ async def waste_product(
     db: AsyncSession = Depends(get_async_session),
     user: User = Depends(get_current_user),
 ):
-    product_to_waste = await db.get(Product, product_id)
-    if not product_to_waste or product_to_waste.pantry_id != pantry.id:
+    product_to_waste = await product_service.get_pantry_product(
+        db, pantry.id, product_id
+    )
+    if not product_to_waste:
         raise HTTPException(
             status_code=404, detail="Produkt nie znaleziony w tej spiżarni"
         )
@@ -425,9 +471,13 @@ async def waste_product(
             status_code=500, detail="Brak danych finansowych dla tej spiżarni"
         )
 
-    return await _handle_product_action(
+    result = await _handle_product_action(
         "waste", product_to_waste, financial_stat, amount_to_waste, user, db
     )
+    await pantry_events.publish_product_event(
+        pantry.id, pantry_events.PRODUCT_WASTED, result["product"]
+    )
+    return result
 
 
 @product_router.post("/undo-action/{product_id}", response_model=ProductOut)
@@ -437,8 +487,8 @@ async def undo_product_action(
     pantry: Pantry = Depends(get_pantry_for_user),
     db: AsyncSession = Depends(get_async_session),
 ):
-    product = await db.get(Product, product_id)
-    if not product or product.pantry_id != pantry.id:
+    product = await product_service.get_pantry_product(db, pantry.id, product_id)
+    if not product:
         raise HTTPException(
             status_code=404, detail="Produkt nie znaleziony w tej spiżarni"
         )
@@ -470,15 +520,22 @@ async def undo_product_action(
     if undo_request.action_type == "waste":
         product.wasted_amount = max(Decimal("0"), product.wasted_amount - amount)
 
+    await pantry_service.bump_revision(db, pantry.id)
     await db.commit()
     await db.refresh(product)
+    await pantry_events.publish_product_event(
+        pantry.id, pantry_events.PRODUCT_UPDATED, product
+    )
     return product
 
 
-@product_router.get("/get", response_model=List[ProductOut])
+@product_router.get(
+    "/get", response_model=List[ProductOut], dependencies=[Depends(pantry_etag)]
+)
 async def get_products(
+    response: Response,
     pantry: Pantry = Depends(get_pantry_for_user),
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_read_session),
 ):
     """
     Zwraca listę wszystkich produktów dla autoryzowanej spiżarni.
@@ -492,7 +549,22 @@ async def get_products(
     )
     result = await db.execute(stmt)
     products = result.scalars().all()
-    return products
+    return fast_response(List[ProductOut], products, response)
+
+
+@product_router.get("/changes", response_model=ProductChanges)
+async def get_product_changes(
+    cursor: str | None = Query(None),
+    limit: int = Query(500, ge=1, le=1000),
+    pantry_id: int = Depends(get_pantry_id_for_user),
+    db: AsyncSession = Depends(get_read_session),
+):
+    """
+    Synchronizacja przyrostowa listy produktów. Bez `cursor` zwraca pełny
+    stan; kolejne wywołania z `cursor` z poprzedniej odpowiedzi zwracają
+    tylko dodane/zmienione produkty i id usuniętych.
+    """
+    return await product_service.get_product_changes(db, pantry_id, cursor, limit)
 
 
 @product_router.delete("/delete/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -501,14 +573,19 @@ async def delete_product(
     pantry: Pantry = Depends(get_pantry_for_user),
     db: AsyncSession = Depends(get_async_session),
 ):
-    product = await db.get(Product, product_id)
-    if not product or product.pantry_id != pantry.id:
+    product = await product_service.get_pantry_product(db, pantry.id, product_id)
+    if not product:
         raise HTTPException(
             status_code=404, detail="Produkt nie znaleziony w tej spiżarni"
         )
 
     await db.delete(product)
+    db.add(ProductTombstone(product_id=product_id, pantry_id=pantry.id))
+    await pantry_service.bump_revision(db, pantry.id)
     await db.commit()
+    await pantry_events.publish_product_event(
+        pantry.id, pantry_events.PRODUCT_DELETED, product_id=product_id
+    )
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
@@ -519,8 +596,8 @@ async def update_product(
     pantry: Pantry = Depends(get_pantry_for_user),
     db: AsyncSession = Depends(get_async_session),
 ):
-    product = await db.get(Product, product_id)
-    if not product or product.pantry_id != pantry.id:
+    product = await product_service.get_pantry_product(db, pantry.id, product_id)
+    if not product:
         raise HTTPException(
             status_code=404, detail="Produkt nie znaleziony w tej spiżarni"
         )
@@ -556,13 +633,21 @@ async def update_product(
         if hasattr(product, key):
             setattr(product, key, value)
 
+    await pantry_service.bump_revision(db, pantry.id)
     await db.commit()
     await db.refresh(product)
+    await pantry_events.publish_product_event(
+        pantry.id, pantry_events.PRODUCT_UPDATED, product
+    )
 
     return product
 
 
-@product_router.get("/get/{product_id}", response_model=ProductOut)
+@product_router.get(
+    "/get/{product_id}",
+    response_model=ProductOut,
+    dependencies=[Depends(pantry_etag)],
+)
 async def get_product_by_id(
     product_id: int, pantry: Pantry = Depends(get_pantry_for_user)
 ):
@@ -580,11 +665,15 @@ async def get_product_by_id(
 
 
 @product_router.get(
-    "/expiring-soon", response_model=List[ProductExpiringSoon], tags=["Products"]
+    "/expiring-soon",
+    response_model=List[ProductExpiringSoon],
+    tags=["Products"],
+    dependencies=[Depends(pantry_etag)],
 )
 async def get_expiring_products(
+    response: Response,
     days: int = Query(7, gt=0),
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_read_session),
     pantry: Pantry = Depends(get_pantry_for_user),
 ):
     today = date.today()
@@ -614,13 +703,17 @@ async def get_expiring_products(
         )
         for p in products_from_db
     ]
-    return products_to_return
+    return fast_response(List[ProductExpiringSoon], products_to_return, response)
 
 
-@product_router.get("/stats/financial", response_model=FinancialStatsOut)
+@product_router.get(
+    "/stats/financial",
+    response_model=FinancialStatsOut,
+    dependencies=[Depends(pantry_etag)],
+)
 async def get_financial_stats(
     pantry: Pantry = Depends(get_pantry_for_user),
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_read_session),
 ):
     stats = await db.scalar(
         select(FinancialStat).where(FinancialStat.pantry_id == pantry.id)
@@ -634,9 +727,14 @@ async def get_financial_stats(
     )
 
 
-@product_router.get("/stats", response_model=ProductStats, tags=["Products"])
+@product_router.get(
+    "/stats",
+    response_model=ProductStats,
+    tags=["Products"],
+    dependencies=[Depends(pantry_etag)],
+)
 async def get_product_stats(
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_read_session),
     pantry: Pantry = Depends(get_pantry_for_user),
 ):
     query = select(
@@ -679,26 +777,34 @@ async def get_product_stats(
             )
         ).label("wasted"),
     ).where(Product.pantry_id == pantry.id)
+    archived_query = select(*statistics_service.rollup_product_stats()).where(
+        ProductRollup.pantry_id == pantry.id
+    )
 
-    res = await db.execute(query)
-    row = res.one_or_none()
+    row = (await db.execute(query)).one_or_none()
+    archived = (await db.execute(archived_query)).one()
 
-    if not row or row.total is None:
+    if (not row or row.total is None) and archived.total is None:
         return ProductStats(total=0, used=0, wasted=0, active=0)
 
-    total = int(row.total)
-    used = int(row.used or 0)
-    wasted = int(row.wasted or 0)
+    total = int((row.total or 0) + (archived.total or 0))
+    used = int((row.used or 0) + (archived.used or 0))
+    wasted = int((row.wasted or 0) + (archived.wasted or 0))
 
     active = total - used - wasted
 
     return ProductStats(total=total, used=used, wasted=wasted, active=active)
 
 
-@product_router.get("/stats/trends", response_model=List[TrendData], tags=["Products"])
+@product_router.get(
+    "/stats/trends",
+    response_model=List[TrendData],
+    tags=["Products"],
+    dependencies=[Depends(pantry_etag)],
+)
 async def get_product_trends(
     range_days: int = Query(30, gt=0),
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_read_session),
     pantry: Pantry = Depends(get_pantry_for_user),
 ):
     """
@@ -709,7 +815,22 @@ async def get_product_trends(
     end_date = datetime.now(warsaw_tz).date()
     start_date = end_date - timedelta(days=range_days - 1)
 
-    local_created_at = func.timezone("Europe/Warsaw", Product.created_at)
+    rows = select(Product.created_at, Product.unit, Product.initial_amount).where(
+        Product.pantry_id == pantry.id
+    )
+    # Produkty zużyte dawniej niż próg archiwizacji leżą już w archiwum.
+    if range_days > settings.PRODUCT_ARCHIVE_AFTER_DAYS:
+        rows = union_all(
+            rows,
+            select(
+                ProductArchive.created_at,
+                ProductArchive.unit,
+                ProductArchive.initial_amount,
+            ).where(ProductArchive.pantry_id == pantry.id),
+        )
+    rows = rows.subquery()
+
+    local_created_at = func.timezone("Europe/Warsaw", rows.c.created_at)
 
     query = (
         select(
@@ -717,14 +838,13 @@ async def get_product_trends(
             coalesce(
                 func.sum(
                     case(
-                        (Product.unit == "szt.", Product.initial_amount),
+                        (rows.c.unit == "szt.", rows.c.initial_amount),
                         else_=1,
                     )
                 ),
                 0,
             ).label("total_items"),
         )
-        .where(Product.pantry_id == pantry.id)
         .where(cast(local_created_at, Date) >= start_date)
         .group_by(cast(local_created_at, Date))
         .order_by(cast(local_created_at, Date))
@@ -755,10 +875,11 @@ async def get_product_trends(
     response_model=List[CategoryWasteStat],
     summary="Pobierz statystyki zużycia i marnotrawstwa wg. kategorii",
     tags=["Products", "Statistics"],
+    dependencies=[Depends(pantry_etag)],
 )
 async def get_category_waste_statistics(
     pantry_id: int,
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_read_session),
     user: User = Depends(get_current_user),
 ):
     """
@@ -784,10 +905,11 @@ async def get_category_waste_statistics(
     response_model=List[MostWastedProductStat],
     summary="Pobierz produkty o największej wartości, które zostały wyrzucone",
     tags=["Products", "Statistics"],
+    dependencies=[Depends(pantry_etag)],
 )
 async def get_most_wasted_products_stats(
     pantry_id: int,
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_read_session),
     user: User = Depends(get_current_user),
 ):
     """
@@ -812,7 +934,7 @@ async def get_most_wasted_products_stats(
     "/achievements", response_model=List[Achievement], tags=["Products"]
 )
 async def get_achievements(
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_read_session),
     user: User = Depends(get_current_user),
 ):
     return await achievement_service.get_user_achievements(db, user)
@@ -841,8 +963,8 @@ async def request_password_reset(
     token = str(uuid.uuid4())
     user.reset_password_token = token
     user.reset_password_expires_at = datetime.now(timezone.utc) + timedelta(minutes=15)
+    await send_reset_password_email(db, user.email, token)
     await db.commit()
-    await send_reset_password_email(user.email, token)
     return {"message": "Jeśli konto istnieje, sprawdź email ze linkiem resetu."}
 
 
@@ -865,7 +987,7 @@ async def reset_password(
     ):
         raise HTTPException(status_code=400, detail="Token wygasł")
 
-    user.hashed_password = hash_password(new_password)
+    user.hashed_password = await hash_password_async(new_password)
     user.reset_password_token = None
     user.reset_password_expires_at = None
     await db.commit()
@@ -884,10 +1006,10 @@ async def change_password(
             detail="Użytkownicy zalogowani przez konta społecznościowe nie mogą zmieniać hasła.",
         )
 
-    if not verify_password(payload.old_password, user.hashed_password):
+    if not await verify_password_async(payload.old_password, user.hashed_password):
         raise HTTPException(status_code=400, detail="Stare hasło jest nieprawidłowe")
 
-    user.hashed_password = hash_password(payload.new_password)
+    user.hashed_password = await hash_password_async(payload.new_password)
     db.add(user)
     await db.commit()
     await db.refresh(user)
@@ -909,6 +1031,20 @@ async def delete_account(
         select(Pantry).where(Pantry.owner_id == user.id)
     )
     owned_pantries = owned_pantries_result.scalars().all()
+    owned_ids = [pantry.id for pantry in owned_pantries]
+    shared_ids = (
+        (
+            await db.execute(
+                select(PantryUser.pantry_id).where(
+                    PantryUser.user_id == user.id,
+                    PantryUser.pantry_id.not_in(owned_ids),
+                )
+            )
+        )
+        .scalars()
+        .all()
+    )
+    user_id = user.id
 
     for pantry in owned_pantries:
         await db.delete(pantry)
@@ -917,6 +1053,16 @@ async def delete_account(
 
     await db.commit()
 
+    # Otwarte strumienie zdarzeń tego użytkownika mają się zamknąć.
+    for pantry_id in owned_ids:
+        await pantry_events.publish_membership_event(
+            pantry_id, pantry_events.PANTRY_DELETED
+        )
+    for pantry_id in shared_ids:
+        await pantry_events.publish_membership_event(
+            pantry_id, pantry_events.MEMBER_REMOVED, user_id
+        )
+
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
@@ -925,14 +1071,13 @@ async def refresh_token(refresh_token: str = Cookie(None)):
     if not refresh_token:
         raise HTTPException(status_code=401, detail="Brak refresh tokena")
 
-    try:
-        payload = decode_token(refresh_token)
-    except Exception:
-        raise HTTPException(status_code=401, detail="Refresh token niepoprawny")
-
-    email = payload.get("sub")
-    if not email:
-        raise HTTPException(status_code=401, detail="Brak sub w refresh tokenie")
+    new_refresh_token, payload = await refresh_tokens.rotate(refresh_token)
 
-    new_access_token = create_access_token({"sub": email})
-    return {"access_token": new_access_token, "token_type": "bearer"}
+    new_access_token = create_access_token(
+        {"sub": payload["sub"], "provider": payload.get("provider")}
+    )
+    response = JSONResponse(
+        content={"access_token": new_access_token, "token_type": "bearer"}
+    )
+    set_refresh_cookie(response, new_refresh_token)
+    return response
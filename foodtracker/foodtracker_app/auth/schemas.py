@@ -3,6 +3,7 @@ from typing import List, Literal, Optional
 from foodtracker_app.schemas.category import CategoryRead
 from pydantic import BaseModel, ConfigDict, EmailStr, Field, constr, field_validator
 from decimal import Decimal
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 
 class UserCreate(BaseModel):
@@ -27,11 +28,25 @@ class UserProfile(BaseModel):
     avatar_url: Optional[str] = None
     provider: str
     send_expiration_notifications: bool
+    timezone: Optional[str] = None
+    notification_hour: Optional[int] = None
     model_config = ConfigDict(from_attributes=True)
 
 
 class UserSettingsUpdate(BaseModel):
     send_expiration_notifications: bool
+    timezone: Optional[str] = None
+    notification_hour: Optional[int] = Field(default=None, ge=0, le=23)
+
+    @field_validator("timezone")
+    def validate_timezone(cls, v):
+        if v is None:
+            return v
+        try:
+            ZoneInfo(v)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError("Nieznana strefa czasowa.")
+        return v
 
 
 class ProductBase(BaseModel):
@@ -85,6 +100,13 @@ class ProductOut(ProductBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class ProductChanges(BaseModel):
+    upserted: List[ProductOut]
+    deleted_ids: List[int] = []
+    cursor: str
+    has_more: bool = False
+
+
 class ProductActionRequest(BaseModel):
     amount: float = Field(gt=0)
 
@@ -101,6 +123,18 @@ class ProductExpiringSoon(ProductBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class ExpiringFeedItem(ProductExpiringSoon):
+    pantry_id: int
+    pantry_name: str
+    updated_at: datetime
+
+
+class ExpiringFeed(BaseModel):
+    items: List[ExpiringFeedItem]
+    removed_ids: List[int] = []
+    server_time: datetime
+
+
 class ProductStats(BaseModel):
     total: int
     used: int
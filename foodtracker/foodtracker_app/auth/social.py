@@ -1,11 +1,14 @@
 from authlib.integrations.starlette_client import OAuth
 from fastapi import APIRouter, Depends, HTTPException, Request
-from foodtracker_app.auth.utils import create_access_token, create_refresh_token
+from foodtracker_app.auth.refresh_tokens import refresh_tokens, set_refresh_cookie
+from foodtracker_app.auth.utils import create_access_token
 from foodtracker_app.db.database import get_async_session
 
-from foodtracker_app.models import User, Pantry, PantryUser
+from foodtracker_app.models import User
+from foodtracker_app.services import registration_service
 
 from foodtracker_app.settings import settings
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from starlette.responses import RedirectResponse
@@ -61,23 +64,15 @@ async def get_or_create_user(db: AsyncSession, email: str, provider: str) -> Use
             await db.refresh(user)
 
     else:
-        user = User(
-            email=email,
-            hashed_password="social",
-            social_provider=provider,
-            is_verified=True,
+        user = registration_service.add_new_user(
+            db, email, hashed_password="social", provider=provider, is_verified=True
         )
-        db.add(user)
-        await db.flush()
-
-        default_pantry = Pantry(name="Moja Spiżarnia", owner_id=user.id)
-        db.add(default_pantry)
-
-        pantry_association = PantryUser(user=user, pantry=default_pantry, role="owner")
-        db.add(pantry_association)
-
-        await db.commit()
-        await db.refresh(user)
+        try:
+            await db.commit()
+        except IntegrityError:
+            # Równoległe pierwsze logowanie zdążyło założyć konto.
+            await db.rollback()
+            return await get_or_create_user(db, email, provider)
 
     return user
 
@@ -130,21 +125,12 @@ async def google_callback(
         access_token = create_access_token(
             {"sub": user.email, "provider": user.social_provider}
         )
-        refresh_token = create_refresh_token(
-            {"sub": user.email, "provider": user.social_provider}
-        )
+        refresh_token = await refresh_tokens.issue(user.email, user.social_provider)
 
         response = RedirectResponse(
             url=f"{settings.FRONTEND_URL}/google/callback?token={access_token}"
         )
-        response.set_cookie(
-            key="refresh_token",
-            value=refresh_token,
-            httponly=True,
-            secure=settings.IS_PRODUCTION,
-            samesite="strict",
-            path="/auth",
-        )
+        set_refresh_cookie(response, refresh_token)
         return response
 
     except Exception as e:
@@ -205,21 +191,12 @@ async def github_callback(
         access_token = create_access_token(
             {"sub": user.email, "provider": user.social_provider}
         )
-        refresh_token = create_refresh_token(
-            {"sub": user.email, "provider": user.social_provider}
-        )
+        refresh_token = await refresh_tokens.issue(user.email, user.social_provider)
 
         response = RedirectResponse(
             url=f"{settings.FRONTEND_URL}/github/callback?token={access_token}"
         )
-        response.set_cookie(
-            key="refresh_token",
-            value=refresh_token,
-            httponly=True,
-            secure=settings.IS_PRODUCTION,
-            samesite="strict",
-            path="/auth",
-        )
+        set_refresh_cookie(response, refresh_token)
         return response
 
     except Exception as e:
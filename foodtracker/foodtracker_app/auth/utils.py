@@ -1,10 +1,18 @@
+import asyncio
+import hashlib
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Callable, TypeVar
 from uuid import uuid4
 
 from fastapi import HTTPException
 from foodtracker_app.models.user import User
+from foodtracker_app.services.email_outbox import enqueue_email
 from foodtracker_app.settings import settings
-from foodtracker_app.utils.email_utils import send_email_async
 from foodtracker_app.utils.template_utils import render_template
 from jose import ExpiredSignatureError, JWTError, jwt
 from passlib.context import CryptContext
@@ -13,8 +21,78 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = settings.jwt_algorithm
+# Claim "typ" odróżnia tokeny dostępowe od refresh tokenów - refresh token
+# nie może posłużyć jako Bearer, a token dostępowy do odświeżenia.
+ACCESS_TOKEN_TYPE = "access"
+REFRESH_TOKEN_TYPE = "refresh"
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+T = TypeVar("T")
+
+
+def build_pwd_context() -> CryptContext:
+    """
+    Pierwszy schemat jest domyślny, pozostałe są "deprecated" - hashe w nich
+    (albo z innym kosztem) są przeliczane przy logowaniu (verify_and_update).
+    """
+    schemes = ["bcrypt"]
+    if settings.PASSWORD_HASH_SCHEME == "argon2":
+        from passlib.hash import argon2
+
+        if not argon2.has_backend():
+            raise RuntimeError(
+                "PASSWORD_HASH_SCHEME=argon2 wymaga pakietu argon2-cffi."
+            )
+        schemes = ["argon2", "bcrypt"]
+
+    return CryptContext(
+        schemes=schemes,
+        deprecated="auto",
+        bcrypt__rounds=settings.BCRYPT_ROUNDS,
+        argon2__type="ID",
+        argon2__rounds=settings.ARGON2_TIME_COST,
+        argon2__memory_cost=settings.ARGON2_MEMORY_COST_KIB,
+    )
+
+
+pwd_context = build_pwd_context()
+
+# bcrypt i argon2 zwalniają GIL, więc wątki wystarczą. Semafor ogranicza
+# liczbę zleceń w puli - czekanie na niego jest anulowalne, więc rozłączony
+# klient nie zajmuje CPU.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_CONCURRENCY,
+    thread_name_prefix="password-hash",
+)
+_hash_limiters: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def _hash_limiter() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    limiter = _hash_limiters.get(loop)
+    if limiter is None:
+        limiter = asyncio.Semaphore(settings.PASSWORD_HASH_CONCURRENCY)
+        _hash_limiters[loop] = limiter
+    return limiter
+
+
+async def _run_hashing(func: Callable[..., T], *args) -> T:
+    async with _hash_limiter():
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_hash_executor, func, *args)
+
+
+@lru_cache(maxsize=4)
+def _dummy_hash_for(context: CryptContext) -> str:
+    return context.hash(uuid4().hex)
+
+
+def _dummy_hash() -> str:
+    """Hash losowego hasła w bieżącej konfiguracji (liczony raz)."""
+    return _dummy_hash_for(pwd_context)
+
+
+def _verify_dummy(plain_password: str) -> bool:
+    return pwd_context.verify(plain_password, _dummy_hash())
 
 
 def hash_password(password: str) -> str:
@@ -25,6 +103,34 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+async def hash_password_async(password: str) -> str:
+    return await _run_hashing(pwd_context.hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    if not pwd_context.identify(hashed_password):
+        return False
+    return await _run_hashing(pwd_context.verify, plain_password, hashed_password)
+
+
+async def verify_and_update_password(
+    plain_password: str, hashed_password: str | None
+) -> tuple[bool, str | None]:
+    """
+    Weryfikuje hasło; jeśli hash ma nieaktualny schemat lub koszt, zwraca
+    też nowy hash do zapisania. Brak konta (`None`) lub konto bez hasła
+    (np. logowanie społecznościowe) nigdy się nie weryfikują.
+    """
+    if not hashed_password or not pwd_context.identify(hashed_password):
+        # Ten sam koszt co prawdziwa weryfikacja - czas odpowiedzi nie zdradza,
+        # czy konto istnieje.
+        await _run_hashing(_verify_dummy, plain_password)
+        return False, None
+    return await _run_hashing(
+        pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     to_encode = data.copy()
     now = datetime.now(UTC)
@@ -41,31 +147,45 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
             "iss": "foodtracker-api",
             "aud": "foodtracker-user",
             "jti": str(uuid4()),
+            "typ": ACCESS_TOKEN_TYPE,
         }
     )
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def create_refresh_token(
-    data: dict, expires_delta: timedelta = timedelta(days=7)
-) -> str:
+def create_refresh_token(data: dict, expires_delta: timedelta | None = None) -> str:
     to_encode = data.copy()
     now = datetime.now(UTC)
-    expire = now + expires_delta
+    expire = now + (expires_delta or timedelta(days=settings.refresh_token_expire_days))
 
+    to_encode.setdefault("jti", str(uuid4()))
     to_encode.update(
         {
             "exp": expire,
             "iat": now,
             "iss": "foodtracker-api",
             "aud": "foodtracker-user",
-            "jti": str(uuid4()),
+            "typ": REFRESH_TOKEN_TYPE,
         }
     )
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
+# Skrót tokenu -> (exp, claims). Ten sam token przychodzi z każdym żądaniem
+# przez cały czas życia - weryfikujemy podpis i claims tylko raz.
+_claims_cache: OrderedDict[bytes, tuple[float, dict]] = OrderedDict()
+
+
 def decode_token(token: str) -> dict:
+    digest = hashlib.sha256(token.encode()).digest()
+    cached = _claims_cache.get(digest)
+    if cached is not None:
+        expires_at, claims = cached
+        if expires_at > time.time():
+            _claims_cache.move_to_end(digest)
+            return dict(claims)
+        del _claims_cache[digest]
+
     try:
         payload = jwt.decode(
             token,
@@ -74,7 +194,6 @@ def decode_token(token: str) -> dict:
             audience="foodtracker-user",
             issuer="foodtracker-api",
         )
-        return payload
     except ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token has expired")
     except JWTError as e:
@@ -82,19 +201,26 @@ def decode_token(token: str) -> dict:
             status_code=401, detail=f"Could not validate credentials: {e}"
         )
 
+    if "exp" in payload:
+        _claims_cache[digest] = (float(payload["exp"]), dict(payload))
+        while len(_claims_cache) > settings.JWT_CLAIMS_CACHE_SIZE:
+            _claims_cache.popitem(last=False)
+    return payload
+
 
 def generate_verification_token() -> str:
     return str(uuid4())
 
 
-async def trigger_verification_email(user: User, db: AsyncSession):
+async def stage_verification_email(user: User, db: AsyncSession):
+    """
+    Ustawia nowy token weryfikacyjny i wrzuca maila do outboxa. Commit
+    robi wywołujący, więc odpowiedź HTTP nie czeka na serwer SMTP.
+    """
     token = generate_verification_token()
     user.verification_token = token
     user.token_expires_at = datetime.now(timezone.utc) + timedelta(hours=24)
 
-    db.add(user)
-    await db.commit()
-
     verification_url = f"{settings.FRONTEND_URL}/verify?token={token}"
     subject = "Zweryfikuj swoje konto w FoodTracker"
 
@@ -105,7 +231,8 @@ async def trigger_verification_email(user: User, db: AsyncSession):
         now=datetime.now(timezone.utc),
     )
 
-    await send_email_async(
+    enqueue_email(
+        db,
         to_email=user.email,
         subject=subject,
         body="Kliknij w link, by aktywować konto.",
@@ -113,11 +240,19 @@ async def trigger_verification_email(user: User, db: AsyncSession):
     )
 
 
-async def send_reset_password_email(email: str, token: str):
+async def trigger_verification_email(user: User, db: AsyncSession):
+    await stage_verification_email(user, db)
+    db.add(user)
+    await db.commit()
+
+
+async def send_reset_password_email(db: AsyncSession, email: str, token: str):
+    """Dodaje maila z linkiem resetu do outboxa; commit robi wywołujący."""
     reset_link = f"{settings.FRONTEND_URL}/reset-password?token={token}"
     html = await render_template("reset_password_email.html", reset_url=reset_link)
 
-    await send_email_async(
+    enqueue_email(
+        db,
         to_email=email,
         subject="🔒 FoodTracker - Reset hasła",
         body="Kliknij przycisk w wiadomości, aby ustawić nowe hasło",
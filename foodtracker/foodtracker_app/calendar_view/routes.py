@@ -1,36 +1,66 @@
 from datetime import date
-from typing import List
+from typing import List, Optional
 
 from fastapi import APIRouter, Depends, Query
 from foodtracker_app.auth.dependancies import get_current_user
 from foodtracker_app.auth.schemas import ProductOut
-from foodtracker_app.db.database import get_async_session
+from foodtracker_app.db.routing import get_read_session
+from foodtracker_app.models.pantry_user import PantryUser
 from foodtracker_app.models.product import Product
 from foodtracker_app.models.user import User
+from foodtracker_app.schemas.calendar import CalendarDayPage, CalendarMonth
+from foodtracker_app.services import calendar_service
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import selectinload
 
 router = APIRouter(prefix="/calendar_view", tags=["Calendar"])
 
 
-@router.get("/", response_model=List[ProductOut])
+@router.get("/", response_model=CalendarDayPage)
 async def get_products_by_date(
     date_query: date = Query(..., alias="date"),
-    session: AsyncSession = Depends(get_async_session),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[int] = Query(None),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(get_current_user),
 ):
-    stmt = select(Product).where(
-        Product.user_id == current_user.id, Product.expiration_date == date_query
+    """
+    Produkty ze wszystkich spiżarni użytkownika z datą ważności w danym dniu.
+    Kolejną stronę pobiera się, przekazując `next_cursor` jako `cursor`.
+    """
+    return await calendar_service.get_day_products(
+        session, current_user.id, date_query, limit=limit, after_id=cursor
+    )
+
+
+@router.get("/month", response_model=CalendarMonth)
+async def get_month_overview(
+    year: int = Query(..., ge=1, le=9999),
+    month: int = Query(..., ge=1, le=12),
+    session: AsyncSession = Depends(get_read_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Dzienne podsumowanie (liczba, wartość, podział na spiżarnie) aktywnych
+    produktów tracących ważność w danym miesiącu.
+    """
+    return await calendar_service.get_month_summary(
+        session, current_user.id, year, month
     )
-    result = await session.execute(stmt)
-    return result.scalars().all()
 
 
 @router.get("/all", response_model=List[ProductOut])
 async def get_all_products(
-    session: AsyncSession = Depends(get_async_session),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(get_current_user),
 ):
-    stmt = select(Product).where(Product.user_id == current_user.id)
+    stmt = (
+        select(Product)
+        .options(selectinload(Product.category))
+        .join(PantryUser, PantryUser.pantry_id == Product.pantry_id)
+        .where(PantryUser.user_id == current_user.id)
+        .order_by(Product.expiration_date)
+    )
     result = await session.execute(stmt)
     return result.scalars().all()
@@ -0,0 +1,135 @@
+import hashlib
+import logging
+import math
+import time
+from collections import OrderedDict
+
+import redis.asyncio as aioredis
+from fastapi import HTTPException, status
+
+from foodtracker_app.core.sliding_window import SlidingWindowLimiter
+from foodtracker_app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "foodtracker:login:"
+
+
+def lockout_seconds(failures: int, threshold: int) -> float:
+    """Blokada rośnie wykładniczo z każdą porażką powyżej progu."""
+    if failures < threshold:
+        return 0.0
+    return min(
+        settings.LOGIN_LOCKOUT_BASE_SECONDS * 2 ** (failures - threshold),
+        settings.LOGIN_LOCKOUT_MAX_SECONDS,
+    )
+
+
+class LoginThrottle:
+    """
+    Ogranicza nieudane logowania osobno na konto i na adres IP. Porażki
+    liczy wspólne okno przesuwne (SlidingWindowLimiter), a blokada to klucz
+    z TTL. Sprawdzenie to jedno zapytanie do Redisa - wykonywane przed bazą
+    danych i hashowaniem hasła, więc zablokowany ruch jest tani.
+    """
+
+    def __init__(self, redis_url: str | None):
+        self._redis = aioredis.from_url(redis_url) if redis_url else None
+        self.failures = SlidingWindowLimiter(
+            redis_url,
+            prefix=KEY_PREFIX,
+            window=settings.LOGIN_FAILURE_WINDOW_SECONDS,
+        )
+        # Zapasowe blokady w pamięci procesu (testy, awaria Redisa).
+        self._locked_until: OrderedDict[str, float] = OrderedDict()
+
+    @staticmethod
+    def _account_key(email: str) -> str:
+        digest = hashlib.sha256(email.strip().lower().encode()).hexdigest()
+        return f"account:{digest}"
+
+    @staticmethod
+    def _ip_key(ip: str) -> str:
+        return f"ip:{ip}"
+
+    @staticmethod
+    def _lock_key(key: str) -> str:
+        return f"{KEY_PREFIX}{key}:lock"
+
+    def _limits(self, email: str, ip: str) -> list[tuple[str, int]]:
+        return [
+            (self._account_key(email), settings.LOGIN_MAX_FAILURES_PER_ACCOUNT),
+            (self._ip_key(ip), settings.LOGIN_MAX_FAILURES_PER_IP),
+        ]
+
+    async def check(self, email: str, ip: str) -> None:
+        keys = [key for key, _ in self._limits(email, ip)]
+        retry_after = 0.0
+        if self._redis is not None:
+            try:
+                async with self._redis.pipeline(transaction=False) as pipe:
+                    for key in keys:
+                        pipe.pttl(self._lock_key(key))
+                    ttls = await pipe.execute()
+                retry_after = max(ttl for ttl in ttls) / 1000
+            except Exception as e:
+                logger.warning(f"Redis niedostępny, limit logowań w pamięci: {e}")
+                retry_after = self._memory_locked_for(keys)
+        else:
+            retry_after = self._memory_locked_for(keys)
+
+        if retry_after > 0:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Zbyt wiele nieudanych prób logowania. Spróbuj później.",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+    def _memory_locked_for(self, keys: list[str]) -> float:
+        now = time.monotonic()
+        locked_for = 0.0
+        for key in keys:
+            until = self._locked_until.get(key)
+            if until is not None and until <= now:
+                del self._locked_until[key]
+            elif until is not None:
+                locked_for = max(locked_for, until - now)
+        return locked_for
+
+    def _lock_in_memory(self, key: str, seconds: float) -> None:
+        self._locked_until.pop(key, None)
+        self._locked_until[key] = time.monotonic() + seconds
+        while len(self._locked_until) > settings.MEMORY_FALLBACK_MAX_KEYS:
+            self._locked_until.popitem(last=False)
+
+    async def _lock(self, key: str, seconds: float) -> None:
+        if self._redis is not None:
+            try:
+                await self._redis.set(
+                    self._lock_key(key), "1", px=max(1, int(seconds * 1000))
+                )
+                return
+            except Exception as e:
+                logger.warning(f"Redis niedostępny, limit logowań w pamięci: {e}")
+        self._lock_in_memory(key, seconds)
+
+    async def register_failure(self, email: str, ip: str) -> None:
+        for key, threshold in self._limits(email, ip):
+            failures = await self.failures.record(key)
+            lock = lockout_seconds(failures, threshold)
+            if lock:
+                await self._lock(key, lock)
+
+    async def register_success(self, email: str) -> None:
+        """Udane logowanie zeruje licznik konta (licznik IP zostaje)."""
+        key = self._account_key(email)
+        await self.failures.reset(key)
+        self._locked_until.pop(key, None)
+        if self._redis is not None:
+            try:
+                await self._redis.delete(self._lock_key(key))
+            except Exception as e:
+                logger.warning(f"Nie udało się wyzerować limitu logowań: {e}")
+
+
+login_throttle = LoginThrottle(None if settings.SKIP_REDIS else settings.REDIS_URL)
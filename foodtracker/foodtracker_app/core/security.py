@@ -1,37 +1,80 @@
-from collections import defaultdict
-from datetime import datetime, timezone
+import ipaddress
+import math
+from functools import lru_cache
 
 from fastapi import HTTPException, Request
+from foodtracker_app.core.sliding_window import SlidingWindowLimiter
 from foodtracker_app.settings import settings
 
-registration_attempts = defaultdict(list)
-MAX_ATTEMPTS_PER_IP = 2
+REGISTRATION_WINDOW_SECONDS = 24 * 60 * 60
+
+# Liczone są tylko udane rejestracje - literówka w haśle, nieudana reCAPTCHA
+# czy zajęty e-mail nie zużywają limitu (także za wspólnym NAT-em).
+registration_limiter = SlidingWindowLimiter(
+    None if settings.SKIP_REDIS else settings.REDIS_URL,
+    prefix="foodtracker:registration:",
+    limit=settings.REGISTRATIONS_PER_IP_PER_DAY,
+    window=REGISTRATION_WINDOW_SECONDS,
+)
+
+
+@lru_cache
+def _trusted_networks(proxies: tuple[str, ...]) -> tuple:
+    return tuple(ipaddress.ip_network(proxy, strict=False) for proxy in proxies)
+
+
+def _is_trusted_proxy(ip: str) -> bool:
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        return False
+    networks = _trusted_networks(tuple(settings.TRUSTED_PROXIES))
+    return any(address in network for network in networks)
 
 
 def get_client_ip(request: Request) -> str:
+    """
+    Adres klienta na potrzeby limitów. X-Forwarded-For jest brany pod uwagę
+    tylko od zaufanych proxy (TRUSTED_PROXIES) i czytany od prawej - pierwszy
+    adres spoza proxy to klient. Wpisów po lewej klient może dopisać sam.
+    """
+    ip = request.client.host if request.client else "unknown"
     forwarded_for = request.headers.get("X-Forwarded-For")
-    if forwarded_for:
-        ip = forwarded_for.split(",")[0]
-    else:
-        ip = request.client.host
+    if not forwarded_for or not _is_trusted_proxy(ip):
+        return ip
+    for hop in reversed([hop.strip() for hop in forwarded_for.split(",")]):
+        if not hop:
+            continue
+        ip = hop
+        if not _is_trusted_proxy(hop):
+            break
     return ip
 
 
 async def limit_registration(request: Request):
+    """Odrzuca rejestrację, gdy z tego adresu założono już dziś limit kont."""
     client_ip = get_client_ip(request)
 
     if client_ip in settings.ALLOWED_IPS:
         return
 
-    now = datetime.now(timezone.utc)
-    today = now.date()
-
-    attempts = registration_attempts[client_ip]
-    registration_attempts[client_ip] = [ts for ts in attempts if ts.date() == today]
-
-    if len(registration_attempts[client_ip]) >= MAX_ATTEMPTS_PER_IP:
+    allowed, retry_after = await registration_limiter.peek(client_ip)
+    if not allowed:
         raise HTTPException(
-            status_code=429, detail="Too many registration attempts today, try tommorow"
+            status_code=429,
+            detail="Too many registrations today, try tommorow",
+            headers={"Retry-After": str(math.ceil(retry_after))},
         )
 
-    registration_attempts[client_ip].append(now)
+
+async def count_registration(request: Request):
+    """Zalicza udaną rejestrację do limitu adresu."""
+    client_ip = get_client_ip(request)
+    if client_ip not in settings.ALLOWED_IPS:
+        await registration_limiter.record(client_ip)
+
+
+def require_allowed_ip(request: Request):
+    """Endpointy operacyjne są dostępne tylko z adresów z ALLOWED_IPS."""
+    if get_client_ip(request) not in settings.ALLOWED_IPS:
+        raise HTTPException(status_code=403, detail="Forbidden")
@@ -0,0 +1,162 @@
+import logging
+import time
+from collections import OrderedDict, deque
+from uuid import uuid4
+
+import redis.asyncio as aioredis
+
+from foodtracker_app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# KEYS[1] - zbiór (ZSET) znaczników czasu w oknie
+# ARGV: teraz_ms, okno_ms, limit (0 - bez limitu, samo liczenie), unikalny_member
+# (pusty - tylko sprawdzenie, bez rejestrowania zdarzenia)
+# Zwraca {dozwolone (0/1), liczba_w_oknie, retry_after_ms}
+HIT_SCRIPT = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+local count = redis.call('ZCARD', KEYS[1])
+if limit > 0 and count >= limit then
+    local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+    return {0, count, tonumber(oldest[2]) + window - now}
+end
+if ARGV[4] == '' then
+    return {1, count, 0}
+end
+redis.call('ZADD', KEYS[1], now, ARGV[4])
+redis.call('PEXPIRE', KEYS[1], window)
+return {1, count + 1, 0}
+"""
+
+
+class MemorySlidingWindow:
+    """
+    Okno przesuwne w pamięci procesu. Przy każdym wywołaniu usuwa klucze,
+    których wszystkie wpisy wypadły z okna, a liczba kluczy jest ograniczona
+    (najdawniej używane są usuwane) - pamięć nie rośnie bez końca.
+    """
+
+    def __init__(self, max_keys: int = settings.MEMORY_FALLBACK_MAX_KEYS):
+        self.max_keys = max_keys
+        self._hits: OrderedDict[str, deque[float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._hits)
+
+    def _evict_stale(self, now: float, window: float) -> None:
+        # Najdawniej używane klucze są na początku - wystarczy dojść
+        # do pierwszego, który ma jeszcze wpis w oknie.
+        while self._hits:
+            key, hits = next(iter(self._hits.items()))
+            if hits and hits[-1] > now - window:
+                break
+            del self._hits[key]
+
+    def add(
+        self, key: str, limit: int, window: float, now: float, record: bool = True
+    ) -> tuple[bool, int, float]:
+        """
+        Zwraca (dozwolone, liczba_w_oknie, retry_after); limit 0 - bez limitu.
+        Z `record=False` tylko sprawdza limit, nie rejestrując zdarzenia.
+        """
+        self._evict_stale(now, window)
+        hits = self._hits.pop(key, deque())
+        while hits and hits[0] <= now - window:
+            hits.popleft()
+
+        allowed = limit <= 0 or len(hits) < limit
+        if allowed and record:
+            hits.append(now)
+        if hits:
+            self._hits[key] = hits
+        while len(self._hits) > self.max_keys:
+            self._hits.popitem(last=False)
+
+        retry_after = 0.0 if allowed else hits[0] + window - now
+        return allowed, len(hits), retry_after
+
+    def hit(
+        self, key: str, limit: int, window: float, now: float
+    ) -> tuple[bool, float]:
+        allowed, _, retry_after = self.add(key, limit, window, now)
+        return allowed, retry_after
+
+    def record(self, key: str, window: float, now: float) -> int:
+        return self.add(key, 0, window, now)[1]
+
+    def peek(
+        self, key: str, limit: int, window: float, now: float
+    ) -> tuple[bool, float]:
+        allowed, _, retry_after = self.add(key, limit, window, now, record=False)
+        return allowed, retry_after
+
+    def reset(self, key: str) -> None:
+        self._hits.pop(key, None)
+
+
+class SlidingWindowLimiter:
+    """
+    Limit `limit` zdarzeń na `window` sekund na klucz. Stan trzymany w Redisie
+    (atomowy skrypt Lua na ZSET, wygasa przez TTL), więc limit obowiązuje
+    wspólnie dla wszystkich workerów i instancji. Bez Redisa (lub przy jego
+    awarii) używa okna w pamięci procesu. Z `limit=0` tylko liczy zdarzenia.
+    """
+
+    def __init__(
+        self,
+        redis_url: str | None,
+        prefix: str,
+        window: float,
+        limit: int = 0,
+        max_memory_keys: int = settings.MEMORY_FALLBACK_MAX_KEYS,
+    ):
+        self.prefix = prefix
+        self.limit = limit
+        self.window = window
+        self._redis = aioredis.from_url(redis_url) if redis_url else None
+        self._script = self._redis.register_script(HIT_SCRIPT) if self._redis else None
+        self.memory = MemorySlidingWindow(max_memory_keys)
+
+    async def _add(
+        self, key: str, limit: int, record: bool = True
+    ) -> tuple[bool, int, float]:
+        if self._redis is not None:
+            try:
+                allowed, count, retry_ms = await self._script(
+                    keys=[f"{self.prefix}{key}"],
+                    args=[
+                        int(time.time() * 1000),
+                        int(self.window * 1000),
+                        limit,
+                        uuid4().hex if record else "",
+                    ],
+                )
+                return bool(allowed), int(count), retry_ms / 1000
+            except Exception as e:
+                logger.warning(f"Redis niedostępny, limit {self.prefix} w pamięci: {e}")
+        return self.memory.add(key, limit, self.window, time.monotonic(), record)
+
+    async def hit(self, key: str) -> tuple[bool, float]:
+        """Rejestruje zdarzenie; zwraca (dozwolone, ile sekund do zwolnienia)."""
+        allowed, _, retry_after = await self._add(key, self.limit)
+        return allowed, retry_after
+
+    async def peek(self, key: str) -> tuple[bool, float]:
+        """Sprawdza limit bez rejestrowania zdarzenia."""
+        allowed, _, retry_after = await self._add(key, self.limit, record=False)
+        return allowed, retry_after
+
+    async def record(self, key: str) -> int:
+        """Rejestruje zdarzenie bez sprawdzania limitu; zwraca liczbę w oknie."""
+        return (await self._add(key, 0))[1]
+
+    async def reset(self, key: str) -> None:
+        self.memory.reset(key)
+        if self._redis is not None:
+            try:
+                await self._redis.delete(f"{self.prefix}{key}")
+            except Exception as e:
+                logger.warning(f"Nie udało się wyzerować limitu {self.prefix}: {e}")
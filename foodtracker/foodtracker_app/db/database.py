@@ -1,10 +1,21 @@
-from typing import AsyncGenerator
+import time
+from typing import Any, AsyncGenerator
 from datetime import timezone, datetime
+from uuid import uuid4
 
 from foodtracker_app.settings import settings
-from sqlalchemy import TypeDecorator, DateTime
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import TypeDecorator, DateTime, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.sql.functions import FunctionElement
 
 
 class TZDateTime(TypeDecorator):
@@ -24,9 +35,140 @@ class TZDateTime(TypeDecorator):
         return None
 
 
+class utcnow(FunctionElement):
+    """
+    Bieżący czas UTC bez strefy - wartość domyślna po stronie bazy dla
+    kolumn TZDateTime. Samo now() na Postgresie zwróciłoby czas w strefie
+    sesji.
+    """
+
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _utcnow_default(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(utcnow, "postgresql")
+def _utcnow_postgresql(element, compiler, **kw):
+    return "timezone('utc', now())"
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Pula połączeń, która dodatkowo mierzy czas oczekiwania na wolne połączenie.
+    Czas otwierania nowych połączeń (overflow, pierwsze użycie) jest liczony
+    osobno i nie wlicza się do czasu oczekiwania.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.connects = 0
+        self.connect_time_total = 0.0
+        self.connect_time_max = 0.0
+        # Czas otwarcia świeżych rekordów, odbierany w _do_get. Kluczem jest
+        # rekord, bo przy async kilka pobrań może się przeplatać.
+        self._connect_times: dict[int, float] = {}
+
+    def _create_connection(self):
+        started = time.perf_counter()
+        record = super()._create_connection()
+        took = time.perf_counter() - started
+        self.connects += 1
+        self.connect_time_total += took
+        self.connect_time_max = max(self.connect_time_max, took)
+        self._connect_times[id(record)] = took
+        return record
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            self._record_wait(time.perf_counter() - started)
+            raise
+        took = time.perf_counter() - started
+        self._record_wait(took - self._connect_times.pop(id(record), 0.0))
+        return record
+
+    def _record_wait(self, waited: float) -> None:
+        waited = max(waited, 0.0)
+        self.checkouts += 1
+        self.wait_time_total += waited
+        self.wait_time_max = max(self.wait_time_max, waited)
+
+
+def build_engine_options(database_url: str) -> dict[str, Any]:
+    """
+    Buduje parametry silnika na podstawie ustawień.
+    Pula i cache zapytań są konfigurowane tylko dla Postgresa.
+    """
+    options: dict[str, Any] = {"echo": settings.SQL_ECHO}
+    if make_url(database_url).get_backend_name() != "postgresql":
+        return options
+
+    options.update(
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+
+    if settings.DB_PGBOUNCER_TRANSACTION_MODE:
+        # pgbouncer w trybie transakcyjnym nie gwarantuje tego samego połączenia
+        # serwerowego między transakcjami, więc przygotowane zapytania
+        # nie mogą być cache'owane ani mieć powtarzalnych nazw.
+        options["connect_args"] = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    else:
+        options["connect_args"] = {
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        }
+
+    return options
+
+
+def get_pool_stats(target_engine: AsyncEngine | None = None) -> dict[str, Any]:
+    """
+    Zwraca bieżące statystyki puli połączeń silnika.
+    """
+    pool = (target_engine or engine).sync_engine.pool
+    stats: dict[str, Any] = {"pool_class": type(pool).__name__}
+
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+        )
+
+    if isinstance(pool, InstrumentedAsyncQueuePool):
+        stats.update(
+            checkouts=pool.checkouts,
+            wait_time_total_seconds=round(pool.wait_time_total, 6),
+            wait_time_max_seconds=round(pool.wait_time_max, 6),
+            connects=pool.connects,
+            connect_time_total_seconds=round(pool.connect_time_total, 6),
+            connect_time_max_seconds=round(pool.connect_time_max, 6),
+        )
+
+    return stats
+
+
 DATABASE_URL = settings.DATABASE_URL
 
-engine = create_async_engine(DATABASE_URL, echo=settings.SQL_ECHO)
+engine = create_async_engine(DATABASE_URL, **build_engine_options(DATABASE_URL))
 async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
 
 Base = declarative_base()
@@ -0,0 +1,179 @@
+import asyncio
+import itertools
+import logging
+import time
+from typing import AsyncGenerator
+
+import redis.asyncio as aioredis
+from fastapi import Depends, Request
+from foodtracker_app.auth.principal import resolve_principal
+from foodtracker_app.core.security import get_client_ip
+from foodtracker_app.db.database import build_engine_options, get_async_session
+from foodtracker_app.settings import settings
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+STICKY_KEY_PREFIX = "foodtracker:db:sticky:"
+
+
+async def get_client_key(request: Request) -> str:
+    """
+    Identyfikuje klienta na potrzeby "read-your-writes": zalogowany
+    użytkownik (claim `sub`, ten sam po odświeżeniu tokenu), a w razie
+    jego braku adres IP.
+    """
+    principal = await resolve_principal(request)
+    if principal is not None:
+        return "user:" + principal.email
+    return "ip:" + get_client_ip(request)
+
+
+class ReplicaRouter:
+    """
+    Rozdziela zapytania tylko do odczytu między repliki (round-robin),
+    pomijając repliki, które nie przeszły health checka.
+    Klient, który niedawno coś zapisał, czyta z primary. Okno trzymane jest
+    w Redisie, więc obowiązuje we wszystkich procesach API; bez Redisa
+    (albo gdy jest niedostępny) - lokalnie w pamięci procesu.
+    """
+
+    def __init__(
+        self,
+        replica_urls: list[str],
+        sticky_seconds: float,
+        health_check_interval: float,
+        redis_url: str | None = None,
+    ):
+        self.engines: list[AsyncEngine] = [
+            create_async_engine(url, **build_engine_options(url))
+            for url in replica_urls
+        ]
+        self.healthy: list[bool] = [True] * len(self.engines)
+        self.sticky_seconds = sticky_seconds
+        self.health_check_interval = health_check_interval
+        self._counter = itertools.count()
+        self._sticky_until: dict[str, float] = {}
+        self._redis = aioredis.from_url(redis_url) if redis_url else None
+        self._health_task: asyncio.Task | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.engines)
+
+    def _mark_local(self, client_key: str) -> None:
+        now = time.monotonic()
+        if len(self._sticky_until) >= settings.MEMORY_FALLBACK_MAX_KEYS:
+            self._sticky_until = {
+                key: until for key, until in self._sticky_until.items() if until > now
+            }
+        self._sticky_until[client_key] = now + self.sticky_seconds
+
+    def _is_sticky_local(self, client_key: str) -> bool:
+        until = self._sticky_until.get(client_key)
+        if until is None:
+            return False
+        if until <= time.monotonic():
+            self._sticky_until.pop(client_key, None)
+            return False
+        return True
+
+    async def mark_write(self, client_key: str) -> None:
+        # Lokalna kopia zawsze - proces, który zapisał, nie czeka na Redisa.
+        self._mark_local(client_key)
+        milliseconds = int(self.sticky_seconds * 1000)
+        if self._redis is None or milliseconds <= 0:
+            return
+        try:
+            await self._redis.set(
+                f"{STICKY_KEY_PREFIX}{client_key}", "1", px=milliseconds
+            )
+        except Exception as e:
+            logger.warning(f"Nie udało się zapisać okna read-your-writes: {e}")
+
+    async def is_sticky(self, client_key: str) -> bool:
+        if self._is_sticky_local(client_key):
+            return True
+        if self._redis is not None:
+            try:
+                return bool(
+                    await self._redis.exists(f"{STICKY_KEY_PREFIX}{client_key}")
+                )
+            except Exception as e:
+                logger.warning(f"Redis niedostępny, okno read-your-writes lokalne: {e}")
+        return False
+
+    async def pick_engine(self, client_key: str) -> AsyncEngine | None:
+        """
+        Zwraca silnik repliki albo None, jeśli zapytanie ma trafić do primary.
+        """
+        if not self.engines or await self.is_sticky(client_key):
+            return None
+        candidates = [engine for engine, ok in zip(self.engines, self.healthy) if ok]
+        if not candidates:
+            return None
+        return candidates[next(self._counter) % len(candidates)]
+
+    async def check_health(self, timeout: float = 2.0) -> None:
+        for index, engine in enumerate(self.engines):
+            try:
+                async with asyncio.timeout(timeout):
+                    async with engine.connect() as conn:
+                        await conn.execute(text("SELECT 1"))
+                healthy = True
+            except Exception as e:
+                healthy = False
+                if self.healthy[index]:
+                    logger.warning(f"Replika {engine.url!r} niedostępna: {e}")
+            if healthy and not self.healthy[index]:
+                logger.info(f"Replika {engine.url!r} znów dostępna.")
+            self.healthy[index] = healthy
+
+    async def _health_loop(self) -> None:
+        while True:
+            await self.check_health()
+            await asyncio.sleep(self.health_check_interval)
+
+    def start(self) -> None:
+        if self.enabled and self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def stop(self) -> None:
+        if self._health_task:
+            self._health_task.cancel()
+            self._health_task = None
+        for engine in self.engines:
+            await engine.dispose()
+
+
+replica_router = ReplicaRouter(
+    settings.DATABASE_REPLICA_URLS,
+    sticky_seconds=settings.DB_READ_YOUR_WRITES_SECONDS,
+    health_check_interval=settings.DB_REPLICA_HEALTH_CHECK_INTERVAL,
+    redis_url=None if settings.SKIP_REDIS else settings.REDIS_URL,
+)
+
+
+async def get_read_session(
+    request: Request, primary_session: AsyncSession = Depends(get_async_session)
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Sesja dla endpointów tylko do odczytu. Bez skonfigurowanych replik
+    (albo tuż po zapisie klienta) zwraca zwykłą sesję primary.
+    """
+    engine = await replica_router.pick_engine(await get_client_key(request))
+    if engine is None:
+        yield primary_session
+        return
+
+    async with AsyncSession(bind=engine, expire_on_commit=False) as session:
+        yield session
+
+
+async def read_your_writes_middleware(request: Request, call_next):
+    response = await call_next(request)
+    if request.method not in SAFE_METHODS and response.status_code < 400:
+        await replica_router.mark_write(await get_client_key(request))
+    return response
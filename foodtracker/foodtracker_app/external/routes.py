@@ -7,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from foodtracker_app.db.database import get_async_session
 from foodtracker_app.schemas.category import CategoryRead
 from foodtracker_app.services import product_service
+from foodtracker_app.utils.fast_json import FastJSONResponse
 
 
 router = APIRouter(prefix="/external-products", tags=["External"])
@@ -61,7 +62,7 @@ async def fetch_search_results(
     return response.json()
 
 
-@router.get("/search")
+@router.get("/search", response_class=FastJSONResponse)
 async def search_products_from_external_api(
     q: str = Query(..., min_length=3),
     db: AsyncSession = Depends(get_async_session),
@@ -2,25 +2,32 @@ from pathlib import Path
 from contextlib import asynccontextmanager
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, APIRouter
+from fastapi import FastAPI, APIRouter, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
+from fastapi.staticfiles import StaticFiles
 from foodtracker_app.auth import social
 from foodtracker_app.auth.routes import auth_router, product_router
 from foodtracker_app.calendar_view.routes import router as calendar_router
+from foodtracker_app.core.security import require_allowed_ip
 from foodtracker_app.external.routes import router as external_router
 from foodtracker_app.notifications.routes import router as notifications_router
 from foodtracker_app.routes.pantries import router as pantries_router
 from foodtracker_app.routes.categories import router as categories_router
 from foodtracker_app.routes.invitations import router as invitations_router
+from foodtracker_app.routes.me import router as me_router
 
 from foodtracker_app.settings import settings
-from rate_limiter import limiter
+from rate_limiter import limiter, principal_middleware
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from starlette.middleware.sessions import SessionMiddleware
-from foodtracker_app.db.database import async_session_maker
+from foodtracker_app.db.database import async_session_maker, get_pool_stats
 from foodtracker_app.db.init_db import seed_categories
+from foodtracker_app.db.routing import replica_router, read_your_writes_middleware
+from foodtracker_app.services import pantry_events
+from foodtracker_app.services.avatar_storage import LOCAL_URL_PREFIX
+from foodtracker_app.utils.template_utils import precompile_templates
 
 env_path = Path(__file__).resolve().parents[1] / ".env"
 
@@ -37,9 +44,13 @@ async def lifespan(app: FastAPI):
     print("Aplikacja startuje, uruchamiam logikę początkową...")
     async with async_session_maker() as session:
         await seed_categories(session)
+    precompile_templates()
+    replica_router.start()
 
     yield
 
+    await replica_router.stop()
+    await pantry_events.broker.close()
     print("Aplikacja się zamyka.")
 
 
@@ -64,6 +75,11 @@ app.add_middleware(
     secret_key=settings.SECRET_KEY,
 )
 
+if replica_router.enabled:
+    app.middleware("http")(read_your_writes_middleware)
+
+app.middleware("http")(principal_middleware)
+
 
 def custom_openapi():
     if app.openapi_schema:
@@ -105,6 +121,7 @@ app.include_router(
 app.include_router(pantries_router, prefix="/pantries", tags=["Pantries"])
 app.include_router(categories_router, prefix="/categories")
 app.include_router(invitations_router)
+app.include_router(me_router, prefix="/me", tags=["Me"])
 
 health_router = APIRouter()
 
@@ -114,4 +131,21 @@ def health_check():
     return {"status": "ok"}
 
 
+@health_router.get(
+    "/health/db-pool",
+    include_in_schema=False,
+    dependencies=[Depends(require_allowed_ip)],
+)
+def db_pool_stats():
+    return get_pool_stats()
+
+
 app.include_router(health_router)
+
+if settings.AVATAR_STORAGE == "local":
+    Path(settings.AVATAR_LOCAL_DIR).mkdir(parents=True, exist_ok=True)
+    app.mount(
+        LOCAL_URL_PREFIX,
+        StaticFiles(directory=settings.AVATAR_LOCAL_DIR),
+        name="avatars",
+    )
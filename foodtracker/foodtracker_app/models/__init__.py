@@ -5,6 +5,10 @@ from .pantry_user import PantryUser
 from .category import Category
 from .financial_stats import FinancialStat
 from .pantry_invitation import PantryInvitation
+from .product_tombstone import ProductTombstone
+from .notification_log import NotificationLog, NotificationRun
+from .email_outbox import EmailOutbox
+from .product_archive import ProductArchive, ProductRollup
 
 
 __all__ = [
@@ -15,4 +19,10 @@ __all__ = [
     "Category",
     "FinancialStat",
     "PantryInvitation",
+    "ProductTombstone",
+    "NotificationLog",
+    "NotificationRun",
+    "EmailOutbox",
+    "ProductArchive",
+    "ProductRollup",
 ]
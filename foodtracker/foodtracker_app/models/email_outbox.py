@@ -0,0 +1,33 @@
+from datetime import datetime, timezone
+
+from foodtracker_app.db.database import Base, TZDateTime
+from sqlalchemy import Column, Index, Integer, String, Text
+
+
+class EmailOutbox(Base):
+    """
+    Mail czekający na wysyłkę. Wiersz powstaje w tej samej transakcji co
+    zmiana, której dotyczy, a wysyła go worker Celery.
+    """
+
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True)
+    to_email = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    body = Column(Text, nullable=False)
+    html = Column(Text, nullable=True)
+    # pending -> sending (dzierżawa do next_attempt_at) -> sent, z powrotem
+    # pending po błędzie, albo dead po wyczerpaniu prób.
+    status = Column(String, nullable=False, default="pending", server_default="pending")
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at = Column(
+        TZDateTime, nullable=False, default=lambda: datetime.now(timezone.utc)
+    )
+    last_error = Column(Text, nullable=True)
+    created_at = Column(
+        TZDateTime, nullable=False, default=lambda: datetime.now(timezone.utc)
+    )
+    sent_at = Column(TZDateTime, nullable=True)
+
+    __table_args__ = (Index("ix_email_outbox_due", "status", "next_attempt_at"),)
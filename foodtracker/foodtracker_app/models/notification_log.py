@@ -0,0 +1,60 @@
+from datetime import datetime, timezone
+
+from foodtracker_app.db.database import Base, TZDateTime
+from foodtracker_app.settings import settings
+from sqlalchemy import Column, ForeignKey, Integer, String, UniqueConstraint
+
+
+class NotificationLog(Base):
+    """
+    Zapis wysłanego powiadomienia o produkcie - każdy produkt jest
+    ogłaszany użytkownikowi najwyżej raz na próg (liczbę dni do końca ważności).
+    """
+
+    __tablename__ = "notification_log"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    # Partycjonowana tabela products ma klucz główny (id, pantry_id), więc
+    # klucza obcego na samo id nie ma (migracja f7c3b58d2e19) - osierocone
+    # wpisy sprząta maintenance.cleanup_expired.
+    product_id = Column(
+        Integer,
+        None
+        if settings.PRODUCTS_HASH_PARTITIONS > 0
+        else ForeignKey("products.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    threshold = Column(Integer, nullable=False)
+    sent_at = Column(
+        TZDateTime, nullable=False, default=lambda: datetime.now(timezone.utc)
+    )
+
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id",
+            "product_id",
+            "threshold",
+            name="uq_notification_log_user_product_threshold",
+        ),
+    )
+
+
+class NotificationRun(Base):
+    """
+    Punkt kontrolny przebiegu powiadomień. Użytkownicy są przetwarzani
+    rosnąco po id, więc przerwany przebieg wznawia się od last_user_id.
+    """
+
+    __tablename__ = "notification_runs"
+
+    id = Column(Integer, primary_key=True)
+    run_key = Column(String, nullable=False, unique=True)
+    last_user_id = Column(Integer, nullable=False, default=0, server_default="0")
+    status = Column(String, nullable=False, default="running")
+    started_at = Column(
+        TZDateTime, nullable=False, default=lambda: datetime.now(timezone.utc)
+    )
+    finished_at = Column(TZDateTime, nullable=True)
@@ -7,7 +7,9 @@ class PantryUser(Base):
     __tablename__ = "pantry_users"
 
     pantry_id = Column(ForeignKey("pantries.id", ondelete="CASCADE"), primary_key=True)
-    user_id = Column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(
+        ForeignKey("users.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
     role = Column(String, nullable=False, default="member")
 
     pantry = relationship("Pantry", back_populates="member_associations")
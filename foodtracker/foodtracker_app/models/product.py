@@ -1,16 +1,19 @@
+from datetime import datetime, timezone
 from decimal import Decimal
 
-from foodtracker_app.db.database import Base
+from foodtracker_app.db.database import Base, TZDateTime, utcnow
 from sqlalchemy import (
     CheckConstraint,
     Column,
     Date,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     Numeric,
     String,
     func,
+    text,
 )
 from sqlalchemy.orm import relationship
 
@@ -24,6 +27,13 @@ class Product(Base):
     created_at = Column(
         DateTime(timezone=True), nullable=False, server_default=func.now()
     )
+    updated_at = Column(
+        TZDateTime,
+        nullable=False,
+        server_default=utcnow(),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
     external_id = Column(String, nullable=True)
     pantry_id = Column(Integer, ForeignKey("pantries.id"), nullable=False)
 
@@ -52,4 +62,25 @@ class Product(Base):
             "current_amount + wasted_amount <= initial_amount",
             name="check_amounts_lte_initial",
         ),
+        # Listy produktów spiżarni sortowane po dacie ważności
+        Index("ix_products_pantry_id_expiration_date", "pantry_id", "expiration_date"),
+        # Statystyki i liczniki aktywnych produktów w spiżarni
+        Index("ix_products_pantry_id_current_amount", "pantry_id", "current_amount"),
+        # Synchronizacja przyrostowa ("co zmieniło się od...")
+        Index("ix_products_pantry_id_updated_at", "pantry_id", "updated_at"),
+        # Tylko aktywne produkty - "wkrótce się przeterminują", kalendarz, powiadomienia
+        Index(
+            "ix_products_active_by_expiration",
+            "pantry_id",
+            "expiration_date",
+            postgresql_where=text("current_amount > 0"),
+            sqlite_where=text("current_amount > 0"),
+        ),
+        # Zużyte produkty czekające na archiwizację
+        Index(
+            "ix_products_consumed_updated_at",
+            "updated_at",
+            postgresql_where=text("current_amount = 0"),
+            sqlite_where=text("current_amount = 0"),
+        ),
     )
@@ -0,0 +1,98 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from foodtracker_app.db.database import Base, TZDateTime
+from sqlalchemy import (
+    Column,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    String,
+)
+
+
+class ProductArchive(Base):
+    """
+    Zimna historia: w pełni zużyte produkty przeniesione z `products`.
+    Id jest zachowane, żeby historia dało się powiązać z tombstone'ami.
+    """
+
+    __tablename__ = "products_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    pantry_id = Column(
+        Integer, ForeignKey("pantries.id", ondelete="CASCADE"), nullable=False
+    )
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
+    name = Column(String, nullable=False)
+    external_id = Column(String, nullable=True)
+    expiration_date = Column(Date, nullable=False)
+    price = Column(Numeric(10, 2), nullable=False)
+    unit = Column(String(10), nullable=False)
+    initial_amount = Column(Numeric(10, 2), nullable=False)
+    wasted_amount = Column(Numeric(10, 2), nullable=False)
+    # Wartość zmarnowanej części, policzona przy archiwizacji.
+    wasted_value = Column(Numeric(12, 2), nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    consumed_at = Column(TZDateTime, nullable=False)
+    archived_at = Column(
+        TZDateTime, nullable=False, default=lambda: datetime.now(timezone.utc)
+    )
+
+    __table_args__ = (
+        Index("ix_products_archive_pantry_id_created_at", "pantry_id", "created_at"),
+        Index(
+            "ix_products_archive_pantry_id_wasted_value", "pantry_id", "wasted_value"
+        ),
+    )
+
+
+def _amount():
+    return Column(
+        Numeric(14, 2), nullable=False, default=Decimal("0.00"), server_default="0"
+    )
+
+
+def _count():
+    return Column(Integer, nullable=False, default=0, server_default="0")
+
+
+class ProductRollup(Base):
+    """
+    Zagregowany wkład zarchiwizowanych produktów do statystyk spiżarni,
+    per (kategoria, jednostka). Statystyki = żywe produkty + rollup, więc
+    wyniki są dokładne, a zapytania nie skanują historii.
+    """
+
+    __tablename__ = "product_rollups"
+
+    id = Column(Integer, primary_key=True)
+    pantry_id = Column(
+        Integer, ForeignKey("pantries.id", ondelete="CASCADE"), nullable=False
+    )
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
+    unit = Column(String(10), nullable=False)
+
+    products_count = _count()
+    initial_amount = _amount()
+    saved_amount = _amount()
+    wasted_amount = _amount()
+    # Produkty na wagę liczone "w sztukach": w większości zużyte / zmarnowane.
+    mostly_used_count = _count()
+    mostly_wasted_count = _count()
+    spent_value = _amount()
+
+    # Liczniki osiągnięć zależnych od nazwy i czasu dodania produktu.
+    cheese_products = _count()
+    night_actions = _count()
+    sunday_adds = _count()
+    weekend_adds = _count()
+    morning_caffeine_add = _count()
+    healthy_monday_add = _count()
+
+    __table_args__ = (
+        Index("ix_product_rollups_pantry_id", "pantry_id", "category_id", "unit"),
+    )
@@ -0,0 +1,26 @@
+from datetime import datetime, timezone
+
+from foodtracker_app.db.database import Base, TZDateTime
+from sqlalchemy import Column, ForeignKey, Index, Integer
+
+
+class ProductTombstone(Base):
+    """
+    Ślad po usuniętym produkcie - pozwala klientom synchronizującym
+    przyrostowo dowiedzieć się o usunięciach.
+    """
+
+    __tablename__ = "product_tombstones"
+
+    id = Column(Integer, primary_key=True)
+    product_id = Column(Integer, nullable=False)
+    pantry_id = Column(
+        Integer, ForeignKey("pantries.id", ondelete="CASCADE"), nullable=False
+    )
+    deleted_at = Column(
+        TZDateTime, nullable=False, default=lambda: datetime.now(timezone.utc)
+    )
+
+    __table_args__ = (
+        Index("ix_product_tombstones_pantry_id_deleted_at", "pantry_id", "deleted_at"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Integer, String
+from sqlalchemy import Boolean, Column, Date, Index, Integer, String
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -13,19 +13,32 @@ class User(Base):
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     is_verified = Column(Boolean, default=False)
-    verification_token = Column(String, nullable=True)
+    verification_token = Column(String, nullable=True, index=True)
     token_expires_at = Column(TZDateTime, nullable=True)
-    reset_password_token = Column(String, nullable=True)
+    reset_password_token = Column(String, nullable=True, index=True)
     reset_password_expires_at = Column(TZDateTime, nullable=True)
     created_at = Column(TZDateTime, server_default=func.now())
     avatar_url = Column(String, nullable=True)
+    avatar_thumbnail_url = Column(String, nullable=True)
     social_provider = Column(String, nullable=True)
 
     send_expiration_notifications = Column(
         Boolean, default=True, nullable=False, server_default="true"
     )
+    # Powiadomienia wychodzą o wybranej godzinie lokalnej użytkownika.
+    timezone = Column(
+        String, default="Europe/Warsaw", nullable=False, server_default="Europe/Warsaw"
+    )
+    notification_hour = Column(Integer, default=10, nullable=False, server_default="10")
+    # Data lokalna, za którą użytkownik został już obsłużony przez przebieg
+    # powiadomień - spóźniony przebieg nadrabia tylko tych, którzy jej nie mają.
+    last_notified_on = Column(Date, nullable=True)
 
     pantry_associations = relationship(
         "PantryUser", back_populates="user", cascade="all, delete-orphan"
     )
     pantries = association_proxy("pantry_associations", "pantry")
+
+    __table_args__ = (
+        Index("ix_users_notification_bucket", "notification_hour", "timezone"),
+    )
@@ -3,10 +3,12 @@ import redis
 from urllib.parse import urlparse
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import worker_process_init
 from foodtracker_app.settings import settings
 from foodtracker_app.models.financial_stats import FinancialStat  # noqa
 from foodtracker_app.models.product import Product  # noqa
 from foodtracker_app.models.user import User  # noqa
+from foodtracker_app.utils.template_utils import precompile_templates
 
 BROKER = settings.CELERY_BROKER_URL or "redis://localhost:6379/0"
 BACKEND = settings.CELERY_BACKEND_URL or "redis://localhost:6379/1"
@@ -15,22 +17,50 @@ celery_app = Celery(
     "foodtracker",
     broker=BROKER,
     backend=BACKEND,
-    include=["foodtracker_app.notifications.tasks"],
+    include=[
+        "foodtracker_app.notifications.tasks",
+        "foodtracker_app.services.avatar_tasks",
+        "foodtracker_app.services.email_tasks",
+        "foodtracker_app.services.cleanup_tasks",
+        "foodtracker_app.services.archive_tasks",
+    ],
 )
 
 celery_app.conf.update(
     timezone="UTC",
     enable_utc=True,
     beat_schedule={
-        "run-expiration-check-daily": {
-            "task": "notifications.notify_expiring_products",
-            "schedule": crontab(hour=8, minute=0),  # 08:00 UTC = 10:00 w Polsce
-        }
+        # Co godzinę użytkownicy, u których minęła godzina wysyłki, a nie
+        # zostali jeszcze obsłużeni za dzisiejszą datę lokalną.
+        "run-expiration-check-hourly": {
+            "task": "notifications.notify_send_hour_bucket",
+            "schedule": crontab(minute=0),
+        },
+        "drain-email-outbox": {
+            "task": "emails.send_outbox",
+            "schedule": settings.EMAIL_OUTBOX_POLL_SECONDS,
+            # Zaległe wywołania nie kumulują się, gdy worker nie nadąża.
+            "options": {"expires": settings.EMAIL_OUTBOX_POLL_SECONDS},
+        },
+        "cleanup-expired-hourly": {
+            "task": "maintenance.cleanup_expired",
+            "schedule": crontab(minute=30),
+        },
+        # Raz na dobę, poza godzinami ruchu.
+        "archive-consumed-products-daily": {
+            "task": "maintenance.archive_consumed_products",
+            "schedule": crontab(hour=3, minute=15),
+        },
     },
     broker_connection_retry_on_startup=True,
 )
 
 
+@worker_process_init.connect
+def precompile_email_templates(**kwargs):
+    precompile_templates()
+
+
 def wait_for_redis(url: str, retries=5, delay=2):
     if settings.SKIP_REDIS:
         print("⏩ SKIPPING Redis check")
@@ -1,22 +1,71 @@
 import asyncio
 import logging
-from datetime import datetime, timedelta, timezone
+import weakref
+from datetime import date, datetime, timedelta, timezone
 from collections import defaultdict
 from contextlib import asynccontextmanager
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from celery import shared_task
+from sqlalchemy import and_, false, or_, true
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import sessionmaker, selectinload
 
-from foodtracker_app.models import PantryUser, User, Pantry, Product  # noqa
-from foodtracker_app.utils.email_utils import send_email_async
-from foodtracker_app.utils.template_utils import render_template
+from foodtracker_app.db.database import build_engine_options
+from foodtracker_app.models import (  # noqa
+    NotificationLog,
+    NotificationRun,
+    PantryUser,
+    User,
+    Pantry,
+    Product,
+)
+from foodtracker_app.services.email_outbox import enqueue_email
+from foodtracker_app.utils.template_utils import render_batch
 from foodtracker_app.settings import settings
 
 logger = logging.getLogger(__name__)
 
 EXPIRATION_NOTIFICATION_DAYS = getattr(settings, "EXPIRATION_NOTIFICATION_DAYS", 7)
+# Ilu użytkowników pobierać w jednej partii i renderować w jednym przejściu
+# do puli wątków.
+RENDER_BATCH_SIZE = 500
+RUN_RUNNING = "running"
+RUN_COMPLETED = "completed"
+
+
+# Silnik (i pula połączeń) workera - jeden na pętlę zdarzeń, bo połączenia
+# asyncpg są związane z pętlą, w której powstały. Zadania uruchamiane przez
+# run_async dzielą jedną pętlę, więc w praktyce jest to jeden silnik na proces.
+_worker_loop: asyncio.AbstractEventLoop | None = None
+_session_makers: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def run_async(coro):
+    """
+    Uruchamia logikę zadania Celery w pętli zdarzeń, która żyje tyle co proces
+    workera. asyncio.run tworzyłby nową pętlę dla każdego zadania, a z nią
+    nowy silnik i nowe połączenia do bazy.
+    """
+    global _worker_loop
+    if _worker_loop is None or _worker_loop.is_closed():
+        _worker_loop = asyncio.new_event_loop()
+    return _worker_loop.run_until_complete(coro)
+
+
+def _worker_session_maker() -> sessionmaker:
+    loop = asyncio.get_running_loop()
+    maker = _session_makers.get(loop)
+    if maker is None:
+        engine = create_async_engine(
+            settings.DATABASE_URL, **build_engine_options(settings.DATABASE_URL)
+        )
+        maker = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+        _session_makers[loop] = maker
+    return maker
 
 
 @asynccontextmanager
@@ -24,101 +73,281 @@ async def get_db_session(provided_session: AsyncSession | None = None):
     """
     Kontekst manager, który dostarcza sesję DB.
     Jeśli sesja jest podana z zewnątrz (w teście), używa jej.
-    W przeciwnym razie (w produkcji), tworzy nową.
+    W przeciwnym razie (w produkcji) otwiera sesję na silniku workera.
     """
     if provided_session:
         yield provided_session
         return
 
-    engine = None
+    async with _worker_session_maker()() as session:
+        yield session
+
+
+@lru_cache(maxsize=None)
+def _zone(name: str) -> ZoneInfo:
     try:
-        engine = create_async_engine(settings.DATABASE_URL)
-        async_session_maker = sessionmaker(
-            bind=engine, class_=AsyncSession, expire_on_commit=False
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        logger.warning(f"Nieznana strefa czasowa {name!r} - używam UTC.")
+        return ZoneInfo("UTC")
+
+
+def local_date(user: User, now: datetime):
+    """Dzisiejsza data w strefie czasowej użytkownika."""
+    return now.astimezone(_zone(user.timezone)).date()
+
+
+async def _due_bucket_filter(session: AsyncSession, now: datetime):
+    """
+    Warunek na użytkowników, u których godzina wysyłki już minęła, a nie
+    zostali jeszcze obsłużeni za swoją dzisiejszą datę lokalną. Dzięki temu
+    spóźniony lub pominięty przebieg (restart workera, godzina przeskoczona
+    przy zmianie czasu) nadrabia zaległych przy następnym uruchomieniu.
+    Stref czasowych jest garstka, więc czas lokalny liczymy w Pythonie.
+    """
+    zones = (
+        (
+            await session.execute(
+                select(User.timezone)
+                .distinct()
+                .where(User.is_verified, User.send_expiration_notifications)
+            )
+        )
+        .scalars()
+        .all()
+    )
+    buckets = []
+    for zone in zones:
+        local_now = now.astimezone(_zone(zone))
+        buckets.append(
+            and_(
+                User.timezone == zone,
+                User.notification_hour <= local_now.hour,
+                or_(
+                    User.last_notified_on.is_(None),
+                    User.last_notified_on < local_now.date(),
+                ),
+            )
+        )
+    return or_(*buckets) if buckets else false()
+
+
+def _notification_context(user: User, products: list[Product], today) -> dict:
+    return {
+        "email": user.email,
+        "products": [
+            {
+                "name": p.name,
+                "pantry_name": p.pantry.name,
+                "expiration_date": p.expiration_date.strftime("%Y-%m-%d"),
+                "is_expired": p.expiration_date < today,
+                "quantity": p.current_amount,
+                "unit": p.unit,
+            }
+            for p in sorted(products, key=lambda p: p.expiration_date)
+        ],
+    }
+
+
+def notification_thresholds() -> list[int]:
+    """Progi (dni do końca ważności), przy których produkt jest ogłaszany."""
+    return sorted({EXPIRATION_NOTIFICATION_DAYS, 1, 0})
+
+
+def threshold_for(days_left: int, thresholds: list[int]) -> int | None:
+    """Najmniejszy próg, w który mieści się produkt."""
+    for threshold in thresholds:
+        if days_left <= threshold:
+            return threshold
+    return None
+
+
+async def _start_run(session: AsyncSession, run_key: str) -> NotificationRun:
+    """
+    Zwraca przebieg o danym kluczu. Przerwany przebieg jest wznawiany od
+    punktu kontrolnego, zakończony - startuje od nowa (dziennik i tak nie
+    pozwoli wysłać niczego drugi raz).
+    """
+    run = (
+        await session.execute(
+            select(NotificationRun).where(NotificationRun.run_key == run_key)
+        )
+    ).scalar_one_or_none()
+    if run is None:
+        run = NotificationRun(run_key=run_key)
+        session.add(run)
+        try:
+            await session.commit()
+        except IntegrityError:
+            # Równoległy przebieg zdążył założyć wiersz.
+            await session.rollback()
+            return await _start_run(session, run_key)
+        return run
+    if run.status == RUN_COMPLETED:
+        run.status = RUN_RUNNING
+        run.last_user_id = 0
+        run.finished_at = None
+        await session.commit()
+    else:
+        logger.info(f"Wznawiam przebieg {run_key} od użytkownika {run.last_user_id}.")
+    return run
+
+
+async def _pending_announcements(
+    session: AsyncSession, today_by_user: dict[int, date], thresholds: list[int]
+) -> dict[int, list[tuple[Product, int]]]:
+    """
+    Produkty do ogłoszenia dla partii użytkowników, bez tych, które już
+    zostały ogłoszone na danym progu. "Dziś" liczone jest osobno dla
+    każdego użytkownika, w jego strefie czasowej.
+    """
+    user_ids = list(today_by_user)
+    earliest = min(today_by_user.values())
+    horizon = max(today_by_user.values()) + timedelta(days=max(thresholds))
+    rows = (
+        await session.execute(
+            select(PantryUser.user_id, Product)
+            .join(Product, Product.pantry_id == PantryUser.pantry_id)
+            .where(
+                PantryUser.user_id.in_(user_ids),
+                Product.current_amount > 0,
+                Product.expiration_date.between(earliest, horizon),
+            )
+            .options(selectinload(Product.pantry))
         )
-        async with async_session_maker() as session:
-            yield session
-    finally:
-        if engine:
-            await engine.dispose()
+    ).all()
+    if not rows:
+        return {}
+
+    already_sent = set(
+        (
+            await session.execute(
+                select(
+                    NotificationLog.user_id,
+                    NotificationLog.product_id,
+                    NotificationLog.threshold,
+                ).where(
+                    NotificationLog.user_id.in_(user_ids),
+                    NotificationLog.product_id.in_({p.id for _, p in rows}),
+                )
+            )
+        ).all()
+    )
+
+    pending = defaultdict(list)
+    for user_id, product in rows:
+        days_left = (product.expiration_date - today_by_user[user_id]).days
+        if days_left < 0:
+            continue
+        threshold = threshold_for(days_left, thresholds)
+        if threshold is None or (user_id, product.id, threshold) in already_sent:
+            continue
+        pending[user_id].append((product, threshold))
+    return pending
 
 
-async def _run_notification_logic_async(db: AsyncSession | None = None):
+async def _run_notification_logic_async(
+    db: AsyncSession | None = None,
+    run_key: str | None = None,
+    now: datetime | None = None,
+    due_only: bool = False,
+):
     """
     Główna logika asynchroniczna. Przyjmuje opcjonalną sesję DB dla testowalności.
+    Z `due_only` obsługuje tylko użytkowników, u których minęła już wybrana
+    godzina wysyłki, a nie zostali obsłużeni za dzisiejszą datę lokalną;
+    bez niego - wszystkich (ręczne uruchomienie).
+
+    Użytkownicy są przetwarzani partiami rosnąco po id. Maile trafiają do
+    outboxa w tym samym commicie co dziennik powiadomień i punkt kontrolny
+    przebiegu, więc restart workera nie wysyła nikomu drugiego maila o tym samym.
     """
-    start_time = datetime.now(timezone.utc)
+    start_time = now or datetime.now(timezone.utc)
     logger.info(f"Uruchamiam logikę asynchroniczną o {start_time.isoformat()}")
 
     async with get_db_session(db) as session:
         try:
-            today_utc_date = start_time.date()
-            expiration_threshold_date = today_utc_date + timedelta(
-                days=EXPIRATION_NOTIFICATION_DAYS
+            thresholds = notification_thresholds()
+            run = await _start_run(session, run_key or start_time.date().isoformat())
+            audience = (
+                await _due_bucket_filter(session, start_time) if due_only else true()
             )
-            stmt = (
-                select(User)
-                .options(
-                    selectinload(User.pantry_associations)
-                    .selectinload(PantryUser.pantry)
-                    .selectinload(Pantry.products)
+
+            users_notified = 0
+            while True:
+                users = (
+                    (
+                        await session.execute(
+                            select(User)
+                            .where(
+                                User.is_verified,
+                                User.send_expiration_notifications,
+                                User.id > run.last_user_id,
+                                audience,
+                            )
+                            .order_by(User.id)
+                            .limit(RENDER_BATCH_SIZE)
+                        )
+                    )
+                    .scalars()
+                    .all()
                 )
-                .where(User.is_verified, User.send_expiration_notifications)
-            )
-            result = await session.execute(stmt)
-            users_with_pantries = result.scalars().unique().all()
-
-            notifications = defaultdict(list)
-            for user in users_with_pantries:
-                for pantry_user_assoc in user.pantry_associations:
-                    pantry = pantry_user_assoc.pantry
-                    for product in pantry.products:
-                        if (
-                            product.current_amount > 0
-                            and product.expiration_date
-                            and today_utc_date
-                            <= product.expiration_date
-                            <= expiration_threshold_date
-                        ):
-                            notifications[user].append(product)
-            if not notifications:
-                logger.info("Brak produktów do powiadomienia. Kończę zadanie.")
-                return {"status": "success", "message": "No products to notify."}
-            for user, products_to_notify in notifications.items():
-                logger.info(
-                    f"Przygotowuję powiadomienie dla {user.email} o {len(products_to_notify)} produktach."
+                if not users:
+                    break
+
+                today_by_user = {
+                    user.id: local_date(user, start_time) for user in users
+                }
+                pending = await _pending_announcements(
+                    session, today_by_user, thresholds
                 )
-                products_data_for_template = [
-                    {
-                        "name": p.name,
-                        "pantry_name": p.pantry.name,
-                        "expiration_date": p.expiration_date.strftime("%Y-%m-%d"),
-                        "is_expired": p.expiration_date < today_utc_date,
-                        "quantity": p.current_amount,
-                        "unit": p.unit,
-                    }
-                    for p in sorted(products_to_notify, key=lambda p: p.expiration_date)
+                batch = [
+                    (user, pending[user.id]) for user in users if user.id in pending
                 ]
-                html_body = await render_template(
+                contexts = []
+                for user, announcements in batch:
+                    logger.info(
+                        f"Przygotowuję powiadomienie dla {user.email} o {len(announcements)} produktach."
+                    )
+                    contexts.append(
+                        _notification_context(
+                            user, [p for p, _ in announcements], today_by_user[user.id]
+                        )
+                    )
+                html_bodies = await render_batch(
                     "email_expiration_notification.html",
-                    email=user.email,
-                    products=products_data_for_template,
+                    contexts,
                     now=datetime.now(timezone.utc),
                 )
-                try:
-                    await send_email_async(
+                for (user, announcements), html_body in zip(batch, html_bodies):
+                    enqueue_email(
+                        session,
                         to_email=user.email,
                         subject="🔔 Food Tracker: Twoje produkty wkrótce stracą ważność!",
                         body="Twoje produkty wkrótce stracą ważność...",
                         html=html_body,
                     )
-                    logger.info(f"Pomyślnie wysłano powiadomienie do {user.email}.")
-                except Exception as email_exc:
-                    logger.error(
-                        f"Nie udało się wysłać emaila do {user.email}: {email_exc}",
-                        exc_info=True,
+                    session.add_all(
+                        NotificationLog(
+                            user_id=user.id, product_id=product.id, threshold=threshold
+                        )
+                        for product, threshold in announcements
                     )
-            return {"status": "success", "users_notified": len(notifications)}
+                users_notified += len(batch)
+                for user in users:
+                    user.last_notified_on = today_by_user[user.id]
+
+                # Maile, dziennik, daty obsłużenia i punkt kontrolny w jednym commicie.
+                run.last_user_id = users[-1].id
+                await session.commit()
+
+            run.status = RUN_COMPLETED
+            run.finished_at = datetime.now(timezone.utc)
+            await session.commit()
+            if not users_notified:
+                logger.info("Brak produktów do powiadomienia. Kończę zadanie.")
+                return {"status": "success", "message": "No products to notify."}
+            return {"status": "success", "users_notified": users_notified}
         except Exception as e:
             logger.error(f"Wystąpił krytyczny błąd podczas zadania: {e}", exc_info=True)
             return {"status": "error", "error_message": str(e)}
@@ -129,11 +358,32 @@ def notify_expiring_products_task():
     """
     Synchroniczne zadanie Celery, które uruchamia logikę asynchroniczną.
     """
-    logger.info("Otrzymano zadanie Celery. Uruchamiam asyncio.run().")
+    logger.info("Otrzymano zadanie Celery. Uruchamiam logikę asynchroniczną.")
     try:
-        result = asyncio.run(_run_notification_logic_async())
+        result = run_async(_run_notification_logic_async())
         logger.info(f"Logika asynchroniczna zakończona z wynikiem: {result}")
         return result
     except Exception as e:
         logger.error(f"Błąd na poziomie wrappera Celery: {e}", exc_info=True)
         return {"status": "critical_error", "error_message": str(e)}
+
+
+@shared_task(name="notifications.notify_send_hour_bucket")
+def notify_send_hour_bucket_task():
+    """
+    Cogodzinne zadanie Celery: powiadamia tylko użytkowników, u których
+    minęła już wybrana godzina lokalna, zamiast wszystkich naraz o 08:00 UTC.
+    Użytkownicy pominięci przez wcześniejszy przebieg są nadrabiani.
+    """
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    try:
+        result = run_async(
+            _run_notification_logic_async(
+                run_key=now.strftime("%Y-%m-%d@%H"), now=now, due_only=True
+            )
+        )
+        logger.info(f"Przebieg {now:%Y-%m-%d@%H} zakończony z wynikiem: {result}")
+        return result
+    except Exception as e:
+        logger.error(f"Błąd na poziomie wrappera Celery: {e}", exc_info=True)
+        return {"status": "critical_error", "error_message": str(e)}
@@ -3,7 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from typing import List
 
-from foodtracker_app.db.database import get_async_session
+from foodtracker_app.db.routing import get_read_session
 from foodtracker_app.models import Category
 from foodtracker_app.schemas.category import CategoryRead
 
@@ -16,7 +16,7 @@ router = APIRouter()
     summary="Pobierz listę wszystkich kategorii",
     tags=["Categories"],
 )
-async def get_all_categories(db: AsyncSession = Depends(get_async_session)):
+async def get_all_categories(db: AsyncSession = Depends(get_read_session)):
     """
     Zwraca listę wszystkich dostępnych kategorii produktów.
     """
@@ -0,0 +1,33 @@
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from foodtracker_app.auth.dependancies import get_current_user
+from foodtracker_app.auth.schemas import ExpiringFeed
+from foodtracker_app.db.routing import get_read_session
+from foodtracker_app.models import User
+from foodtracker_app.services import product_service
+
+router = APIRouter()
+
+
+@router.get(
+    "/expiring",
+    response_model=ExpiringFeed,
+    summary="Produkty tracące ważność ze wszystkich spiżarni użytkownika",
+)
+async def get_my_expiring_products(
+    days: int = Query(7, gt=0),
+    since: Optional[datetime] = Query(None),
+    db: AsyncSession = Depends(get_read_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Bez `since` zwraca pełną listę. Z `since` (np. `server_time` z poprzedniej
+    odpowiedzi) zwraca tylko zmiany od tego momentu.
+    """
+    return await product_service.get_expiring_feed(
+        db, current_user.id, days=days, since=since
+    )
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
@@ -15,8 +16,9 @@ from foodtracker_app.auth.dependancies import (
     get_pantry_for_user,
     require_pantry_owner,
 )
-from foodtracker_app.services import pantry_service
+from foodtracker_app.services import pantry_events, pantry_service
 from foodtracker_app.settings import settings
+from foodtracker_app.utils.fast_json import fast_response
 
 router = APIRouter()
 
@@ -46,7 +48,7 @@ async def get_all_user_pantries(
     current_user: User = Depends(get_current_user),
 ):
     pantries = await pantry_service.get_user_pantries(db=db, user=current_user)
-    return pantries
+    return fast_response(List[PantryRead], pantries)
 
 
 @router.put("/{pantry_id}", response_model=PantryRead, summary="Zmień nazwę spiżarni")
@@ -69,6 +71,9 @@ async def remove_pantry_member(
     db: AsyncSession = Depends(get_async_session),
 ):
     await pantry_service.delete_pantry_member(db, pantry, member_id)
+    await pantry_events.publish_membership_event(
+        pantry.id, pantry_events.MEMBER_REMOVED, member_id
+    )
     return
 
 
@@ -83,6 +88,9 @@ async def leave_pantry_endpoint(
     db: AsyncSession = Depends(get_async_session),
 ):
     await pantry_service.leave_pantry(db, pantry, user)
+    await pantry_events.publish_membership_event(
+        pantry.id, pantry_events.MEMBER_REMOVED, user.id
+    )
     return
 
 
@@ -93,7 +101,11 @@ async def delete_pantry_endpoint(
     pantry: Pantry = Depends(require_pantry_owner),
     db: AsyncSession = Depends(get_async_session),
 ):
+    pantry_id = pantry.id
     await pantry_service.delete_pantry(db, pantry)
+    await pantry_events.publish_membership_event(
+        pantry_id, pantry_events.PANTRY_DELETED
+    )
     return
 
 
@@ -107,3 +119,22 @@ async def create_pantry_invitation(
     db: AsyncSession = Depends(get_async_session),
 ):
     return await pantry_service.create_invitation(db, pantry, settings.FRONTEND_URL)
+
+
+@router.get("/{pantry_id}/events", summary="Strumień zmian w spiżarni (SSE)")
+async def stream_pantry_events(
+    request: Request,
+    pantry: Pantry = Depends(get_pantry_for_user),
+    user: User = Depends(get_current_user),
+):
+    """
+    Server-Sent Events ze zmianami produktów w spiżarni (dodanie, edycja,
+    zużycie, wyrzucenie, usunięcie), żeby klient mógł aktualizować lokalny
+    stan zamiast odpytywać całą listę. Strumień jest zamykany po usunięciu
+    użytkownika ze spiżarni lub usunięciu spiżarni.
+    """
+    return StreamingResponse(
+        pantry_events.event_stream(request, pantry.id, user.id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
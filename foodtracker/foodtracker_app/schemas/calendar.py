@@ -0,0 +1,32 @@
+from datetime import date
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from foodtracker_app.auth.schemas import ProductOut
+
+
+class CalendarPantryBreakdown(BaseModel):
+    pantry_id: int
+    pantry_name: str
+    count: int
+    value: float
+
+
+class CalendarDay(BaseModel):
+    date: date
+    count: int
+    value: float
+    pantries: List[CalendarPantryBreakdown]
+
+
+class CalendarMonth(BaseModel):
+    year: int
+    month: int
+    days: List[CalendarDay]
+
+
+class CalendarDayPage(BaseModel):
+    date: date
+    items: List[ProductOut]
+    next_cursor: Optional[int] = None
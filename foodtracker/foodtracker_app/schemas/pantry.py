@@ -7,6 +7,7 @@ class PantryUser_User(BaseModel):
     id: int
     email: EmailStr
     avatar_url: Optional[str] = None
+    avatar_thumbnail_url: Optional[str] = None
     model_config = ConfigDict(from_attributes=True)
 
 
@@ -0,0 +1,75 @@
+"""Test obciążeniowy puli połączeń dla kilku rozmiarów puli.
+
+Uruchomienie (z katalogu foodtracker, z ustawionym DATABASE_URL na Postgresa):
+    python -m foodtracker_app.scripts.db_pool_benchmark --sizes 2 5 10 20
+"""
+
+import argparse
+import asyncio
+import time
+
+from foodtracker_app.db.database import build_engine_options, get_pool_stats
+from foodtracker_app.settings import settings
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+# Symuluje typowe zapytanie endpointu: krótka praca po stronie bazy.
+QUERY = text("SELECT pg_sleep(:delay)")
+
+
+async def run_for_pool_size(
+    pool_size: int, workers: int, duration: float, delay: float
+) -> dict:
+    options = build_engine_options(settings.DATABASE_URL)
+    options.update(pool_size=pool_size, max_overflow=0)
+    engine = create_async_engine(settings.DATABASE_URL, **options)
+
+    completed = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal completed
+        while time.perf_counter() < deadline:
+            async with engine.connect() as conn:
+                await conn.execute(QUERY, {"delay": delay})
+            completed += 1
+
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        elapsed = time.perf_counter() - started
+        stats = get_pool_stats(engine)
+    finally:
+        await engine.dispose()
+
+    return {
+        "pool_size": pool_size,
+        "requests": completed,
+        "throughput_rps": completed / elapsed,
+        "avg_wait_ms": 1000 * stats["wait_time_total_seconds"] / max(completed, 1),
+        "max_wait_ms": 1000 * stats["wait_time_max_seconds"],
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2, 5, 10, 20])
+    parser.add_argument("--workers", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--delay", type=float, default=0.01)
+    args = parser.parse_args()
+
+    print(
+        f"{'pool':>6} {'requests':>10} {'req/s':>10} {'avg wait':>10} {'max wait':>10}"
+    )
+    for size in args.sizes:
+        result = await run_for_pool_size(size, args.workers, args.duration, args.delay)
+        print(
+            f"{result['pool_size']:>6} {result['requests']:>10} "
+            f"{result['throughput_rps']:>10.1f} "
+            f"{result['avg_wait_ms']:>8.2f}ms {result['max_wait_ms']:>8.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,90 @@
+"""Test obciążeniowy logowania: równoległe /auth/login i jednoczesne
+sondowanie /health. Czas odpowiedzi /health pokazuje, czy hashowanie haseł
+blokuje pętlę zdarzeń (przy blokowaniu rośnie do setek ms).
+
+Uruchomienie (serwer musi działać, konto musi istnieć i być zweryfikowane):
+    python -m foodtracker_app.scripts.login_load_test \\
+        --url http://localhost:8000 --email test@example.com --password secret \\
+        --concurrency 20 --duration 15
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+async def login_worker(
+    client: httpx.AsyncClient, email: str, password: str, deadline: float, stats
+):
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = await client.post(
+            "/auth/login", json={"email": email, "password": password}
+        )
+        stats["latencies"].append(time.perf_counter() - started)
+        stats["statuses"][response.status_code] = (
+            stats["statuses"].get(response.status_code, 0) + 1
+        )
+
+
+async def health_probe(client: httpx.AsyncClient, deadline: float, samples: list):
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        await client.get("/health")
+        samples.append(time.perf_counter() - started)
+        await asyncio.sleep(0.05)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=15.0)
+    args = parser.parse_args()
+
+    stats = {"latencies": [], "statuses": {}}
+    health_samples: list[float] = []
+    limits = httpx.Limits(max_connections=args.concurrency + 5)
+
+    async with httpx.AsyncClient(
+        base_url=args.url, limits=limits, timeout=60.0
+    ) as client:
+        deadline = time.perf_counter() + args.duration
+        await asyncio.gather(
+            health_probe(client, deadline, health_samples),
+            *(
+                login_worker(client, args.email, args.password, deadline, stats)
+                for _ in range(args.concurrency)
+            ),
+        )
+
+    logins = stats["latencies"]
+    print(f"logowania:      {len(logins)} ({len(logins) / args.duration:.1f}/s)")
+    print(f"statusy:        {stats['statuses']}")
+    print(
+        f"login p50/p95:  {1000 * percentile(logins, 0.5):.0f}ms / "
+        f"{1000 * percentile(logins, 0.95):.0f}ms"
+    )
+    print(
+        f"/health p50/p95/max: {1000 * percentile(health_samples, 0.5):.1f}ms / "
+        f"{1000 * percentile(health_samples, 0.95):.1f}ms / "
+        f"{1000 * max(health_samples, default=0):.1f}ms"
+    )
+    if health_samples:
+        print(f"/health średnio: {1000 * statistics.mean(health_samples):.1f}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
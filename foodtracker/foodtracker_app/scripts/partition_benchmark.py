@@ -0,0 +1,189 @@
+"""Porównanie zwykłej tabeli products z tabelą partycjonowaną HASH po pantry_id:
+lista produktów spiżarni (jak w get_products), statystyki spiżarni (jak w
+get_product_stats) oraz czas VACUUM po fali zmian.
+
+Dane trafiają do osobnego schematu, który na końcu jest usuwany - tabela
+products aplikacji nie jest dotykana. Partycje 0 oznaczają zwykłą tabelę.
+
+Uruchomienie (z katalogu foodtracker, z ustawionym DATABASE_URL na Postgresa):
+    python -m foodtracker_app.scripts.partition_benchmark --rows 2000000 \\
+        --pantries 20000 --partitions 0 8 16
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from foodtracker_app.db.database import build_engine_options
+from foodtracker_app.settings import settings
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+SCHEMA = "partition_bench"
+
+LIST_QUERY = """
+    SELECT * FROM {table}
+    WHERE pantry_id = :pantry_id
+    ORDER BY expiration_date
+"""
+STATS_QUERY = """
+    SELECT
+        sum(CASE WHEN unit = 'szt.' THEN initial_amount ELSE 1 END),
+        sum(CASE WHEN unit = 'szt.'
+            THEN initial_amount - current_amount - wasted_amount
+            ELSE CASE WHEN current_amount = 0 AND 2 * wasted_amount <= initial_amount
+                THEN 1 ELSE 0 END END),
+        sum(CASE WHEN unit = 'szt.' THEN wasted_amount
+            ELSE CASE WHEN current_amount = 0 AND 2 * wasted_amount > initial_amount
+                THEN 1 ELSE 0 END END)
+    FROM {table}
+    WHERE pantry_id = :pantry_id
+"""
+
+
+async def create_table(
+    conn: AsyncConnection, table: str, partitions: int, rows: int, pantries: int
+) -> None:
+    # Kolumny i ograniczenia CHECK jak w prawdziwej tabeli; bez domyślnych
+    # wartości, żeby nie zużywać sekwencji products_id_seq.
+    partition_clause = "PARTITION BY HASH (pantry_id)" if partitions else ""
+    await conn.execute(
+        text(
+            f"CREATE TABLE {table} (LIKE public.products INCLUDING CONSTRAINTS) "
+            f"{partition_clause}"
+        )
+    )
+    for remainder in range(partitions):
+        await conn.execute(
+            text(
+                f"CREATE TABLE {table}_p{remainder} PARTITION OF {table} "
+                f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+            )
+        )
+    await conn.execute(
+        text(
+            f"""
+            INSERT INTO {table} (
+                id, name, expiration_date, created_at, updated_at, pantry_id,
+                price, unit, initial_amount, current_amount, wasted_amount
+            )
+            SELECT
+                g, 'Produkt ' || g, current_date + (g % 60), now(), now(),
+                1 + (g % :pantries), 9.99,
+                CASE WHEN g % 3 = 0 THEN 'g' ELSE 'szt.' END,
+                4, g % 5, 0
+            FROM generate_series(1, :rows) AS g
+            """
+        ),
+        {"rows": rows, "pantries": pantries},
+    )
+    primary_key = "id, pantry_id" if partitions else "id"
+    await conn.execute(text(f"ALTER TABLE {table} ADD PRIMARY KEY ({primary_key})"))
+    await conn.execute(text(f"CREATE INDEX ON {table} (pantry_id, expiration_date)"))
+    await conn.execute(text(f"CREATE INDEX ON {table} (pantry_id, current_amount)"))
+    await conn.execute(text(f"ANALYZE {table}"))
+
+
+async def time_query(
+    conn: AsyncConnection, query: str, pantry_ids: list[int]
+) -> list[float]:
+    timings = []
+    for pantry_id in pantry_ids:
+        started = time.perf_counter()
+        (await conn.execute(text(query), {"pantry_id": pantry_id})).all()
+        timings.append(1000 * (time.perf_counter() - started))
+    return timings
+
+
+async def time_vacuum(conn: AsyncConnection, table: str, partitions: int) -> tuple:
+    """
+    Zużywa co dwudziesty produkt i mierzy VACUUM całej tabeli oraz
+    najdłuższy VACUUM pojedynczej partycji - tyle trwa jedna porcja pracy
+    autovacuum.
+    """
+    await conn.execute(text(f"UPDATE {table} SET current_amount = 0 WHERE id % 20 = 0"))
+    started = time.perf_counter()
+    await conn.execute(text(f"VACUUM {table}"))
+    total = time.perf_counter() - started
+
+    # Druga, taka sama fala zmian - do pomiaru partycji jedna po drugiej.
+    await conn.execute(text(f"UPDATE {table} SET current_amount = 1 WHERE id % 20 = 0"))
+    largest = total
+    if partitions:
+        largest = 0.0
+        for remainder in range(partitions):
+            started = time.perf_counter()
+            await conn.execute(text(f"VACUUM {table}_p{remainder}"))
+            largest = max(largest, time.perf_counter() - started)
+    return total, largest
+
+
+def p95(timings: list[float]) -> float:
+    return statistics.quantiles(timings, n=20)[-1]
+
+
+async def run_for_layout(
+    conn: AsyncConnection, partitions: int, args: argparse.Namespace
+) -> dict:
+    table = f"{SCHEMA}.products_{partitions}"
+    await create_table(conn, table, partitions, args.rows, args.pantries)
+
+    pantry_ids = [random.randint(1, args.pantries) for _ in range(args.samples)]
+    list_ms = await time_query(conn, LIST_QUERY.format(table=table), pantry_ids)
+    stats_ms = await time_query(conn, STATS_QUERY.format(table=table), pantry_ids)
+    vacuum_s, largest_vacuum_s = await time_vacuum(conn, table, partitions)
+
+    await conn.execute(text(f"DROP TABLE {table}"))
+    return {
+        "partitions": partitions,
+        "list_avg_ms": statistics.mean(list_ms),
+        "list_p95_ms": p95(list_ms),
+        "stats_avg_ms": statistics.mean(stats_ms),
+        "stats_p95_ms": p95(stats_ms),
+        "vacuum_s": vacuum_s,
+        "largest_vacuum_s": largest_vacuum_s,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--pantries", type=int, default=10_000)
+    parser.add_argument("--partitions", type=int, nargs="+", default=[0, 8, 16])
+    parser.add_argument("--samples", type=int, default=500)
+    args = parser.parse_args()
+
+    engine = create_async_engine(
+        settings.DATABASE_URL, **build_engine_options(settings.DATABASE_URL)
+    )
+    print(
+        f"{'partitions':>10} {'list avg':>10} {'list p95':>10} {'stats avg':>10} "
+        f"{'stats p95':>10} {'vacuum':>9} {'max part.':>9}"
+    )
+    try:
+        # VACUUM nie może działać w transakcji.
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {SCHEMA}"))
+            try:
+                for partitions in args.partitions:
+                    result = await run_for_layout(conn, partitions, args)
+                    print(
+                        f"{result['partitions']:>10} "
+                        f"{result['list_avg_ms']:>8.2f}ms "
+                        f"{result['list_p95_ms']:>8.2f}ms "
+                        f"{result['stats_avg_ms']:>8.2f}ms "
+                        f"{result['stats_p95_ms']:>8.2f}ms "
+                        f"{result['vacuum_s']:>8.2f}s "
+                        f"{result['largest_vacuum_s']:>8.2f}s"
+                    )
+            finally:
+                await conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,110 @@
+"""Porównanie kosztu serializacji list produktów: domyślna ścieżka FastAPI
+(walidacja response_model + json) kontra fast_response (jedna walidacja
+i serializacja przez pydantic-core).
+
+Uruchomienie (z katalogu foodtracker):
+    python -m foodtracker_app.scripts.serialization_benchmark --sizes 1000 10000
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Callable, List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from foodtracker_app.auth.schemas import ProductExpiringSoon, ProductOut
+from foodtracker_app.models import Category, Product
+from foodtracker_app.utils.fast_json import fast_response
+
+
+def build_products(count: int) -> list[Product]:
+    category = Category(id=1, name="Nabiał", icon_name="milk")
+    today = date.today()
+    return [
+        Product(
+            id=i,
+            name=f"Produkt {i}",
+            expiration_date=today + timedelta(days=i % 30),
+            external_id=str(5900000000000 + i),
+            pantry_id=1,
+            price=Decimal("12.99"),
+            unit="szt.",
+            initial_amount=Decimal("4"),
+            current_amount=Decimal("3"),
+            wasted_amount=Decimal("1"),
+            category=category,
+        )
+        for i in range(count)
+    ]
+
+
+def build_expiring(products: list[Product]) -> list[ProductExpiringSoon]:
+    today = date.today()
+    return [
+        ProductExpiringSoon(
+            id=p.id,
+            name=p.name,
+            expiration_date=p.expiration_date,
+            external_id=p.external_id,
+            days_left=(p.expiration_date - today).days,
+            current_amount=float(p.current_amount),
+            unit=p.unit,
+        )
+        for p in products
+    ]
+
+
+async def fastapi_default(schema, data) -> bytes:
+    field = create_model_field("Response", schema, mode="serialization")
+    content = await serialize_response(field=field, response_content=data)
+    return JSONResponse(content).body
+
+
+async def fast_path(schema, data) -> bytes:
+    return fast_response(schema, data).body
+
+
+async def measure(render: Callable, schema, data, repeat: int) -> tuple[float, int]:
+    best = float("inf")
+    size = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = await render(schema, data)
+        best = min(best, time.perf_counter() - started)
+        size = len(body)
+    return best, size
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(
+        f"{'case':>10} {'rows':>7} {'fastapi':>10} {'fast':>10} {'speedup':>8} {'bytes':>10}"
+    )
+    for count in args.sizes:
+        products = build_products(count)
+        cases = [
+            ("products", List[ProductOut], products),
+            ("expiring", List[ProductExpiringSoon], build_expiring(products)),
+        ]
+        for name, schema, data in cases:
+            default_time, size = await measure(
+                fastapi_default, schema, data, args.repeat
+            )
+            fast_time, _ = await measure(fast_path, schema, data, args.repeat)
+            print(
+                f"{name:>10} {count:>7} {1000 * default_time:>8.1f}ms "
+                f"{1000 * fast_time:>8.1f}ms {default_time / fast_time:>7.1f}x "
+                f"{size:>10}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,99 @@
+"""Renderowanie maili z powiadomieniami dla wielu odbiorców: dotychczasowa
+ścieżka (get_template + osobne przejście do puli wątków na każdy mail)
+kontra render_batch (jedno przejście na paczkę), oraz zimny start procesu
+ze wspólnym bytecode cache i bez niego.
+
+Uruchomienie (z katalogu foodtracker):
+    python -m foodtracker_app.scripts.template_benchmark --recipients 10000
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+from starlette.concurrency import run_in_threadpool
+
+from foodtracker_app.notifications.tasks import RENDER_BATCH_SIZE
+from foodtracker_app.utils.template_utils import TEMPLATES_DIR, render_batch
+
+TEMPLATE = "email_expiration_notification.html"
+
+
+def build_contexts(recipients: int, products: int) -> list[dict]:
+    today = date.today()
+    return [
+        {
+            "email": f"user{i}@example.com",
+            "products": [
+                {
+                    "name": f"Produkt {j}",
+                    "pantry_name": "Domowa spiżarnia",
+                    "expiration_date": (today + timedelta(days=j)).isoformat(),
+                    "is_expired": False,
+                    "quantity": 1,
+                    "unit": "szt.",
+                }
+                for j in range(products)
+            ],
+        }
+        for i in range(recipients)
+    ]
+
+
+async def per_email(contexts: list[dict], now: datetime) -> float:
+    env = Environment(loader=FileSystemLoader(TEMPLATES_DIR), autoescape=True)
+    started = time.perf_counter()
+    for context in contexts:
+        template = env.get_template(TEMPLATE)
+        await run_in_threadpool(template.render, now=now, **context)
+    return time.perf_counter() - started
+
+
+async def batched(contexts: list[dict], now: datetime) -> float:
+    started = time.perf_counter()
+    for offset in range(0, len(contexts), RENDER_BATCH_SIZE):
+        await render_batch(
+            TEMPLATE, contexts[offset : offset + RENDER_BATCH_SIZE], now=now
+        )
+    return time.perf_counter() - started
+
+
+def cold_start(bytecode_dir: str | None) -> float:
+    env = Environment(
+        loader=FileSystemLoader(TEMPLATES_DIR),
+        autoescape=True,
+        bytecode_cache=FileSystemBytecodeCache(bytecode_dir) if bytecode_dir else None,
+    )
+    started = time.perf_counter()
+    for name in env.list_templates(extensions=["html"]):
+        env.get_template(name)
+    return time.perf_counter() - started
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--recipients", type=int, default=10_000)
+    parser.add_argument("--products", type=int, default=5)
+    args = parser.parse_args()
+
+    contexts = build_contexts(args.recipients, args.products)
+    now = datetime.now(timezone.utc)
+
+    old = await per_email(contexts, now)
+    new = await batched(contexts, now)
+    print(f"odbiorcy:            {args.recipients} x {args.products} produktów")
+    print(f"osobno (stara):      {old:.2f}s ({args.recipients / old:.0f}/s)")
+    print(f"render_batch:        {new:.2f}s ({args.recipients / new:.0f}/s)")
+    print(f"przyspieszenie:      {old / new:.1f}x")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cold_start(cache_dir)  # pierwszy proces zapisuje bytecode
+        print(f"zimny start bez cache: {1000 * cold_start(None):.1f}ms")
+        print(f"zimny start z cache:   {1000 * cold_start(cache_dir):.1f}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -8,9 +8,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from foodtracker_app.auth.schemas import Achievement
 from foodtracker_app.models.financial_stats import FinancialStat
 from foodtracker_app.models.product import Product
+from foodtracker_app.models.product_archive import ProductRollup
 from foodtracker_app.models.user import User
 from foodtracker_app.models.pantry import Pantry
 from foodtracker_app.models.pantry_user import PantryUser
+from foodtracker_app.services.statistics_service import rollup_product_stats
 
 ACHIEVEMENT_DEFINITIONS: List[Dict[str, Any]] = [
     {
@@ -208,9 +210,28 @@ ACHIEVEMENT_DEFINITIONS: List[Dict[str, Any]] = [
 ]
 
 
-async def _get_progress_data(db: AsyncSession, user: User) -> Dict[str, Any]:
-    today = date.today()
-    dialect = db.bind.dialect.name
+HEALTHY_KEYWORDS = [
+    "%sałata%",
+    "%owoc%",
+    "%warzywo%",
+    "%pomidor%",
+    "%ogórek%",
+    "%brokuł%",
+    "%marchew%",
+    "%jabłko%",
+    "%banan%",
+    "%szpinak%",
+    "%kurczak%",
+    "%ryba%",
+    "%jogurt%",
+]
+
+
+def activity_conditions(dialect: str) -> Dict[str, Any]:
+    """
+    Warunki liczników osiągnięć zależnych od nazwy i czasu dodania
+    produktu. Używane też przy archiwizacji, żeby rollup liczył to samo.
+    """
     if dialect == "postgresql":
         day_of_week = func.extract("isodow", Product.created_at)
     else:
@@ -219,28 +240,24 @@ async def _get_progress_data(db: AsyncSession, user: User) -> Dict[str, Any]:
             else_=cast(func.strftime("%w", Product.created_at), Integer),
         )
 
-    healthy_keywords = [
-        "%sałata%",
-        "%owoc%",
-        "%warzywo%",
-        "%pomidor%",
-        "%ogórek%",
-        "%brokuł%",
-        "%marchew%",
-        "%jabłko%",
-        "%banan%",
-        "%szpinak%",
-        "%kurczak%",
-        "%ryba%",
-        "%jogurt%",
-    ]
+    return {
+        "cheese_products": Product.name.ilike("%ser%"),
+        "night_actions": func.extract("hour", Product.created_at).between(0, 4),
+        "sunday_adds": day_of_week == 7,
+        "weekend_adds": day_of_week.in_([6, 7]),
+        "morning_caffeine_add": and_(
+            func.extract("hour", Product.created_at) < 9,
+            or_(Product.name.ilike("%kawa%"), Product.name.ilike("%herbata%")),
+        ),
+        "healthy_monday_add": and_(
+            day_of_week == 1, or_(*[Product.name.ilike(k) for k in HEALTHY_KEYWORDS])
+        ),
+    }
 
-    base_query = (  # noqa : F401
-        select(Product)
-        .join(Pantry)
-        .join(PantryUser)
-        .where(PantryUser.user_id == user.id)
-    )
+
+async def _get_progress_data(db: AsyncSession, user: User) -> Dict[str, Any]:
+    today = date.today()
+    activity = activity_conditions(db.bind.dialect.name)
 
     def query_count(where_clause):
         return (
@@ -305,28 +322,22 @@ async def _get_progress_data(db: AsyncSession, user: User) -> Dict[str, Any]:
             .join(PantryUser, PantryUser.pantry_id == Pantry.id)
             .where(PantryUser.user_id == user.id)
         ),
-        "cheese_products": query_count([Product.name.ilike("%ser%")]),
-        "night_actions": query_count(
-            [func.extract("hour", Product.created_at).between(0, 4)]
-        ),
+        **{name: query_count([condition]) for name, condition in activity.items()},
         "active_products_count": query_count([Product.current_amount > 0]),
         "day_add_streak": query_count([cast(Product.created_at, Date) == today]),
-        "sunday_adds": query_count([day_of_week == 7]),
-        "weekend_adds": query_count([day_of_week.in_([6, 7])]),
-        "morning_caffeine_add": query_count(
-            [
-                func.extract("hour", Product.created_at) < 9,
-                or_(Product.name.ilike("%kawa%"), Product.name.ilike("%herbata%")),
-            ]
-        ),
-        "healthy_monday_add": query_count(
-            [day_of_week == 1, or_(*[Product.name.ilike(k) for k in healthy_keywords])]
-        ),
         "total_spent_value": select(func.sum(Product.price * Product.initial_amount))
         .select_from(Product)
         .join(Pantry)
         .join(PantryUser)
         .where(PantryUser.user_id == user.id),
+        # Wkład zarchiwizowanych produktów.
+        "archived": select(
+            *rollup_product_stats(),
+            func.sum(ProductRollup.spent_value).label("spent_value"),
+            *[func.sum(getattr(ProductRollup, name)).label(name) for name in activity],
+        )
+        .join(PantryUser, PantryUser.pantry_id == ProductRollup.pantry_id)
+        .where(PantryUser.user_id == user.id),
     }
 
     results = await asyncio.gather(*(db.execute(q) for q in queries.values()))
@@ -334,16 +345,13 @@ async def _get_progress_data(db: AsyncSession, user: User) -> Dict[str, Any]:
 
     p_stats = res_map["product_stats"].one_or_none()
     f_stats_row = res_map["financial_stats"].one_or_none()
+    archived = res_map["archived"].one()
 
-    p_stats_dict = (
-        {
-            "used": p_stats.used or 0,
-            "total": p_stats.total or 0,
-            "wasted": p_stats.wasted or 0,
-        }
-        if p_stats
-        else {"used": 0, "total": 0, "wasted": 0}
-    )
+    p_stats_dict = {
+        key: ((getattr(p_stats, key) or 0) if p_stats else 0)
+        + (getattr(archived, key) or 0)
+        for key in ("used", "total", "wasted")
+    }
 
     progress_data = {
         "saved_products": int(p_stats_dict["used"]),
@@ -352,16 +360,15 @@ async def _get_progress_data(db: AsyncSession, user: User) -> Dict[str, Any]:
         "money_saved": float(f_stats_row.total_saved)
         if f_stats_row and f_stats_row.total_saved
         else 0.0,
-        "cheese_products": res_map["cheese_products"].scalar_one() or 0,
-        "night_actions": res_map["night_actions"].scalar_one() or 0,
+        **{
+            name: (res_map[name].scalar_one() or 0) + (getattr(archived, name) or 0)
+            for name in activity
+        },
         "active_products_count": res_map["active_products_count"].scalar_one() or 0,
         "day_add_streak": res_map["day_add_streak"].scalar_one() or 0,
-        "sunday_adds": res_map["sunday_adds"].scalar_one() or 0,
-        "weekend_adds": res_map["weekend_adds"].scalar_one() or 0,
-        "healthy_monday_add": res_map["healthy_monday_add"].scalar_one() or 0,
-        "morning_caffeine_add": res_map["morning_caffeine_add"].scalar_one() or 0,
         "total_spent_value": float(
-            res_map["total_spent_value"].scalar_one_or_none() or 0.0
+            (res_map["total_spent_value"].scalar_one_or_none() or 0)
+            + (archived.spent_value or 0)
         ),
         "days_as_user": (today - user.created_at.date()).days if user.created_at else 0,
     }
@@ -0,0 +1,207 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from celery import shared_task
+from sqlalchemy import case, delete, func, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from foodtracker_app.db.database import TZDateTime
+from foodtracker_app.models import (
+    Product,
+    ProductArchive,
+    ProductRollup,
+    ProductTombstone,
+)
+from foodtracker_app.notifications.tasks import get_db_session, run_async
+from foodtracker_app.services.achievement_service import activity_conditions
+from foodtracker_app.services.pantry_service import bump_revision
+from foodtracker_app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_AMOUNTS = ("initial_amount", "saved_amount", "wasted_amount", "spent_value")
+
+
+def _rollup_columns(dialect: str) -> dict:
+    """
+    Wkład pojedynczej partii produktów do rollupu - te same definicje,
+    których używają statystyki i osiągnięcia dla żywych produktów.
+    """
+    is_mostly_wasted = 2 * Product.wasted_amount > Product.initial_amount
+
+    def count_if(condition):
+        return func.sum(case((condition, 1), else_=0))
+
+    return {
+        "products_count": func.count(Product.id),
+        "initial_amount": func.sum(Product.initial_amount),
+        "saved_amount": func.sum(
+            Product.initial_amount - Product.current_amount - Product.wasted_amount
+        ),
+        "wasted_amount": func.sum(Product.wasted_amount),
+        "mostly_used_count": count_if(~is_mostly_wasted),
+        "mostly_wasted_count": count_if(is_mostly_wasted),
+        "spent_value": func.sum(Product.price * Product.initial_amount),
+        **{
+            name: count_if(condition)
+            for name, condition in activity_conditions(dialect).items()
+        },
+    }
+
+
+async def _merge_rollups(session: AsyncSession, product_ids: list[int]) -> None:
+    columns = _rollup_columns(session.bind.dialect.name)
+    groups = (
+        await session.execute(
+            select(
+                Product.pantry_id,
+                Product.category_id,
+                Product.unit,
+                *[expr.label(name) for name, expr in columns.items()],
+            )
+            .where(Product.id.in_(product_ids))
+            .group_by(Product.pantry_id, Product.category_id, Product.unit)
+        )
+    ).all()
+
+    existing = (
+        (
+            await session.execute(
+                select(ProductRollup).where(
+                    ProductRollup.pantry_id.in_({g.pantry_id for g in groups})
+                )
+            )
+        )
+        .scalars()
+        .all()
+    )
+    rollups = {(r.pantry_id, r.category_id, r.unit): r for r in existing}
+
+    for group in groups:
+        key = (group.pantry_id, group.category_id, group.unit)
+        rollup = rollups.get(key)
+        if rollup is None:
+            rollup = ProductRollup(
+                pantry_id=group.pantry_id,
+                category_id=group.category_id,
+                unit=group.unit,
+            )
+            session.add(rollup)
+            rollups[key] = rollup
+        for name in columns:
+            value = getattr(group, name) or 0
+            if name in ROLLUP_AMOUNTS:
+                value = Decimal(str(value)).quantize(Decimal("0.01"))
+            else:
+                value = int(value)
+            setattr(rollup, name, (getattr(rollup, name) or 0) + value)
+
+
+async def archive_consumed_batch(
+    session: AsyncSession, now: datetime, batch_size: int
+) -> int:
+    """
+    Przenosi jedną partię w pełni zużytych produktów do `products_archive`.
+    Rollup, archiwum, tombstone'y i usunięcie idą w jednej transakcji, więc
+    statystyki (żywe produkty + rollup) nie zmieniają się ani na moment.
+    """
+    horizon = now - timedelta(days=settings.PRODUCT_ARCHIVE_AFTER_DAYS)
+    # SKIP LOCKED: produkty edytowane właśnie przez aplikację poczekają
+    # do następnego przebiegu.
+    rows = (
+        await session.execute(
+            select(Product.id, Product.pantry_id)
+            .where(Product.current_amount == 0, Product.updated_at < horizon)
+            .order_by(Product.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+    ).all()
+    if not rows:
+        return 0
+    product_ids = [row.id for row in rows]
+
+    await _merge_rollups(session, product_ids)
+
+    wasted_value = case(
+        (
+            Product.initial_amount > 0,
+            Product.price / Product.initial_amount * Product.wasted_amount,
+        ),
+        else_=0,
+    )
+    await session.execute(
+        insert(ProductArchive).from_select(
+            [
+                "id",
+                "pantry_id",
+                "category_id",
+                "name",
+                "external_id",
+                "expiration_date",
+                "price",
+                "unit",
+                "initial_amount",
+                "wasted_amount",
+                "wasted_value",
+                "created_at",
+                "consumed_at",
+                "archived_at",
+            ],
+            select(
+                Product.id,
+                Product.pantry_id,
+                Product.category_id,
+                Product.name,
+                Product.external_id,
+                Product.expiration_date,
+                Product.price,
+                Product.unit,
+                Product.initial_amount,
+                Product.wasted_amount,
+                wasted_value,
+                Product.created_at,
+                Product.updated_at,
+                literal(now, TZDateTime()),
+            ).where(Product.id.in_(product_ids)),
+        )
+    )
+
+    # Klienci synchronizujący przyrostowo mają zobaczyć zniknięcie produktów.
+    session.add_all(
+        ProductTombstone(product_id=row.id, pantry_id=row.pantry_id) for row in rows
+    )
+    for pantry_id in {row.pantry_id for row in rows}:
+        await bump_revision(session, pantry_id)
+
+    await session.execute(
+        delete(Product)
+        .where(Product.id.in_(product_ids))
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+    return len(product_ids)
+
+
+async def _archive_async(
+    db: AsyncSession | None = None, now: datetime | None = None
+) -> dict:
+    now = now or datetime.now(timezone.utc)
+    batch_size = settings.PRODUCT_ARCHIVE_BATCH_SIZE
+
+    async with get_db_session(db) as session:
+        total = 0
+        while True:
+            archived = await archive_consumed_batch(session, now, batch_size)
+            total += archived
+            if archived < batch_size:
+                return {"archived": total}
+
+
+@shared_task(name="maintenance.archive_consumed_products")
+def archive_consumed_products_task():
+    """Synchroniczne zadanie Celery archiwizujące dawno zużyte produkty."""
+    result = run_async(_archive_async())
+    logger.info(f"Archiwizacja zakończona: {result}")
+    return result
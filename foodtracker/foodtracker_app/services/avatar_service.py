@@ -0,0 +1,103 @@
+import io
+from typing import BinaryIO
+from uuid import uuid4
+
+import magic
+from fastapi import HTTPException, UploadFile
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from foodtracker_app.services.avatar_storage import AvatarStorage
+
+MAX_FILE_SIZE = 5 * 1024 * 1024
+SNIFF_BYTES = 1024
+ALLOWED_MIME_TYPES = {"image/png", "image/jpeg"}
+# Zabezpieczenie przed "bombami dekompresyjnymi" - mały plik, ogromny obraz.
+MAX_IMAGE_PIXELS = 40_000_000
+AVATAR_CONTENT_TYPE = "image/jpeg"
+AVATAR_QUALITY = 85
+
+
+class InvalidImageError(ValueError):
+    pass
+
+
+def avatar_key(user_id: int) -> str:
+    return f"user_{user_id}"
+
+
+def thumbnail_key(user_id: int) -> str:
+    return f"user_{user_id}_thumb"
+
+
+def _upload_size(file: UploadFile) -> int:
+    if file.size is not None:
+        return file.size
+    position = file.file.tell()
+    file.file.seek(0, io.SEEK_END)
+    size = file.file.tell()
+    file.file.seek(position)
+    return size
+
+
+async def validate_upload(file: UploadFile) -> None:
+    """
+    Sprawdza rozmiar i typ pliku bez wczytywania go do pamięci - Starlette
+    trzyma upload w SpooledTemporaryFile, a do rozpoznania typu wystarcza
+    pierwszy kilobajt.
+    """
+    if _upload_size(file) > MAX_FILE_SIZE:
+        raise HTTPException(413, "Plik jest za duży. Maksymalny rozmiar to 5MB.")
+
+    head = await file.read(SNIFF_BYTES)
+    await file.seek(0)
+    if magic.from_buffer(head, mime=True) not in ALLOWED_MIME_TYPES:
+        raise HTTPException(400, "Niepoprawny typ MIME. Dozwolone: PNG, JPG.")
+
+
+def new_avatar_version() -> str:
+    """Wersja pojedynczego uploadu - trafia do URL-a awatara."""
+    return uuid4().hex[:12]
+
+
+def staged_key(user_id: int, version: str) -> str:
+    return f"{avatar_key(user_id)}_{version}"
+
+
+async def stage_upload(
+    file: UploadFile, storage: AvatarStorage, user_id: int, version: str
+) -> str:
+    """
+    Waliduje upload i kopiuje go porcjami do niepublicznej części magazynu
+    awatarów. Zwraca klucz, który trafia do zadania Celery zamiast bajtów
+    obrazka - wiadomość w brokerze zostaje mała.
+    """
+    await validate_upload(file)
+    key = staged_key(user_id, version)
+    if not await storage.stage(key, file.file):
+        raise HTTPException(503, "Nie udało się zapisać pliku. Spróbuj ponownie.")
+    return key
+
+
+def render_avatars(source: BinaryIO, sizes: dict[str, int]) -> dict[str, bytes]:
+    """
+    Dekoduje obraz raz, a potem dla każdego rozmiaru kadruje go do kwadratu,
+    zmniejsza i zapisuje jako JPEG.
+    """
+    try:
+        with Image.open(source) as image:
+            if image.width * image.height > MAX_IMAGE_PIXELS:
+                raise InvalidImageError("Obraz ma zbyt dużą rozdzielczość.")
+            # JPEG dekoduje od razu w zmniejszonej skali - dużo mniej pracy i pamięci.
+            largest = max(sizes.values())
+            image.draft("RGB", (largest, largest))
+            image = ImageOps.exif_transpose(image).convert("RGB")
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        raise InvalidImageError("Nie udało się odczytać obrazka.")
+
+    rendered = {}
+    for name, size in sizes.items():
+        avatar = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+        output = io.BytesIO()
+        avatar.save(output, format="JPEG", quality=AVATAR_QUALITY, optimize=True)
+        rendered[name] = output.getvalue()
+    return rendered
@@ -0,0 +1,130 @@
+import asyncio
+import mimetypes
+import os
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO
+
+from foodtracker_app.services import cloudinary_service
+from foodtracker_app.settings import settings
+
+LOCAL_URL_PREFIX = "/uploads/avatars"
+COPY_CHUNK_SIZE = 64 * 1024
+
+
+class AvatarStorage(ABC):
+    """
+    Miejsce przechowywania gotowych awatarów (zwraca publiczny URL) oraz
+    niepublicznych oryginałów uploadów czekających na workera Celery.
+    """
+
+    @abstractmethod
+    async def save(self, key: str, data: bytes, content_type: str) -> str | None: ...
+
+    @abstractmethod
+    async def stage(self, key: str, source: BinaryIO) -> bool:
+        """Zapisuje oryginał uploadu, kopiując go porcjami."""
+
+    @abstractmethod
+    async def load_staged(self, key: str) -> bytes | None:
+        """Zawartość oryginału; None, jeśli został już usunięty."""
+
+    @abstractmethod
+    async def discard_staged(self, key: str) -> None: ...
+
+    @abstractmethod
+    def url_for(self, key: str, content_type: str) -> str:
+        """Docelowy URL obiektu, znany zanim zostanie zapisany."""
+
+    def versioned_url(self, key: str, content_type: str, version: str) -> str:
+        """
+        URL konkretnej wersji obiektu. Klucz się nie zmienia, więc wersja
+        w URL omija cache przeglądarki i CDN.
+        """
+        return f"{self.url_for(key, content_type)}?v={version}"
+
+
+class LocalAvatarStorage(AvatarStorage):
+    """
+    Pliki na dysku, serwowane przez aplikację pod /uploads/avatars.
+    Oryginały uploadów leżą obok, w katalogu `<katalog>_staging`, który
+    nie jest serwowany.
+    """
+
+    def __init__(self, directory: str | Path, base_url: str = ""):
+        self.directory = Path(directory)
+        self.staging_directory = self.directory.with_name(
+            f"{self.directory.name}_staging"
+        )
+        self.base_url = base_url.rstrip("/")
+
+    @staticmethod
+    def _write(path: Path, write) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Zapis do pliku tymczasowego i podmiana - nikt nie odczyta połowy obrazka.
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                write(tmp)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @staticmethod
+    def _filename(key: str, content_type: str) -> str:
+        return f"{key}{mimetypes.guess_extension(content_type) or ''}"
+
+    def url_for(self, key: str, content_type: str) -> str:
+        return f"{self.base_url}{LOCAL_URL_PREFIX}/{self._filename(key, content_type)}"
+
+    async def save(self, key: str, data: bytes, content_type: str) -> str | None:
+        path = self.directory / self._filename(key, content_type)
+        await asyncio.to_thread(self._write, path, lambda tmp: tmp.write(data))
+        return self.url_for(key, content_type)
+
+    async def stage(self, key: str, source: BinaryIO) -> bool:
+        await asyncio.to_thread(
+            self._write,
+            self.staging_directory / key,
+            lambda tmp: shutil.copyfileobj(source, tmp, COPY_CHUNK_SIZE),
+        )
+        return True
+
+    async def load_staged(self, key: str) -> bytes | None:
+        try:
+            return await asyncio.to_thread((self.staging_directory / key).read_bytes)
+        except FileNotFoundError:
+            return None
+
+    async def discard_staged(self, key: str) -> None:
+        (self.staging_directory / key).unlink(missing_ok=True)
+
+
+class CloudinaryAvatarStorage(AvatarStorage):
+    """Cloudinary - synchroniczny SDK wywoływany w wątku, poza pętlą zdarzeń."""
+
+    async def save(self, key: str, data: bytes, content_type: str) -> str | None:
+        return await asyncio.to_thread(cloudinary_service.upload_image, data, key)
+
+    def url_for(self, key: str, content_type: str) -> str:
+        return cloudinary_service.image_url(key)
+
+    async def stage(self, key: str, source: BinaryIO) -> bool:
+        return await asyncio.to_thread(cloudinary_service.stage_original, source, key)
+
+    async def load_staged(self, key: str) -> bytes | None:
+        return await asyncio.to_thread(cloudinary_service.download_staged, key)
+
+    async def discard_staged(self, key: str) -> None:
+        await asyncio.to_thread(cloudinary_service.delete_staged, key)
+
+
+@lru_cache
+def get_avatar_storage() -> AvatarStorage:
+    if settings.AVATAR_STORAGE == "local":
+        return LocalAvatarStorage(settings.AVATAR_LOCAL_DIR, settings.BACKEND_URL)
+    return CloudinaryAvatarStorage()
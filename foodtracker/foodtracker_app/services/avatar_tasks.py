@@ -0,0 +1,98 @@
+import asyncio
+import io
+import logging
+
+from celery import shared_task
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from foodtracker_app.models import User
+from foodtracker_app.notifications.tasks import get_db_session, run_async
+from foodtracker_app.services import avatar_service
+from foodtracker_app.services.avatar_storage import AvatarStorage, get_avatar_storage
+from foodtracker_app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class AvatarUploadError(RuntimeError):
+    pass
+
+
+async def _process_avatar_async(
+    user_id: int,
+    staged_key: str,
+    version: str,
+    db: AsyncSession | None = None,
+    storage: AvatarStorage | None = None,
+) -> dict:
+    """
+    Przetwarza oryginał odłożony przez endpoint w magazynie: miniatura
+    (listy członków spiżarni) i pełny rozmiar (profil), zapis w magazynie
+    i aktualizacja URL-i użytkownika. Zapisywany URL zawiera wersję
+    uploadu - ten sam, który endpoint zwrócił klientowi. Oryginał jest
+    usuwany, gdy nie będzie już potrzebny.
+    """
+    storage = storage or get_avatar_storage()
+    original = await storage.load_staged(staged_key)
+    if original is None:
+        logger.warning(f"Brak oryginału {staged_key} - już przetworzony?")
+        return {"status": "missing"}
+    try:
+        images = avatar_service.render_avatars(
+            io.BytesIO(original),
+            {
+                "full": settings.AVATAR_SIZE,
+                "thumbnail": settings.AVATAR_THUMBNAIL_SIZE,
+            },
+        )
+    except avatar_service.InvalidImageError as e:
+        logger.warning(f"Odrzucono awatar użytkownika {user_id}: {e}")
+        await storage.discard_staged(staged_key)
+        return {"status": "invalid", "error_message": str(e)}
+
+    content_type = avatar_service.AVATAR_CONTENT_TYPE
+    keys = {
+        "full": avatar_service.avatar_key(user_id),
+        "thumbnail": avatar_service.thumbnail_key(user_id),
+    }
+    saved = await asyncio.gather(
+        *(storage.save(keys[name], images[name], content_type) for name in keys)
+    )
+    if not all(saved):
+        raise AvatarUploadError(f"Nie udało się zapisać awatara użytkownika {user_id}")
+
+    avatar_url, thumbnail_url = (
+        storage.versioned_url(keys[name], content_type, version) for name in keys
+    )
+    async with get_db_session(db) as session:
+        await session.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(avatar_url=avatar_url, avatar_thumbnail_url=thumbnail_url)
+        )
+        await session.commit()
+
+    await storage.discard_staged(staged_key)
+    return {"status": "success", "avatar_url": avatar_url}
+
+
+@shared_task(
+    name="avatars.process_avatar",
+    bind=True,
+    max_retries=5,
+    default_retry_delay=30,
+)
+def process_avatar_task(self, user_id: int, staged_key: str, version: str):
+    """
+    Synchroniczne zadanie Celery uruchamiające przetwarzanie awatara.
+    Po ostatniej nieudanej próbie oryginał jest usuwany z magazynu.
+    """
+    try:
+        return run_async(_process_avatar_async(user_id, staged_key, version))
+    except AvatarUploadError as e:
+        if self.request.retries >= self.max_retries:
+            run_async(get_avatar_storage().discard_staged(staged_key))
+            raise
+        logger.warning(f"{e} - ponawiam ({self.request.retries + 1})")
+        raise self.retry(exc=e)
@@ -0,0 +1,125 @@
+from datetime import date
+from typing import List
+
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from foodtracker_app.models import Pantry, PantryUser, Product
+from foodtracker_app.schemas.calendar import (
+    CalendarDay,
+    CalendarDayPage,
+    CalendarMonth,
+    CalendarPantryBreakdown,
+)
+
+
+def _month_bounds(year: int, month: int) -> tuple[date, date]:
+    first_day = date(year, month, 1)
+    if month == 12:
+        return first_day, date(year + 1, 1, 1)
+    return first_day, date(year, month + 1, 1)
+
+
+def _user_pantry_ids(user_id: int):
+    return select(PantryUser.pantry_id).where(PantryUser.user_id == user_id)
+
+
+def _active_products_of(user_id: int) -> list:
+    """
+    Produkty widoczne w kalendarzu: ze spiżarni użytkownika i jeszcze nie
+    zużyte. Wspólne dla podsumowania miesiąca i listy produktów dnia, żeby
+    liczba w kafelku zgadzała się z listą po kliknięciu.
+    """
+    return [
+        Product.pantry_id.in_(_user_pantry_ids(user_id)),
+        Product.current_amount > 0,
+    ]
+
+
+async def get_month_summary(
+    db: AsyncSession, user_id: int, year: int, month: int
+) -> CalendarMonth:
+    """
+    Zwraca dzienne podsumowanie aktywnych produktów, których data ważności
+    wypada w danym miesiącu, ze wszystkich spiżarni użytkownika.
+    Jedno zgrupowane zapytanie - dzień x spiżarnia.
+    """
+    first_day, next_month = _month_bounds(year, month)
+
+    remaining_value = case(
+        (
+            Product.initial_amount > 0,
+            Product.price * Product.current_amount / Product.initial_amount,
+        ),
+        else_=0,
+    )
+
+    stmt = (
+        select(
+            Product.expiration_date.label("day"),
+            Product.pantry_id,
+            Pantry.name.label("pantry_name"),
+            func.count(Product.id).label("count"),
+            func.sum(remaining_value).label("value"),
+        )
+        .join(Pantry, Pantry.id == Product.pantry_id)
+        .where(
+            *_active_products_of(user_id),
+            Product.expiration_date >= first_day,
+            Product.expiration_date < next_month,
+        )
+        .group_by(Product.expiration_date, Product.pantry_id, Pantry.name)
+        .order_by(Product.expiration_date, Product.pantry_id)
+    )
+    result = await db.execute(stmt)
+
+    days: List[CalendarDay] = []
+    for row in result.all():
+        if not days or days[-1].date != row.day:
+            days.append(CalendarDay(date=row.day, count=0, value=0.0, pantries=[]))
+        current_day = days[-1]
+        value = round(float(row.value or 0), 2)
+        current_day.count += row.count
+        current_day.value = round(current_day.value + value, 2)
+        current_day.pantries.append(
+            CalendarPantryBreakdown(
+                pantry_id=row.pantry_id,
+                pantry_name=row.pantry_name,
+                count=row.count,
+                value=value,
+            )
+        )
+
+    return CalendarMonth(year=year, month=month, days=days)
+
+
+async def get_day_products(
+    db: AsyncSession,
+    user_id: int,
+    day: date,
+    limit: int,
+    after_id: int | None = None,
+) -> CalendarDayPage:
+    """
+    Zwraca stronę produktów z danego dnia (paginacja po kluczu - id produktu).
+    """
+    stmt = (
+        select(Product)
+        .options(selectinload(Product.category))
+        .where(*_active_products_of(user_id), Product.expiration_date == day)
+        .order_by(Product.id)
+        .limit(limit + 1)
+    )
+    if after_id is not None:
+        stmt = stmt.where(Product.id > after_id)
+
+    result = await db.execute(stmt)
+    products = list(result.scalars().all())
+
+    next_cursor = None
+    if len(products) > limit:
+        products = products[:limit]
+        next_cursor = products[-1].id
+
+    return CalendarDayPage(date=day, items=products, next_cursor=next_cursor)
@@ -0,0 +1,152 @@
+import logging
+from datetime import datetime, timedelta, timezone
+
+from celery import shared_task
+from sqlalchemy import and_, delete, exists, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from foodtracker_app.models import (
+    EmailOutbox,
+    NotificationLog,
+    PantryInvitation,
+    Product,
+    ProductTombstone,
+    User,
+)
+from foodtracker_app.notifications.tasks import get_db_session, run_async
+from foodtracker_app.services.email_outbox import SENT
+from foodtracker_app.services.product_service import TOMBSTONE_RETENTION_DAYS
+from foodtracker_app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _batch_ids(model, condition, batch_size: int):
+    # SKIP LOCKED: wiersze trzymane właśnie przez aplikację poczekają do
+    # następnego przebiegu, zamiast blokować sprzątanie.
+    return (
+        select(model.id)
+        .where(condition)
+        .order_by(model.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+
+
+async def _delete_in_batches(
+    session: AsyncSession, model, condition, batch_size: int
+) -> int:
+    """
+    Usuwa wiersze porcjami po `batch_size`, każda porcja w osobnej
+    transakcji - blokady trwają krótko, a autovacuum nadąża z indeksami.
+    """
+    total = 0
+    while True:
+        result = await session.execute(
+            delete(model)
+            .where(model.id.in_(_batch_ids(model, condition, batch_size)))
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+        total += result.rowcount
+        if result.rowcount < batch_size:
+            return total
+
+
+async def _clear_in_batches(
+    session: AsyncSession, model, condition, values: dict, batch_size: int
+) -> int:
+    """Jak `_delete_in_batches`, ale zeruje kolumny zamiast usuwać wiersze."""
+    total = 0
+    while True:
+        result = await session.execute(
+            update(model)
+            .where(model.id.in_(_batch_ids(model, condition, batch_size)))
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+        total += result.rowcount
+        if result.rowcount < batch_size:
+            return total
+
+
+async def _cleanup_async(
+    db: AsyncSession | None = None, now: datetime | None = None
+) -> dict:
+    now = now or datetime.now(timezone.utc)
+    batch_size = settings.CLEANUP_BATCH_SIZE
+    token_horizon = now - timedelta(days=settings.EXPIRED_TOKEN_RETENTION_DAYS)
+
+    async with get_db_session(db) as session:
+        result = {
+            "invitations": await _delete_in_batches(
+                session,
+                PantryInvitation,
+                PantryInvitation.expires_at < now,
+                batch_size,
+            ),
+            "verification_tokens": await _clear_in_batches(
+                session,
+                User,
+                and_(
+                    User.verification_token.is_not(None),
+                    or_(
+                        User.token_expires_at < token_horizon,
+                        # Tokeny zużyte, zanim weryfikacja zaczęła zostawiać datę.
+                        and_(
+                            User.token_expires_at.is_(None),
+                            User.verification_token.startswith("used:"),
+                        ),
+                    ),
+                ),
+                {"verification_token": None, "token_expires_at": None},
+                batch_size,
+            ),
+            "reset_tokens": await _clear_in_batches(
+                session,
+                User,
+                and_(
+                    User.reset_password_token.is_not(None),
+                    User.reset_password_expires_at < token_horizon,
+                ),
+                {"reset_password_token": None, "reset_password_expires_at": None},
+                batch_size,
+            ),
+            "tombstones": await _delete_in_batches(
+                session,
+                ProductTombstone,
+                ProductTombstone.deleted_at
+                < now - timedelta(days=TOMBSTONE_RETENTION_DAYS),
+                batch_size,
+            ),
+            "sent_emails": await _delete_in_batches(
+                session,
+                EmailOutbox,
+                and_(
+                    EmailOutbox.status == SENT,
+                    EmailOutbox.sent_at
+                    < now - timedelta(days=settings.EMAIL_OUTBOX_RETENTION_DAYS),
+                ),
+                batch_size,
+            ),
+        }
+        # Przy partycjonowanej tabeli products dziennik nie ma klucza obcego
+        # z ON DELETE CASCADE - wpisy po usuniętych produktach usuwamy tutaj.
+        if settings.PRODUCTS_HASH_PARTITIONS > 0:
+            result["orphaned_notification_logs"] = await _delete_in_batches(
+                session,
+                NotificationLog,
+                ~exists().where(Product.id == NotificationLog.product_id),
+                batch_size,
+            )
+        return result
+
+
+@shared_task(name="maintenance.cleanup_expired")
+def cleanup_expired_task():
+    """Synchroniczne zadanie Celery sprzątające wygasłe zaproszenia i tokeny."""
+    result = run_async(_cleanup_async())
+    logger.info(f"Sprzątanie zakończone: {result}")
+    return result
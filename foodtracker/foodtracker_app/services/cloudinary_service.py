@@ -1,5 +1,7 @@
 import cloudinary
 import cloudinary.uploader
+import cloudinary.utils
+import httpx
 from foodtracker_app.settings import settings
 
 cloudinary.config(
@@ -9,6 +11,10 @@ cloudinary.config(
     secure=True,
 )
 
+AVATAR_FOLDER = "foodtracker_avatars"
+# Oryginały uploadów czekające na workera - prywatne, niedostępne publicznie.
+STAGING_FOLDER = "foodtracker_avatar_staging"
+
 
 def upload_image(file_to_upload, public_id: str) -> str | None:
     """
@@ -19,10 +25,62 @@ def upload_image(file_to_upload, public_id: str) -> str | None:
         upload_result = cloudinary.uploader.upload(
             file_to_upload,
             overwrite=True,
-            folder="foodtracker_avatars",
+            folder=AVATAR_FOLDER,
             public_id=public_id,
         )
         return upload_result.get("secure_url")
     except Exception as e:
         print(f"Błąd wysyłania do Cloudinary: {e}")
         return None
+
+
+def image_url(public_id: str) -> str:
+    """URL obrazka o danym public_id - znany jeszcze przed wysłaniem pliku."""
+    url, _ = cloudinary.utils.cloudinary_url(
+        f"{AVATAR_FOLDER}/{public_id}", secure=True
+    )
+    return url
+
+
+def _staged_id(key: str) -> str:
+    return f"{STAGING_FOLDER}/{key}"
+
+
+def stage_original(source, key: str) -> bool:
+    """
+    Wysyła oryginał uploadu jako prywatny plik "raw" - niedostępny pod
+    publicznym URL-em, do pobrania tylko przez podpisany link.
+    """
+    try:
+        cloudinary.uploader.upload(
+            source,
+            public_id=_staged_id(key),
+            resource_type="raw",
+            type="private",
+            overwrite=True,
+        )
+        return True
+    except Exception as e:
+        print(f"Błąd wysyłania oryginału do Cloudinary: {e}")
+        return False
+
+
+def download_staged(key: str) -> bytes | None:
+    """Pobiera oryginał przez podpisany URL; None, jeśli go nie ma."""
+    url = cloudinary.utils.private_download_url(
+        _staged_id(key), "", resource_type="raw", type="private"
+    )
+    response = httpx.get(url, follow_redirects=True, timeout=30)
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return response.content
+
+
+def delete_staged(key: str) -> None:
+    try:
+        cloudinary.uploader.destroy(
+            _staged_id(key), resource_type="raw", type="private"
+        )
+    except Exception as e:
+        print(f"Błąd usuwania oryginału z Cloudinary: {e}")
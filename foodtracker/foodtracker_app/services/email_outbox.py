@@ -0,0 +1,54 @@
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from foodtracker_app.models import EmailOutbox
+from foodtracker_app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+SENDING = "sending"
+SENT = "sent"
+DEAD = "dead"
+
+
+def enqueue_email(
+    db: AsyncSession, to_email: str, subject: str, body: str, html: str | None = None
+) -> EmailOutbox:
+    """
+    Dodaje mail do outboxa w bieżącej transakcji. Nic nie jest wysyłane,
+    dopóki wywołujący nie zrobi commita - a po rollbacku mail znika razem
+    ze zmianą, której dotyczył.
+    """
+    email = EmailOutbox(to_email=to_email, subject=subject, body=body, html=html)
+    db.add(email)
+    return email
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return timedelta(
+        seconds=settings.EMAIL_OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+    )
+
+
+def mark_sent(email: EmailOutbox, now: datetime) -> None:
+    email.status = SENT
+    email.sent_at = now
+    email.last_error = None
+
+
+def mark_failed(email: EmailOutbox, error: Exception, now: datetime) -> None:
+    """Odkłada mail na później albo, po wyczerpaniu prób, do "dead"."""
+    email.attempts += 1
+    email.last_error = str(error)[:1000]
+    if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        email.status = DEAD
+        logger.error(
+            f"Mail {email.id} do {email.to_email} odłożony do dead po "
+            f"{email.attempts} próbach: {error}"
+        )
+    else:
+        email.status = PENDING
+        email.next_attempt_at = now + retry_delay(email.attempts)
@@ -0,0 +1,120 @@
+import logging
+from datetime import datetime, timedelta, timezone
+
+from aiosmtplib import SMTPServerDisconnected
+from celery import shared_task
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from foodtracker_app.models import EmailOutbox
+from foodtracker_app.notifications.tasks import get_db_session, run_async
+from foodtracker_app.services.email_outbox import (
+    PENDING,
+    SENDING,
+    SENT,
+    mark_failed,
+    mark_sent,
+)
+from foodtracker_app.settings import settings
+from foodtracker_app.utils.email_utils import build_message, smtp_connection
+
+logger = logging.getLogger(__name__)
+
+
+async def _deliver(emails: list[EmailOutbox], now: datetime) -> None:
+    """
+    Wysyła partię jednym połączeniem SMTP. Błąd pojedynczego maila (np.
+    odrzucony adres) dotyczy tylko jego; zerwane połączenie - całej reszty.
+    """
+    if settings.DEMO_MODE:
+        for email in emails:
+            print(f"[DEMO_MODE] NIE wysyłam maila do {email.to_email}")
+            mark_sent(email, now)
+        return
+
+    remaining = list(emails)
+    try:
+        async with smtp_connection() as smtp:
+            while remaining:
+                email = remaining[0]
+                try:
+                    await smtp.send_message(
+                        build_message(
+                            email.to_email, email.subject, email.body, email.html
+                        )
+                    )
+                    mark_sent(email, now)
+                except SMTPServerDisconnected:
+                    raise
+                except Exception as e:
+                    logger.warning(f"Nie udało się wysłać maila {email.id}: {e}")
+                    mark_failed(email, e, now)
+                remaining.pop(0)
+    except Exception as e:
+        logger.warning(f"Błąd połączenia SMTP, odkładam {len(remaining)} maili: {e}")
+        for email in remaining:
+            mark_failed(email, e, now)
+
+
+async def _claim_batch(session: AsyncSession, now: datetime) -> list[EmailOutbox]:
+    """
+    Rezerwuje partię maili w krótkiej transakcji: status "sending" i dzierżawa
+    do next_attempt_at. Blokady wierszy (SKIP LOCKED) trwają tylko do commita,
+    a nie przez całą rozmowę z serwerem SMTP. Maile z wygasłą dzierżawą
+    (worker padł w trakcie wysyłki) są rezerwowane ponownie.
+    """
+    emails = (
+        (
+            await session.execute(
+                select(EmailOutbox)
+                .where(
+                    EmailOutbox.status.in_([PENDING, SENDING]),
+                    EmailOutbox.next_attempt_at <= now,
+                )
+                .order_by(EmailOutbox.id)
+                .limit(settings.EMAIL_OUTBOX_BATCH_SIZE)
+                .with_for_update(skip_locked=True)
+            )
+        )
+        .scalars()
+        .all()
+    )
+    lease_until = now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE_SECONDS)
+    for email in emails:
+        email.status = SENDING
+        email.next_attempt_at = lease_until
+    await session.commit()
+    return list(emails)
+
+
+async def _drain_outbox_async(db: AsyncSession | None = None) -> dict:
+    """
+    Opróżnia outbox partiami: rezerwacja (commit), wysyłka poza transakcją,
+    zapis wyników (commit). Kilka workerów może pracować równolegle bez
+    wysyłania tego samego maila.
+    """
+    stats = {"sent": 0, "failed": 0}
+    async with get_db_session(db) as session:
+        while True:
+            emails = await _claim_batch(session, datetime.now(timezone.utc))
+            if not emails:
+                break
+
+            await _deliver(emails, datetime.now(timezone.utc))
+            sent = sum(1 for email in emails if email.status == SENT)
+            stats["sent"] += sent
+            stats["failed"] += len(emails) - sent
+            await session.commit()
+
+            if len(emails) < settings.EMAIL_OUTBOX_BATCH_SIZE:
+                break
+    return stats
+
+
+@shared_task(name="emails.send_outbox")
+def send_outbox_task():
+    """Synchroniczne zadanie Celery wysyłające zaległe maile z outboxa."""
+    result = run_async(_drain_outbox_async())
+    if result["sent"] or result["failed"]:
+        logger.info(f"Outbox: {result}")
+    return result
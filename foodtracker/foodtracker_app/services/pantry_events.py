@@ -0,0 +1,224 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import AsyncIterator, Optional
+
+import redis.asyncio as aioredis
+from fastapi import Request
+
+from foodtracker_app.auth.schemas import ProductOut
+from foodtracker_app.models.product import Product
+from foodtracker_app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "foodtracker:pantry:"
+CHANNEL_PATTERN = CHANNEL_PREFIX + "*:events"
+SUBSCRIBER_QUEUE_SIZE = 100
+HEARTBEAT_SECONDS = 15.0
+
+PRODUCT_CREATED = "product.created"
+PRODUCT_UPDATED = "product.updated"
+PRODUCT_USED = "product.used"
+PRODUCT_WASTED = "product.wasted"
+PRODUCT_DELETED = "product.deleted"
+MEMBER_REMOVED = "member.removed"
+PANTRY_DELETED = "pantry.deleted"
+RESYNC = "resync"
+
+
+def _channel(pantry_id: int) -> str:
+    return f"{CHANNEL_PREFIX}{pantry_id}:events"
+
+
+def _offer(queue: asyncio.Queue, event: dict) -> None:
+    """
+    Nie blokuje publikującego. Jeśli klient nie nadąża, czyścimy jego kolejkę
+    i wysyłamy "resync" - klient powinien wtedy pobrać listę produktów od nowa.
+    """
+    try:
+        queue.put_nowait(event)
+    except asyncio.QueueFull:
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait({"type": RESYNC, "pantry_id": event.get("pantry_id")})
+
+
+class PantryEventBroker:
+    """
+    Broker w obrębie jednego procesu: rozsyła zdarzenia do kolejek
+    subskrybentów danej spiżarni.
+    """
+
+    def __init__(self):
+        self._subscribers: dict[int, set[asyncio.Queue]] = defaultdict(set)
+
+    def dispatch(self, pantry_id: int, event: dict) -> None:
+        for queue in list(self._subscribers.get(pantry_id, ())):
+            _offer(queue, event)
+
+    async def publish(self, pantry_id: int, event: dict) -> None:
+        self.dispatch(pantry_id, event)
+
+    @asynccontextmanager
+    async def subscribe(self, pantry_id: int) -> AsyncIterator[asyncio.Queue]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers[pantry_id].add(queue)
+        try:
+            yield queue
+        finally:
+            subscribers = self._subscribers.get(pantry_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[pantry_id]
+
+    async def close(self) -> None:
+        pass
+
+
+class RedisPantryEventBroker(PantryEventBroker):
+    """
+    Zdarzenia idą przez Redis pub/sub, więc trafiają do klientów podłączonych
+    do dowolnej instancji aplikacji. Każdy proces trzyma jedną subskrypcję
+    (wzorzec na wszystkie spiżarnie) i rozsyła wiadomości lokalnie.
+    Gdy Redis jest niedostępny, zdarzenie trafia przynajmniej do
+    subskrybentów w bieżącym procesie.
+    """
+
+    def __init__(self, redis_url: str):
+        super().__init__()
+        self._redis = aioredis.from_url(redis_url)
+        self._listener: Optional[asyncio.Task] = None
+
+    async def publish(self, pantry_id: int, event: dict) -> None:
+        try:
+            await self._redis.publish(_channel(pantry_id), json.dumps(event))
+        except Exception as e:
+            logger.warning(f"Redis pub/sub niedostępny, zdarzenie tylko lokalnie: {e}")
+            self.dispatch(pantry_id, event)
+
+    @asynccontextmanager
+    async def subscribe(self, pantry_id: int) -> AsyncIterator[asyncio.Queue]:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+        async with super().subscribe(pantry_id) as queue:
+            yield queue
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self._redis.pubsub()
+            try:
+                await pubsub.psubscribe(CHANNEL_PATTERN)
+                async for message in pubsub.listen():
+                    if message["type"] != "pmessage":
+                        continue
+                    channel = message["channel"]
+                    if isinstance(channel, bytes):
+                        channel = channel.decode()
+                    pantry_id = int(channel[len(CHANNEL_PREFIX) :].split(":", 1)[0])
+                    self.dispatch(pantry_id, json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Utracono subskrypcję Redis pub/sub: {e}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    async def close(self) -> None:
+        if self._listener:
+            self._listener.cancel()
+            self._listener = None
+        await self._redis.aclose()
+
+
+broker: PantryEventBroker = (
+    PantryEventBroker()
+    if settings.SKIP_REDIS
+    else RedisPantryEventBroker(settings.REDIS_URL)
+)
+
+
+async def publish_product_event(
+    pantry_id: int,
+    event_type: str,
+    product: Optional[Product] = None,
+    product_id: Optional[int] = None,
+) -> None:
+    """
+    Publikuje zmianę produktu. Dla usunięcia wysyłane jest samo id.
+    Błąd publikacji nie może wycofać zapisu, więc jest tylko logowany.
+    """
+    if product is not None:
+        payload = ProductOut.model_validate(product).model_dump(mode="json")
+    else:
+        payload = {"id": product_id}
+
+    event = {
+        "type": event_type,
+        "pantry_id": pantry_id,
+        "product": payload,
+        "at": datetime.now(timezone.utc).isoformat(),
+    }
+    try:
+        await broker.publish(pantry_id, event)
+    except Exception as e:
+        logger.warning(f"Nie udało się opublikować zdarzenia {event_type}: {e}")
+
+
+async def publish_membership_event(
+    pantry_id: int, event_type: str, user_id: Optional[int] = None
+) -> None:
+    """
+    Publikuje usunięcie członka (`user_id`) lub całej spiżarni. Strumienie,
+    których to dotyczy, dostają zdarzenie i są zamykane.
+    """
+    event = {
+        "type": event_type,
+        "pantry_id": pantry_id,
+        "user_id": user_id,
+        "at": datetime.now(timezone.utc).isoformat(),
+    }
+    try:
+        await broker.publish(pantry_id, event)
+    except Exception as e:
+        logger.warning(f"Nie udało się opublikować zdarzenia {event_type}: {e}")
+
+
+def _ends_stream(event: dict, user_id: int) -> bool:
+    return event["type"] == PANTRY_DELETED or (
+        event["type"] == MEMBER_REMOVED and event.get("user_id") == user_id
+    )
+
+
+def format_sse(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+async def event_stream(
+    request: Request,
+    pantry_id: int,
+    user_id: int,
+    heartbeat: float = HEARTBEAT_SECONDS,
+) -> AsyncIterator[str]:
+    """
+    Strumień SSE dla jednej spiżarni. Co `heartbeat` sekund wysyła komentarz,
+    żeby proxy nie zamykały bezczynnego połączenia. Członkostwo sprawdzane
+    jest przy podłączeniu, a strumień kończy się, gdy użytkownik zostanie
+    usunięty ze spiżarni albo spiżarnia przestanie istnieć.
+    """
+    async with broker.subscribe(pantry_id) as queue:
+        yield ": connected\n\n"
+        while not await request.is_disconnected():
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            yield format_sse(event)
+            if _ends_stream(event, user_id):
+                return
@@ -1,6 +1,6 @@
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, update
 from sqlalchemy.orm import selectinload
 from typing import List
 from datetime import datetime, timedelta, timezone
@@ -9,6 +9,18 @@ from foodtracker_app.models import User, Pantry, PantryUser, PantryInvitation
 from foodtracker_app.schemas.pantry import PantryCreate, PantryUpdate
 
 
+async def bump_revision(db: AsyncSession, pantry_id: int) -> None:
+    """
+    Podbija rewizję spiżarni w bieżącej transakcji. Wywoływać przed commitem
+    każdego zapisu, który zmienia produkty lub członków spiżarni.
+    """
+    await db.execute(
+        update(Pantry)
+        .where(Pantry.id == pantry_id)
+        .values(revision=Pantry.revision + 1)
+    )
+
+
 async def create_pantry(
     db: AsyncSession, user: User, pantry_data: PantryCreate
 ) -> Pantry:
@@ -96,6 +108,7 @@ async def delete_pantry_member(db: AsyncSession, pantry: Pantry, member_id: int)
         )
 
     await db.delete(pantry_user_link)
+    await bump_revision(db, pantry.id)
     await db.commit()
     return {"detail": "Użytkownik usunięty ze spiżarni."}
 
@@ -119,6 +132,7 @@ async def leave_pantry(db: AsyncSession, pantry: Pantry, user: User):
         )
 
     await db.delete(pantry_user_link)
+    await bump_revision(db, pantry.id)
     await db.commit()
     return {"detail": "Opuściłeś spiżarnię."}
 
@@ -167,6 +181,7 @@ async def accept_invitation(db: AsyncSession, token: str, user: User) -> Pantry:
         pantry_id=invitation.pantry_id, user_id=user.id, role="member"
     )
     db.add(pantry_user_link)
+    await bump_revision(db, invitation.pantry_id)
     await db.delete(invitation)
     await db.commit()
 
@@ -1,16 +1,33 @@
+import base64
 import httpx
+import json
 import logging
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
-from fastapi import HTTPException
-from datetime import date, timedelta
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_
+from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal
 
 from foodtracker_app.models.category import Category
+from foodtracker_app.models.pantry import Pantry
+from foodtracker_app.models.pantry_user import PantryUser
 from foodtracker_app.models.product import Product
-from foodtracker_app.auth.schemas import ProductCreate
+from foodtracker_app.models.product_tombstone import ProductTombstone
+from foodtracker_app.services.pantry_service import bump_revision
+from foodtracker_app.auth.schemas import (
+    ExpiringFeed,
+    ExpiringFeedItem,
+    ProductChanges,
+    ProductCreate,
+)
+
+# Zapisy młodsze niż to okno nie są jeszcze oddawane w synchronizacji - daje to
+# czas na commit transakcjom, które nadały `updated_at` chwilę wcześniej.
+SYNC_SETTLE_SECONDS = 2
+TOMBSTONE_RETENTION_DAYS = 30
 
 CATEGORY_KEYWORD_MAP = {
     "Nabiał": [
@@ -98,6 +115,18 @@ async def _get_category_from_off(
         return None
 
 
+async def get_pantry_product(
+    db: AsyncSession, pantry_id: int, product_id: int
+) -> Optional[Product]:
+    """
+    Produkt o danym id, o ile należy do spiżarni. Warunek na pantry_id
+    pozwala Postgresowi od razu wybrać właściwą partycję tabeli products.
+    """
+    return await db.scalar(
+        select(Product).where(Product.id == product_id, Product.pantry_id == pantry_id)
+    )
+
+
 async def create_product(
     db: AsyncSession, pantry_id: int, product_data: ProductCreate
 ) -> Product:
@@ -146,6 +175,7 @@ async def create_product(
     )
 
     db.add(db_product)
+    await bump_revision(db, pantry_id)
     await db.commit()
 
     result = await db.execute(
@@ -167,3 +197,206 @@ async def resolve_category_from_external_id(
     """
     category = await _get_category_from_off(db, external_id)
     return category
+
+
+async def get_expiring_feed(
+    db: AsyncSession, user_id: int, days: int, since: datetime | None = None
+) -> ExpiringFeed:
+    """
+    Zwraca posortowaną listę produktów, które wkrótce stracą ważność,
+    ze wszystkich spiżarni użytkownika - jednym zapytaniem.
+
+    Z parametrem `since` zwraca tylko zmiany: produkty zmienione od tego
+    czasu oraz te, które w międzyczasie weszły w okno `days`. Produkty,
+    które z okna wypadły (zużyte, wyrzucone, ze zmienioną datą, przeterminowane)
+    lub zostały usunięte, trafiają do `removed_ids`.
+
+    `server_time` jest cofnięty o SYNC_SETTLE_SECONDS, jak horyzont w
+    get_product_changes - zmiany zatwierdzone chwilę po zapytaniu trafią do
+    kolejnej delty. Produkty z tego okna mogą przyjść dwa razy, co klientowi
+    nie szkodzi.
+    """
+    server_time = datetime.now(timezone.utc) - timedelta(seconds=SYNC_SETTLE_SECONDS)
+    today = date.today()
+    deadline = today + timedelta(days=days)
+
+    stmt = (
+        select(Product, Pantry.name)
+        .join(Pantry, Pantry.id == Product.pantry_id)
+        .where(
+            Product.pantry_id.in_(
+                select(PantryUser.pantry_id).where(PantryUser.user_id == user_id)
+            )
+        )
+        .order_by(Product.expiration_date, Product.id)
+    )
+
+    if since is None:
+        stmt = stmt.where(
+            Product.expiration_date >= today,
+            Product.expiration_date <= deadline,
+            Product.current_amount > 0,
+        )
+    else:
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        previous_deadline = since.date() + timedelta(days=days)
+        stmt = stmt.where(
+            or_(
+                Product.updated_at > since,
+                # Weszły do okna, bo przesunął się jego koniec.
+                and_(
+                    Product.expiration_date > previous_deadline,
+                    Product.expiration_date <= deadline,
+                ),
+                # Wypadły z okna, bo minęła ich data ważności.
+                and_(
+                    Product.expiration_date >= since.date(),
+                    Product.expiration_date < today,
+                    Product.current_amount > 0,
+                ),
+            )
+        )
+
+    result = await db.execute(stmt)
+
+    removed_ids: list[int] = []
+    if since is not None:
+        tombstones = await db.execute(
+            select(ProductTombstone.product_id).where(
+                ProductTombstone.pantry_id.in_(
+                    select(PantryUser.pantry_id).where(PantryUser.user_id == user_id)
+                ),
+                ProductTombstone.deleted_at > since,
+            )
+        )
+        removed_ids.extend(tombstones.scalars().all())
+
+    items: list[ExpiringFeedItem] = []
+    for product, pantry_name in result.all():
+        in_window = today <= product.expiration_date <= deadline
+        if not in_window or product.current_amount <= 0:
+            removed_ids.append(product.id)
+            continue
+        items.append(
+            ExpiringFeedItem(
+                id=product.id,
+                name=product.name,
+                expiration_date=product.expiration_date,
+                external_id=product.external_id,
+                days_left=(product.expiration_date - today).days,
+                current_amount=float(product.current_amount),
+                unit=product.unit,
+                pantry_id=product.pantry_id,
+                pantry_name=pantry_name,
+                updated_at=product.updated_at,
+            )
+        )
+
+    return ExpiringFeed(items=items, removed_ids=removed_ids, server_time=server_time)
+
+
+SyncPosition = tuple[datetime, int]
+
+
+def _encode_sync_cursor(products: SyncPosition, tombstones: SyncPosition) -> str:
+    raw = json.dumps(
+        {
+            "p": [products[0].isoformat(), products[1]],
+            "t": [tombstones[0].isoformat(), tombstones[1]],
+        }
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_sync_cursor(cursor: str) -> tuple[SyncPosition, SyncPosition]:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        positions = []
+        for key in ("p", "t"):
+            moment = datetime.fromisoformat(data[key][0])
+            if moment.tzinfo is None:
+                moment = moment.replace(tzinfo=timezone.utc)
+            positions.append((moment, int(data[key][1])))
+    except (ValueError, KeyError, TypeError, IndexError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Nieprawidłowy kursor synchronizacji.",
+        )
+    return positions[0], positions[1]
+
+
+def _after(column, id_column, position: SyncPosition):
+    moment, last_id = position
+    return or_(column > moment, and_(column == moment, id_column > last_id))
+
+
+async def get_product_changes(
+    db: AsyncSession, pantry_id: int, cursor: str | None, limit: int
+) -> ProductChanges:
+    """
+    Zmiany w produktach spiżarni od podanego kursora: dodane/zmienione
+    produkty (po `updated_at`) oraz id usuniętych (z tabeli tombstone'ów).
+    Bez kursora zwraca cały stan spiżarni. Obie listy są stronicowane po
+    kluczu (czas, id); przy `has_more` należy od razu pobrać kolejną stronę.
+    """
+    now = datetime.now(timezone.utc)
+    horizon = now - timedelta(seconds=SYNC_SETTLE_SECONDS)
+
+    if cursor is None:
+        products_pos: SyncPosition = (datetime.min.replace(tzinfo=timezone.utc), 0)
+        tombstones_pos: SyncPosition = (horizon, 0)
+    else:
+        products_pos, tombstones_pos = _decode_sync_cursor(cursor)
+        if tombstones_pos[0] < now - timedelta(days=TOMBSTONE_RETENTION_DAYS):
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="Kursor wygasł - wymagana pełna synchronizacja.",
+            )
+
+    products_result = await db.execute(
+        select(Product)
+        .options(selectinload(Product.category))
+        .where(
+            Product.pantry_id == pantry_id,
+            Product.updated_at <= horizon,
+            _after(Product.updated_at, Product.id, products_pos),
+        )
+        .order_by(Product.updated_at, Product.id)
+        .limit(limit + 1)
+    )
+    products = list(products_result.scalars().all())
+
+    tombstones_result = await db.execute(
+        select(ProductTombstone)
+        .where(
+            ProductTombstone.pantry_id == pantry_id,
+            ProductTombstone.deleted_at <= horizon,
+            _after(ProductTombstone.deleted_at, ProductTombstone.id, tombstones_pos),
+        )
+        .order_by(ProductTombstone.deleted_at, ProductTombstone.id)
+        .limit(limit + 1)
+    )
+    tombstones = list(tombstones_result.scalars().all())
+
+    has_more = len(products) > limit or len(tombstones) > limit
+    products = products[:limit]
+    tombstones = tombstones[:limit]
+
+    # Po dojściu do końca przesuwamy kursor do horyzontu, żeby nie skanować
+    # ponownie starej historii (duplikaty z tej samej mikrosekundy są nieszkodliwe).
+    if len(products) == limit:
+        products_pos = (products[-1].updated_at, products[-1].id)
+    else:
+        products_pos = (horizon, 0)
+    if len(tombstones) == limit:
+        tombstones_pos = (tombstones[-1].deleted_at, tombstones[-1].id)
+    else:
+        tombstones_pos = (horizon, 0)
+
+    return ProductChanges(
+        upserted=products,
+        deleted_ids=[tombstone.product_id for tombstone in tombstones],
+        cursor=_encode_sync_cursor(products_pos, tombstones_pos),
+        has_more=has_more,
+    )
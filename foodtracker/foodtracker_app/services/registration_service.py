@@ -0,0 +1,54 @@
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from foodtracker_app.auth.utils import stage_verification_email
+from foodtracker_app.models import FinancialStat, Pantry, PantryUser, User
+
+DEFAULT_PANTRY_NAME = "Moja Spiżarnia"
+
+
+def add_new_user(
+    db: AsyncSession,
+    email: str,
+    hashed_password: str,
+    provider: str,
+    is_verified: bool = False,
+) -> User:
+    """
+    Dodaje do sesji konto razem z domyślną spiżarnią, członkostwem
+    właściciela i statystykami finansowymi. Nic nie jest zapisywane do
+    commita wywołującego - całość trafia do bazy w jednej transakcji.
+    """
+    user = User(
+        email=email,
+        hashed_password=hashed_password,
+        social_provider=provider,
+        is_verified=is_verified,
+    )
+    pantry = Pantry(name=DEFAULT_PANTRY_NAME, owner=user)
+    db.add_all(
+        [
+            user,
+            pantry,
+            PantryUser(user=user, pantry=pantry, role="owner"),
+            FinancialStat(pantry=pantry),
+        ]
+    )
+    return user
+
+
+async def register_user(db: AsyncSession, email: str, hashed_password: str) -> User:
+    """
+    Rejestracja hasłem: konto, spiżarnia, token weryfikacyjny i mail
+    w outboxie - jeden commit. Równoległa rejestracja tego samego adresu
+    kończy się na unikalnym indeksie emaila.
+    """
+    user = add_new_user(db, email, hashed_password, provider="password")
+    await stage_verification_email(user, db)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Email already registered")
+    return user
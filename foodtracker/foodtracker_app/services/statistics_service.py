@@ -1,11 +1,39 @@
-from sqlalchemy import func, select, case
+from sqlalchemy import func, select, case, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from foodtracker_app.models import Product, Category
+from foodtracker_app.models import Product, ProductArchive, ProductRollup, Category
 from foodtracker_app.schemas.statistics import CategoryWasteStat, MostWastedProductStat
 
 
+def rollup_product_stats():
+    """
+    Wkład zarchiwizowanych produktów do licznika total/used/wasted - te same
+    definicje co dla żywych produktów (sztuki po ilości, reszta po produkcie).
+    """
+    is_szt = ProductRollup.unit == "szt."
+    return (
+        func.sum(
+            case(
+                (is_szt, ProductRollup.initial_amount),
+                else_=ProductRollup.products_count,
+            )
+        ).label("total"),
+        func.sum(
+            case(
+                (is_szt, ProductRollup.saved_amount),
+                else_=ProductRollup.mostly_used_count,
+            )
+        ).label("used"),
+        func.sum(
+            case(
+                (is_szt, ProductRollup.wasted_amount),
+                else_=ProductRollup.mostly_wasted_count,
+            )
+        ).label("wasted"),
+    )
+
+
 async def get_category_waste_stats(
     db: AsyncSession, pantry_id: int
 ) -> List[CategoryWasteStat]:
@@ -13,20 +41,35 @@ async def get_category_waste_stats(
     Oblicza statystyki zużytych i zmarnowanych ilości produktów,
     grupując je według kategorii dla danej spiżarni.
     Osobno sumuje produkty w 'szt.' i 'g'.
-    Uwzględnia WSZYSTKIE produkty, także te bez przypisanej kategorii.
+    Uwzględnia WSZYSTKIE produkty, także te bez przypisanej kategorii
+    oraz zarchiwizowane (z rollupu).
     """
-    saved_amount_expr = (
-        Product.initial_amount - Product.current_amount - Product.wasted_amount
-    )
+    live = select(
+        Product.category_id,
+        Product.unit,
+        (Product.initial_amount - Product.current_amount - Product.wasted_amount).label(
+            "saved_amount"
+        ),
+        Product.wasted_amount,
+    ).where(Product.pantry_id == pantry_id)
+    archived = select(
+        ProductRollup.category_id,
+        ProductRollup.unit,
+        ProductRollup.saved_amount,
+        ProductRollup.wasted_amount,
+    ).where(ProductRollup.pantry_id == pantry_id)
+    rows = union_all(live, archived).subquery()
 
-    sum_saved_szt = func.sum(case((Product.unit == "szt.", saved_amount_expr), else_=0))
+    sum_saved_szt = func.sum(
+        case((rows.c.unit == "szt.", rows.c.saved_amount), else_=0)
+    )
     sum_wasted_szt = func.sum(
-        case((Product.unit == "szt.", Product.wasted_amount), else_=0)
+        case((rows.c.unit == "szt.", rows.c.wasted_amount), else_=0)
     )
 
-    sum_saved_grams = func.sum(case((Product.unit == "g", saved_amount_expr), else_=0))
+    sum_saved_grams = func.sum(case((rows.c.unit == "g", rows.c.saved_amount), else_=0))
     sum_wasted_grams = func.sum(
-        case((Product.unit == "g", Product.wasted_amount), else_=0)
+        case((rows.c.unit == "g", rows.c.wasted_amount), else_=0)
     )
 
     stmt = (
@@ -38,8 +81,8 @@ async def get_category_waste_stats(
             sum_saved_grams.label("total_saved_grams"),
             sum_wasted_grams.label("total_wasted_grams"),
         )
-        .join(Category, Product.category_id == Category.id, isouter=True)
-        .where(Product.pantry_id == pantry_id)
+        .select_from(rows)
+        .join(Category, rows.c.category_id == Category.id, isouter=True)
         .group_by(Category.name, Category.icon_name)  # Poprawna klauzula GROUP BY
         .having(
             (sum_saved_szt > 0)
@@ -71,6 +114,7 @@ async def get_most_expensive_wasted_products(
 ) -> List[MostWastedProductStat]:
     """
     Znajduje produkty o najwyższej wartości finansowej, które zostały wyrzucone.
+    Najdroższe z archiwum są brane z indeksu (pantry_id, wasted_value).
     """
 
     # Wyrażenie obliczające wartość zmarnowanej części produktu
@@ -86,13 +130,19 @@ async def get_most_expensive_wasted_products(
         .order_by(wasted_value_expr.desc())
         .limit(limit)
     )
+    archived_stmt = (
+        select(ProductArchive.id, ProductArchive.name, ProductArchive.wasted_value)
+        .where(ProductArchive.pantry_id == pantry_id, ProductArchive.wasted_value > 0)
+        .order_by(ProductArchive.wasted_value.desc())
+        .limit(limit)
+    )
 
-    result = await db.execute(stmt)
-    products = result.all()
+    products = (await db.execute(stmt)).all() + (await db.execute(archived_stmt)).all()
+    products.sort(key=lambda p: p.wasted_value or 0, reverse=True)
 
     return [
         MostWastedProductStat(
             id=p.id, name=p.name, wasted_value=float(p.wasted_value or 0.0)
         )
-        for p in products
+        for p in products[:limit]
     ]
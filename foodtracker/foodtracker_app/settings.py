@@ -1,4 +1,5 @@
 import os
+from typing import Literal
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -9,9 +10,28 @@ class Settings(BaseSettings):
     SQL_ECHO: bool = False
     DEMO_MODE: bool
     ALLOWED_IPS: list[str] = Field(default_factory=list)
+    TRUSTED_PROXIES: list[str] = Field(default_factory=list)
     SECRET_KEY: str
     jwt_algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    refresh_token_expire_days: int = 7
+    REFRESH_TOKEN_REUSE_GRACE_SECONDS: float = 10
+
+    PASSWORD_HASH_SCHEME: Literal["bcrypt", "argon2"] = "bcrypt"
+    BCRYPT_ROUNDS: int = 12
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST_KIB: int = 65536
+    PASSWORD_HASH_CONCURRENCY: int = 4
+
+    LOGIN_MAX_FAILURES_PER_ACCOUNT: int = 5
+    LOGIN_MAX_FAILURES_PER_IP: int = 20
+    REGISTRATIONS_PER_IP_PER_DAY: int = 5
+    LOGIN_FAILURE_WINDOW_SECONDS: float = 900
+    LOGIN_LOCKOUT_BASE_SECONDS: float = 30
+    LOGIN_LOCKOUT_MAX_SECONDS: float = 3600
+    RATE_LIMIT_PER_USER: str = "300/minute"
+    MEMORY_FALLBACK_MAX_KEYS: int = 10_000
+    JWT_CLAIMS_CACHE_SIZE: int = 4096
 
     SMTP_HOST: str
     SMTP_PORT: int
@@ -22,6 +42,19 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     DATABASE_URL_LOCALHOST: str | None = None
 
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_PGBOUNCER_TRANSACTION_MODE: bool = False
+
+    DATABASE_REPLICA_URLS: list[str] = Field(default_factory=list)
+    DB_REPLICA_HEALTH_CHECK_INTERVAL: float = 10.0
+    DB_READ_YOUR_WRITES_SECONDS: float = 5.0
+    PRODUCTS_HASH_PARTITIONS: int = 0
+
     GOOGLE_CLIENT_ID: str
     GOOGLE_CLIENT_SECRET: str
 
@@ -32,6 +65,17 @@ class Settings(BaseSettings):
     CORS_ORIGINS: list[str] = []
 
     EXPIRATION_NOTIFICATION_DAYS: int = 3
+    TEMPLATE_CACHE_DIR: str | None = None
+    EMAIL_OUTBOX_BATCH_SIZE: int = 100
+    EMAIL_OUTBOX_POLL_SECONDS: float = 10.0
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 8
+    EMAIL_OUTBOX_RETRY_BASE_SECONDS: int = 30
+    EMAIL_OUTBOX_LEASE_SECONDS: int = 300
+    EMAIL_OUTBOX_RETENTION_DAYS: int = 14
+    CLEANUP_BATCH_SIZE: int = 1000
+    EXPIRED_TOKEN_RETENTION_DAYS: int = 7
+    PRODUCT_ARCHIVE_AFTER_DAYS: int = 90
+    PRODUCT_ARCHIVE_BATCH_SIZE: int = 500
     FRONTEND_URL: str
     BACKEND_URL: str
     REDIS_URL: str
@@ -45,6 +89,11 @@ class Settings(BaseSettings):
     CLOUDINARY_API_KEY: str
     CLOUDINARY_API_SECRET: str
 
+    AVATAR_STORAGE: Literal["cloudinary", "local"] = "cloudinary"
+    AVATAR_LOCAL_DIR: str = "uploads/avatars"
+    AVATAR_SIZE: int = 512
+    AVATAR_THUMBNAIL_SIZE: int = 96
+
     SKIP_REDIS: bool = False
     TESTING: bool = os.getenv("TESTING", "false").lower() == "true"
 
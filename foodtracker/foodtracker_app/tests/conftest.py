@@ -3,6 +3,8 @@ import pytest
 import pytest_asyncio
 from datetime import date, timedelta
 from httpx import ASGITransport, AsyncClient
+from limits.storage import storage_from_string
+from limits.aio.strategies import FixedWindowRateLimiter
 from typing import Callable, Coroutine, Tuple, AsyncGenerator
 
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
@@ -17,10 +19,19 @@ os.environ["CLOUDINARY_API_SECRET"] = "SECRET"
 os.environ["CLOUDINARY_CLOUD_NAME"] = "NAMETEST"
 os.environ["CLOUDINARY_API_KEY"] = "TEST"
 
+from foodtracker_app.auth import refresh_tokens, revocation  # noqa : E402
 from foodtracker_app.auth.utils import hash_password  # noqa : E402
+from foodtracker_app.core import login_throttle, security  # noqa : E402
+from foodtracker_app.core.sliding_window import MemorySlidingWindow  # noqa : E402
 from foodtracker_app.db.database import Base, get_async_session  # noqa : E402
 from foodtracker_app.main import app  # noqa : E402
 from foodtracker_app.models import User, Pantry, PantryUser  # noqa : E402
+from foodtracker_app.services.avatar_storage import (  # noqa : E402
+    LocalAvatarStorage,
+    get_avatar_storage,
+)
+import rate_limiter  # noqa : E402
+from rate_limiter import limiter  # noqa : E402
 
 SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///./test.db?cache=shared"
 
@@ -44,6 +55,36 @@ async def override_get_async_session():
         yield session
 
 
+@pytest.fixture(autouse=True)
+def reset_login_throttle():
+    throttle = login_throttle.login_throttle
+    throttle.failures.memory = MemorySlidingWindow()
+    throttle._locked_until.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    limiter.reset()
+    rate_limiter.user_limiter = FixedWindowRateLimiter(
+        storage_from_string("async+memory://")
+    )
+    security.registration_limiter.memory = MemorySlidingWindow()
+
+
+@pytest.fixture
+def local_avatar_storage(tmp_path):
+    storage = LocalAvatarStorage(tmp_path / "avatars", base_url="http://test")
+    app.dependency_overrides[get_avatar_storage] = lambda: storage
+    yield storage
+    app.dependency_overrides.pop(get_avatar_storage, None)
+
+
+@pytest.fixture(autouse=True)
+def reset_token_denylist():
+    revocation.token_denylist._memory.clear()
+    refresh_tokens.refresh_tokens._memory = refresh_tokens._MemoryFamilies()
+
+
 @pytest_asyncio.fixture(scope="function")
 async def client() -> AsyncClient:
     app.dependency_overrides[get_async_session] = override_get_async_session
@@ -7,11 +7,12 @@ from unittest.mock import AsyncMock, patch
 
 import pytest
 from httpx import AsyncClient
+from PIL import Image
 from sqlalchemy.future import select
 
+from foodtracker_app.auth.refresh_tokens import refresh_tokens
 from foodtracker_app.auth.utils import (
     create_access_token,
-    create_refresh_token,
     hash_password,
 )
 from foodtracker_app.models.user import User
@@ -111,9 +112,6 @@ async def test_register_success(client: AsyncClient, mocker):
     mock_verify_recaptcha = mocker.patch(
         "foodtracker_app.auth.routes.verify_recaptcha", new=AsyncMock(return_value=True)
     )
-    mock_trigger_verification_email = mocker.patch(
-        "foodtracker_app.auth.routes.trigger_verification_email", new=AsyncMock()
-    )
 
     res = await client.post(
         "/auth/register",
@@ -129,7 +127,12 @@ async def test_register_success(client: AsyncClient, mocker):
         == "User created successfully. Sprawdź email, by aktywować konto."
     )
     mock_verify_recaptcha.assert_called_once_with("valid-recaptcha-token")
-    mock_trigger_verification_email.assert_called_once()
+    async with TestingSessionLocal() as db:
+        user = (
+            await db.execute(select(User).where(User.email == "new_user@example.com"))
+        ).scalar_one()
+    assert user.verification_token
+    assert not user.is_verified
 
 
 # ─────────────────────────  weryfikacja konta  ─────────────────────────
@@ -315,20 +318,25 @@ async def test_logout_success(authenticated_client: AsyncClient):
 # ─────────────────────────  avatar upload  ─────────────────────────
 
 
+def _png_bytes(size=(800, 600)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (200, 30, 30)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
 @pytest.mark.asyncio
-async def test_upload_avatar_valid(authenticated_client):
-    mock_content = b"\x89PNG\r\n\x1a\n" + b"\x00" * 100
-    file = {"file": ("avatar.png", io.BytesIO(mock_content), "image/png")}
-    with patch(
-        "foodtracker_app.auth.routes.upload_image",
-        return_value="http://fake-cloudinary.com/avatar.png",
-    ) as mock_upload, patch(
-        "foodtracker_app.auth.routes.magic.from_buffer", return_value="image/png"
-    ):
+async def test_upload_avatar_valid(authenticated_client, local_avatar_storage):
+    file = {"file": ("avatar.png", io.BytesIO(_png_bytes()), "image/png")}
+    with patch("foodtracker_app.auth.routes.process_avatar_task.delay") as mock_delay:
         response = await authenticated_client.post("/auth/me/avatar", files=file)
-    assert response.status_code == 200
-    assert response.json()["avatar_url"] == "http://fake-cloudinary.com/avatar.png"
-    mock_upload.assert_called_once()
+    assert response.status_code == 202
+    mock_delay.assert_called_once()
+    user_id, staged_key, version = mock_delay.call_args.args
+    assert await local_avatar_storage.load_staged(staged_key) == _png_bytes()
+    # Worker zapisze w profilu ten sam, wersjonowany URL.
+    assert response.json()["avatar_url"] == (
+        f"http://test/uploads/avatars/user_{user_id}.jpg?v={version}"
+    )
 
 
 @pytest.mark.asyncio
@@ -338,41 +346,27 @@ async def test_upload_avatar_no_file(authenticated_client: AsyncClient):
 
 
 @pytest.mark.asyncio
-async def test_upload_avatar_file_too_large(authenticated_client: AsyncClient):
+async def test_upload_avatar_file_too_large(
+    authenticated_client: AsyncClient, local_avatar_storage
+):
     mock_content = b"\x00" * (5 * 1024 * 1024 + 1)
     file = {"file": ("large.png", io.BytesIO(mock_content), "image/png")}
-    with patch(
-        "foodtracker_app.auth.routes.magic.from_buffer", return_value="image/png"
-    ):
+    with patch("foodtracker_app.auth.routes.process_avatar_task.delay") as mock_delay:
         response = await authenticated_client.post("/auth/me/avatar", files=file)
     assert response.status_code == 413
+    mock_delay.assert_not_called()
 
 
 @pytest.mark.asyncio
-async def test_upload_avatar_invalid_mime_type(authenticated_client: AsyncClient):
+async def test_upload_avatar_invalid_mime_type(
+    authenticated_client: AsyncClient, local_avatar_storage
+):
     mock_content = b"not an image"
     file = {"file": ("document.txt", io.BytesIO(mock_content), "text/plain")}
-    with patch(
-        "foodtracker_app.auth.routes.magic.from_buffer", return_value="text/plain"
-    ):
+    with patch("foodtracker_app.auth.routes.process_avatar_task.delay") as mock_delay:
         response = await authenticated_client.post("/auth/me/avatar", files=file)
     assert response.status_code == 400
-
-
-@pytest.mark.asyncio
-async def test_upload_avatar_success_with_db_update(authenticated_client_factory):
-    user_email = "avatar_user_db@example.com"
-    client, _ = await authenticated_client_factory(user_email, "pwd")
-    mock_content = b"\x89PNG\r\n\x1a\n" + b"\x00" * 100
-    file = {"file": ("avatar.png", io.BytesIO(mock_content), "image/png")}
-    fake_url = f"http://fake-cloudinary.com/{user_email}.png"
-    with patch(
-        "foodtracker_app.auth.routes.upload_image", return_value=fake_url
-    ) as mock_upload, patch(  # noqa : F401
-        "foodtracker_app.auth.routes.magic.from_buffer", return_value="image/png"
-    ):
-        response = await client.post("/auth/me/avatar", files=file)
-    assert response.status_code == 200
+    mock_delay.assert_not_called()
 
 
 # ─────────────────────────  password reset flow  ─────────────────────────
@@ -468,9 +462,7 @@ async def test_refresh_token_missing_cookie(client: AsyncClient):
 @pytest.mark.asyncio
 async def test_refresh_token_happy_path(authenticated_client_factory):
     client, _ = await authenticated_client_factory("rt2_test@example.com", "secret")
-    refresh = create_refresh_token(
-        {"sub": "rt2_test@example.com", "provider": "password"}
-    )
+    refresh = await refresh_tokens.issue("rt2_test@example.com", "password")
     res = await client.post("/auth/refresh", cookies={"refresh_token": refresh})
     assert res.status_code == 200
 
@@ -0,0 +1,226 @@
+import io
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+from sqlalchemy import select
+
+from foodtracker_app.models import User
+from foodtracker_app.services import avatar_service
+from foodtracker_app.services.avatar_storage import (
+    CloudinaryAvatarStorage,
+    LocalAvatarStorage,
+)
+from foodtracker_app.services import avatar_tasks
+from foodtracker_app.services.avatar_tasks import (
+    AvatarUploadError,
+    _process_avatar_async,
+    process_avatar_task,
+)
+
+
+def _image_bytes(size, fmt="JPEG") -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (10, 120, 200)).save(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+async def _staged(storage: LocalAvatarStorage, data: bytes, key="user_1_v1") -> str:
+    await storage.stage(key, io.BytesIO(data))
+    return key
+
+
+async def _create_user(db, email: str) -> User:
+    user = User(email=email, hashed_password="x", is_verified=True)
+    db.add(user)
+    await db.commit()
+    return user
+
+
+def test_render_avatars_decodes_once_into_all_sizes():
+    rendered = avatar_service.render_avatars(
+        io.BytesIO(_image_bytes((3000, 1800))), {"full": 256, "thumbnail": 48}
+    )
+
+    for name, size in (("full", 256), ("thumbnail", 48)):
+        with Image.open(io.BytesIO(rendered[name])) as avatar:
+            assert avatar.format == "JPEG"
+            assert avatar.size == (size, size)
+
+
+def test_render_avatars_rejects_undecodable_image():
+    broken = io.BytesIO(b"\x89PNG\r\n\x1a\n" + b"\x00" * 100)
+
+    with pytest.raises(avatar_service.InvalidImageError):
+        avatar_service.render_avatars(broken, {"full": 256})
+
+
+def test_render_avatars_rejects_huge_resolution(monkeypatch):
+    monkeypatch.setattr(avatar_service, "MAX_IMAGE_PIXELS", 100)
+
+    with pytest.raises(avatar_service.InvalidImageError):
+        avatar_service.render_avatars(
+            io.BytesIO(_image_bytes((20, 20), "PNG")), {"full": 8}
+        )
+
+
+@pytest.mark.asyncio
+async def test_task_stores_both_sizes_and_updates_user(db, tmp_path):
+    user = await _create_user(db, "avatar.task@example.com")
+    storage = LocalAvatarStorage(tmp_path / "avatars", base_url="http://test")
+
+    key = await _staged(storage, _image_bytes((800, 600), "PNG"))
+
+    result = await _process_avatar_async(user.id, key, "abc123", db=db, storage=storage)
+
+    assert result["status"] == "success"
+    refreshed = (
+        await db.execute(
+            select(User)
+            .where(User.id == user.id)
+            .execution_options(populate_existing=True)
+        )
+    ).scalar_one()
+    # Dokładnie ten URL, który endpoint zwrócił klientowi w odpowiedzi 202.
+    assert refreshed.avatar_url == storage.versioned_url(
+        avatar_service.avatar_key(user.id), "image/jpeg", "abc123"
+    )
+    assert refreshed.avatar_url == (
+        f"http://test/uploads/avatars/user_{user.id}.jpg?v=abc123"
+    )
+    assert refreshed.avatar_thumbnail_url == (
+        f"http://test/uploads/avatars/user_{user.id}_thumb.jpg?v=abc123"
+    )
+    assert (tmp_path / "avatars" / f"user_{user.id}_thumb.jpg").exists()
+    assert await storage.load_staged(key) is None
+
+
+@pytest.mark.asyncio
+async def test_task_raises_for_retry_when_storage_fails(db, tmp_path):
+    user = await _create_user(db, "avatar.retry@example.com")
+
+    class FailingStorage(LocalAvatarStorage):
+        async def save(self, key, data, content_type):
+            return None
+
+    storage = FailingStorage(tmp_path)
+    key = await _staged(storage, _image_bytes((100, 100)))
+
+    with pytest.raises(AvatarUploadError):
+        await _process_avatar_async(user.id, key, "v1", db=db, storage=storage)
+    # Oryginał zostaje na kolejną próbę.
+    assert await storage.load_staged(key) is not None
+    refreshed = (
+        await db.execute(
+            select(User)
+            .where(User.id == user.id)
+            .execution_options(populate_existing=True)
+        )
+    ).scalar_one()
+    assert refreshed.avatar_url is None
+
+
+@pytest.mark.asyncio
+async def test_task_drops_invalid_upload(db, tmp_path):
+    storage = LocalAvatarStorage(tmp_path / "avatars")
+    key = await _staged(storage, b"\x89PNG\r\n\x1a\n" + b"\x00" * 100)
+
+    result = await _process_avatar_async(1, key, "v1", db=db, storage=storage)
+
+    assert result["status"] == "invalid"
+    assert not (tmp_path / "avatars").exists()
+    assert list(storage.staging_directory.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_task_reports_missing_original(db, tmp_path):
+    result = await _process_avatar_async(
+        1, "user_1_gone", "v1", db=db, storage=LocalAvatarStorage(tmp_path)
+    )
+
+    assert result == {"status": "missing"}
+
+
+def test_last_failed_retry_discards_original(tmp_path, monkeypatch):
+    storage = LocalAvatarStorage(tmp_path / "avatars")
+    (storage.staging_directory).mkdir(parents=True)
+    (storage.staging_directory / "user_1_v1").write_bytes(b"original")
+
+    async def failing(*args, **kwargs):
+        raise AvatarUploadError("magazyn niedostępny")
+
+    monkeypatch.setattr(avatar_tasks, "_process_avatar_async", failing)
+    monkeypatch.setattr(avatar_tasks, "get_avatar_storage", lambda: storage)
+
+    result = process_avatar_task.apply(
+        args=(1, "user_1_v1", "v1"), retries=process_avatar_task.max_retries
+    )
+
+    assert isinstance(result.result, AvatarUploadError)
+    assert list(storage.staging_directory.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_local_staging_is_copied_in_chunks_outside_served_directory(
+    tmp_path, monkeypatch
+):
+    storage = LocalAvatarStorage(tmp_path / "avatars")
+    reads = []
+
+    class Source(io.BytesIO):
+        def read(self, size=-1):
+            reads.append(size)
+            return super().read(size)
+
+    await storage.stage("user_1_v1", Source(b"x" * 200_000))
+
+    assert reads and all(0 < size <= 64 * 1024 for size in reads)
+    assert (tmp_path / "avatars_staging" / "user_1_v1").stat().st_size == 200_000
+    assert not (tmp_path / "avatars").exists()
+
+
+@pytest.mark.asyncio
+async def test_local_storage_overwrites_atomically(tmp_path):
+    storage = LocalAvatarStorage(tmp_path, base_url="http://test")
+
+    await storage.save("user_1", b"first", "image/jpeg")
+    url = await storage.save("user_1", b"second", "image/jpeg")
+
+    assert url == storage.url_for("user_1", "image/jpeg")
+    assert (tmp_path / "user_1.jpg").read_bytes() == b"second"
+    assert [p.name for p in tmp_path.iterdir()] == ["user_1.jpg"]
+
+
+@pytest.mark.asyncio
+async def test_cloudinary_storage_uploads_outside_event_loop():
+    with patch(
+        "foodtracker_app.services.cloudinary_service.upload_image",
+        return_value="https://res.cloudinary.com/avatar.jpg",
+    ) as upload:
+        url = await CloudinaryAvatarStorage().save("user_7", b"data", "image/jpeg")
+
+    assert url == "https://res.cloudinary.com/avatar.jpg"
+    upload.assert_called_once_with(b"data", "user_7")
+
+
+@pytest.mark.asyncio
+async def test_cloudinary_staging_goes_through_private_originals():
+    source = io.BytesIO(b"original")
+    with (
+        patch(
+            "foodtracker_app.services.cloudinary_service.stage_original",
+            return_value=True,
+        ) as stage,
+        patch(
+            "foodtracker_app.services.cloudinary_service.download_staged",
+            return_value=b"original",
+        ),
+        patch("foodtracker_app.services.cloudinary_service.delete_staged") as delete,
+    ):
+        storage = CloudinaryAvatarStorage()
+        assert await storage.stage("user_7_v1", source)
+        assert await storage.load_staged("user_7_v1") == b"original"
+        await storage.discard_staged("user_7_v1")
+
+    stage.assert_called_once_with(source, "user_7_v1")
+    delete.assert_called_once_with("user_7_v1")
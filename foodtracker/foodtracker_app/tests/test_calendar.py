@@ -0,0 +1,139 @@
+from datetime import date, timedelta
+
+import pytest
+from httpx import AsyncClient
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _create_product(
+    client: AsyncClient, pantry_id: int, name: str, expiration: date, price=10.0
+) -> dict:
+    response = await client.post(
+        f"/pantries/{pantry_id}/products/create",
+        json={
+            "name": name,
+            "expiration_date": str(expiration),
+            "price": price,
+            "unit": "szt.",
+            "initial_amount": 2,
+        },
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+async def test_month_overview_aggregates_across_pantries(
+    authenticated_client: AsyncClient, fixed_date: date
+):
+    pantry_id = authenticated_client.pantry.id  # type: ignore
+    second = await authenticated_client.post("/pantries", json={"name": "Piwnica"})
+    second_pantry_id = second.json()["id"]
+
+    await _create_product(authenticated_client, pantry_id, "Mleko", fixed_date, 4.0)
+    await _create_product(authenticated_client, pantry_id, "Ser", fixed_date, 6.0)
+    await _create_product(
+        authenticated_client, second_pantry_id, "Dżem", fixed_date, 10.0
+    )
+    used = await _create_product(
+        authenticated_client, pantry_id, "Jogurt", fixed_date, 3.0
+    )
+    await authenticated_client.post(
+        f"/pantries/{pantry_id}/products/use/{used['id']}", json={"amount": 2}
+    )
+
+    response = await authenticated_client.get(
+        "/calendar_view/month",
+        params={"year": fixed_date.year, "month": fixed_date.month},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    day = next(d for d in data["days"] if d["date"] == str(fixed_date))
+    assert day["count"] == 3
+    assert day["value"] == pytest.approx(20.0)
+    breakdown = {p["pantry_id"]: p for p in day["pantries"]}
+    assert breakdown[pantry_id]["count"] == 2
+    assert breakdown[second_pantry_id]["pantry_name"] == "Piwnica"
+    assert breakdown[second_pantry_id]["value"] == pytest.approx(10.0)
+
+
+async def test_month_overview_rejects_invalid_month(
+    authenticated_client: AsyncClient,
+):
+    response = await authenticated_client.get(
+        "/calendar_view/month", params={"year": 2026, "month": 13}
+    )
+    assert response.status_code == 422
+
+
+async def test_day_drill_down_is_keyset_paginated(
+    authenticated_client: AsyncClient, fixed_date: date
+):
+    pantry_id = authenticated_client.pantry.id  # type: ignore
+    created = [
+        await _create_product(
+            authenticated_client, pantry_id, f"Produkt {i}", fixed_date
+        )
+        for i in range(3)
+    ]
+    await _create_product(
+        authenticated_client, pantry_id, "Inny dzień", fixed_date + timedelta(days=1)
+    )
+
+    first_page = await authenticated_client.get(
+        "/calendar_view/", params={"date": str(fixed_date), "limit": 2}
+    )
+    assert first_page.status_code == 200
+    first = first_page.json()
+    assert [p["id"] for p in first["items"]] == [created[0]["id"], created[1]["id"]]
+    assert first["next_cursor"] == created[1]["id"]
+
+    second_page = await authenticated_client.get(
+        "/calendar_view/",
+        params={"date": str(fixed_date), "limit": 2, "cursor": first["next_cursor"]},
+    )
+    second = second_page.json()
+    assert [p["id"] for p in second["items"]] == [created[2]["id"]]
+    assert second["next_cursor"] is None
+
+
+async def test_calendar_all_only_returns_own_products(
+    authenticated_client_factory, fixed_date: date
+):
+    client_a, pantry_a = await authenticated_client_factory(
+        "calendar.a@example.com", "password123"
+    )
+    await _create_product(client_a, pantry_a.id, "Produkt A", fixed_date)
+
+    client_b, _ = await authenticated_client_factory(
+        "calendar.b@example.com", "password456"
+    )
+    response = await client_b.get("/calendar_view/all")
+
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+async def test_day_drill_down_matches_month_count(
+    authenticated_client: AsyncClient, fixed_date: date
+):
+    pantry_id = authenticated_client.pantry.id  # type: ignore
+    active = await _create_product(authenticated_client, pantry_id, "Mleko", fixed_date)
+    used = await _create_product(authenticated_client, pantry_id, "Jogurt", fixed_date)
+    await authenticated_client.post(
+        f"/pantries/{pantry_id}/products/use/{used['id']}", json={"amount": 2}
+    )
+
+    month = await authenticated_client.get(
+        "/calendar_view/month",
+        params={"year": fixed_date.year, "month": fixed_date.month},
+    )
+    drill_down = await authenticated_client.get(
+        "/calendar_view/", params={"date": str(fixed_date)}
+    )
+
+    day = next(d for d in month.json()["days"] if d["date"] == str(fixed_date))
+    items = drill_down.json()["items"]
+    assert [p["id"] for p in items] == [active["id"]]
+    assert day["count"] == len(items)
@@ -0,0 +1,194 @@
+import pytest
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from foodtracker_app.models import (
+    EmailOutbox,
+    NotificationLog,
+    Pantry,
+    PantryInvitation,
+    Product,
+    ProductTombstone,
+    User,
+)
+from foodtracker_app.services import cleanup_tasks
+from foodtracker_app.services.cleanup_tasks import _cleanup_async
+
+pytestmark = pytest.mark.asyncio
+
+NOW = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+async def pantry(db: AsyncSession) -> Pantry:
+    owner = User(email="cleanup_owner@example.com", hashed_password="x")
+    db.add(owner)
+    await db.flush()
+    pantry = Pantry(name="Sprzątana", owner_id=owner.id)
+    db.add(pantry)
+    await db.commit()
+    return pantry
+
+
+async def test_expired_invitations_are_deleted_in_batches(
+    db: AsyncSession, pantry: Pantry, monkeypatch
+):
+    monkeypatch.setattr(cleanup_tasks.settings, "CLEANUP_BATCH_SIZE", 2)
+    db.add_all(
+        [
+            PantryInvitation(pantry_id=pantry.id, expires_at=NOW - timedelta(minutes=i))
+            for i in range(1, 6)
+        ]
+        + [PantryInvitation(pantry_id=pantry.id, expires_at=NOW + timedelta(minutes=5))]
+    )
+    await db.commit()
+
+    result = await _cleanup_async(db=db, now=NOW)
+
+    assert result["invitations"] == 5
+    assert await db.scalar(select(func.count(PantryInvitation.id))) == 1
+
+
+async def test_stale_tokens_are_cleared(db: AsyncSession):
+    old = NOW - timedelta(days=30)
+    recent = NOW - timedelta(hours=1)
+    db.add_all(
+        [
+            User(
+                email="used_token@example.com",
+                hashed_password="x",
+                is_verified=True,
+                verification_token="used:abc",
+                token_expires_at=old,
+            ),
+            User(
+                email="legacy_used@example.com",
+                hashed_password="x",
+                is_verified=True,
+                verification_token="used:def",
+            ),
+            User(
+                email="just_expired@example.com",
+                hashed_password="x",
+                verification_token="ghi",
+                token_expires_at=recent,
+                reset_password_token="reset-recent",
+                reset_password_expires_at=recent,
+            ),
+            User(
+                email="old_reset@example.com",
+                hashed_password="x",
+                reset_password_token="reset-old",
+                reset_password_expires_at=old,
+            ),
+        ]
+    )
+    await db.commit()
+
+    result = await _cleanup_async(db=db, now=NOW)
+
+    assert result["verification_tokens"] == 2
+    assert result["reset_tokens"] == 1
+    db.expire_all()
+    tokens = dict((await db.execute(select(User.email, User.verification_token))).all())
+    assert tokens["used_token@example.com"] is None
+    assert tokens["legacy_used@example.com"] is None
+    # Świeżo wygasły link wciąż ma pokazać "wygasł", nie "nieprawidłowy".
+    assert tokens["just_expired@example.com"] == "ghi"
+    resets = dict(
+        (await db.execute(select(User.email, User.reset_password_token))).all()
+    )
+    assert resets["old_reset@example.com"] is None
+    assert resets["just_expired@example.com"] == "reset-recent"
+
+
+async def test_old_tombstones_and_sent_emails_are_deleted(
+    db: AsyncSession, pantry: Pantry
+):
+    db.add_all(
+        [
+            ProductTombstone(
+                product_id=1, pantry_id=pantry.id, deleted_at=NOW - timedelta(days=90)
+            ),
+            ProductTombstone(
+                product_id=2, pantry_id=pantry.id, deleted_at=NOW - timedelta(days=1)
+            ),
+            EmailOutbox(
+                to_email="old@example.com",
+                subject="s",
+                body="b",
+                status="sent",
+                sent_at=NOW - timedelta(days=60),
+            ),
+            EmailOutbox(
+                to_email="dead@example.com",
+                subject="s",
+                body="b",
+                status="dead",
+                created_at=NOW - timedelta(days=60),
+            ),
+        ]
+    )
+    await db.commit()
+
+    result = await _cleanup_async(db=db, now=NOW)
+
+    assert (result["tombstones"], result["sent_emails"]) == (1, 1)
+    remaining = (await db.execute(select(ProductTombstone.product_id))).scalars().all()
+    assert remaining == [2]
+    outbox = (await db.execute(select(EmailOutbox.to_email))).scalars().all()
+    assert outbox == ["dead@example.com"]
+
+
+async def _log_with_orphan(db: AsyncSession, pantry: Pantry) -> Product:
+    product = Product(
+        name="Mleko",
+        pantry_id=pantry.id,
+        expiration_date=date(2026, 10, 20),
+        price=Decimal("3.50"),
+        unit="szt.",
+        initial_amount=Decimal("1"),
+        current_amount=Decimal("1"),
+    )
+    db.add(product)
+    await db.flush()
+    db.add_all(
+        [
+            NotificationLog(
+                user_id=pantry.owner_id, product_id=product.id, threshold=1
+            ),
+            NotificationLog(
+                user_id=pantry.owner_id, product_id=product.id + 1, threshold=1
+            ),
+        ]
+    )
+    await db.commit()
+    return product
+
+
+async def test_orphaned_notification_logs_are_deleted(
+    db: AsyncSession, pantry: Pantry, monkeypatch
+):
+    monkeypatch.setattr(cleanup_tasks.settings, "PRODUCTS_HASH_PARTITIONS", 8)
+    product = await _log_with_orphan(db, pantry)
+
+    result = await _cleanup_async(db=db, now=NOW)
+
+    assert result["orphaned_notification_logs"] == 1
+    remaining = (await db.execute(select(NotificationLog.product_id))).scalars().all()
+    assert remaining == [product.id]
+
+
+async def test_orphan_scan_is_skipped_without_partitioning(
+    db: AsyncSession, pantry: Pantry
+):
+    # Bez partycji klucz obcy z ON DELETE CASCADE sprząta dziennik sam.
+    await _log_with_orphan(db, pantry)
+
+    result = await _cleanup_async(db=db, now=NOW)
+
+    assert "orphaned_notification_logs" not in result
+    assert await db.scalar(select(func.count(NotificationLog.id))) == 2
@@ -1,5 +1,9 @@
+import time
+
 import pytest
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from foodtracker_app.db import database
 from foodtracker_app.db.database import get_async_session
 
 
@@ -9,3 +13,84 @@ async def test_get_async_session_returns_session():
     session = await session_gen.__anext__()
     assert isinstance(session, AsyncSession)
     await session.close()
+
+
+def test_build_engine_options_skips_pool_for_sqlite():
+    options = database.build_engine_options("sqlite+aiosqlite:///:memory:")
+    assert set(options) == {"echo"}
+
+
+def test_build_engine_options_configures_postgres_pool(monkeypatch):
+    monkeypatch.setattr(database.settings, "DB_POOL_SIZE", 12)
+    monkeypatch.setattr(database.settings, "DB_MAX_OVERFLOW", 3)
+    monkeypatch.setattr(database.settings, "DB_PGBOUNCER_TRANSACTION_MODE", False)
+
+    options = database.build_engine_options("postgresql+asyncpg://u:p@db/app")
+
+    assert options["poolclass"] is database.InstrumentedAsyncQueuePool
+    assert options["pool_size"] == 12
+    assert options["max_overflow"] == 3
+    assert options["pool_pre_ping"] is True
+    assert options["connect_args"] == {"prepared_statement_cache_size": 100}
+
+
+def test_build_engine_options_pgbouncer_profile_disables_statement_cache(
+    monkeypatch,
+):
+    monkeypatch.setattr(database.settings, "DB_PGBOUNCER_TRANSACTION_MODE", True)
+
+    options = database.build_engine_options("postgresql+asyncpg://u:p@db/app")
+    connect_args = options["connect_args"]
+
+    assert connect_args["statement_cache_size"] == 0
+    assert connect_args["prepared_statement_cache_size"] == 0
+    assert (
+        connect_args["prepared_statement_name_func"]()
+        != connect_args["prepared_statement_name_func"]()
+    )
+
+
+@pytest.mark.asyncio
+async def test_pool_stats_track_checkouts(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=database.InstrumentedAsyncQueuePool,
+        pool_size=2,
+    )
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            stats = database.get_pool_stats(engine)
+            assert stats["checked_out"] == 1
+
+        stats = database.get_pool_stats(engine)
+        assert stats["pool_class"] == "InstrumentedAsyncQueuePool"
+        assert stats["checked_out"] == 0
+        assert stats["checkouts"] == 1
+        assert stats["wait_time_max_seconds"] >= 0
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_pool_wait_time_excludes_connect_time(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=database.InstrumentedAsyncQueuePool,
+        pool_size=2,
+    )
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def slow_connect(dbapi_connection, connection_record):
+        time.sleep(0.2)
+
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+        stats = database.get_pool_stats(engine)
+        assert stats["connects"] == 1
+        assert stats["connect_time_max_seconds"] >= 0.2
+        assert stats["wait_time_max_seconds"] < 0.1
+    finally:
+        await engine.dispose()
@@ -0,0 +1,137 @@
+import time
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from starlette.requests import Request
+
+from foodtracker_app.auth.utils import create_access_token
+from foodtracker_app.db import routing
+from foodtracker_app.db.routing import ReplicaRouter, get_client_key
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+async def router(tmp_path):
+    replica_router = ReplicaRouter(
+        [
+            f"sqlite+aiosqlite:///{tmp_path / 'replica_a.db'}",
+            f"sqlite+aiosqlite:///{tmp_path / 'replica_b.db'}",
+        ],
+        sticky_seconds=60,
+        health_check_interval=10,
+    )
+    yield replica_router
+    await replica_router.stop()
+
+
+class SharedRedis:
+    """Minimalny Redis (SET PX / EXISTS) współdzielony przez kilka routerów."""
+
+    def __init__(self):
+        self.expires_at: dict[str, float] = {}
+
+    async def set(self, name: str, value: str, px: int) -> None:
+        self.expires_at[name] = time.monotonic() + px / 1000
+
+    async def exists(self, name: str) -> int:
+        return int(self.expires_at.get(name, 0) > time.monotonic())
+
+
+async def test_pick_engine_round_robin(router: ReplicaRouter):
+    picked = [await router.pick_engine("client") for _ in range(4)]
+    assert picked == [router.engines[0], router.engines[1]] * 2
+
+
+async def test_pick_engine_returns_primary_after_write(router: ReplicaRouter):
+    await router.mark_write("writer")
+
+    assert await router.pick_engine("writer") is None
+    assert await router.pick_engine("reader") is not None
+
+
+async def test_sticky_window_expires(router: ReplicaRouter):
+    router.sticky_seconds = 0
+    await router.mark_write("writer")
+
+    assert await router.pick_engine("writer") is not None
+
+
+async def test_sticky_window_spans_router_instances(tmp_path):
+    # Dwa procesy API: zapis trafia do jednego, kolejny odczyt do drugiego.
+    redis = SharedRedis()
+    routers = []
+    for name in ("a", "b"):
+        replica_router = ReplicaRouter(
+            [f"sqlite+aiosqlite:///{tmp_path / f'replica_{name}.db'}"],
+            sticky_seconds=60,
+            health_check_interval=10,
+        )
+        replica_router._redis = redis
+        routers.append(replica_router)
+    writer_process, reader_process = routers
+
+    await writer_process.mark_write("user:writer@example.com")
+
+    assert await reader_process.pick_engine("user:writer@example.com") is None
+    assert await reader_process.pick_engine("user:other@example.com") is not None
+    for replica_router in routers:
+        await replica_router.stop()
+
+
+def _request(headers: dict[str, str]) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/",
+            "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+            "client": ("10.0.0.7", 1234),
+        }
+    )
+
+
+async def test_client_key_is_the_user_not_the_token():
+    # Odświeżony access token to nadal ten sam klient.
+    first, second = (
+        create_access_token({"sub": "writer@example.com"}) for _ in range(2)
+    )
+
+    keys = {
+        await get_client_key(_request({"Authorization": f"Bearer {token}"}))
+        for token in (first, second)
+    }
+
+    assert keys == {"user:writer@example.com"}
+    assert await get_client_key(_request({})) == "ip:10.0.0.7"
+
+
+async def test_unhealthy_replica_is_skipped(router: ReplicaRouter):
+    router.engines[1] = create_async_engine(
+        "sqlite+aiosqlite:////nonexistent-dir/replica.db"
+    )
+
+    await router.check_health()
+
+    assert router.healthy == [True, False]
+    picked = {await router.pick_engine("client") for _ in range(3)}
+    assert picked == {router.engines[0]}
+
+
+async def test_all_replicas_down_falls_back_to_primary(router: ReplicaRouter):
+    router.healthy = [False, False]
+    assert await router.pick_engine("client") is None
+
+
+async def test_disabled_router_reads_from_primary():
+    assert not ReplicaRouter([], sticky_seconds=5, health_check_interval=10).enabled
+    assert not routing.replica_router.enabled
+
+
+async def test_read_endpoint_uses_primary_without_replicas(
+    authenticated_client: AsyncClient,
+):
+    pantry_id = authenticated_client.pantry.id  # type: ignore
+    response = await authenticated_client.get(f"/pantries/{pantry_id}/products/stats")
+    assert response.status_code == 200
@@ -0,0 +1,201 @@
+import pytest
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+
+from aiosmtplib import SMTPRecipientsRefused, SMTPServerDisconnected
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from foodtracker_app.models import EmailOutbox
+from foodtracker_app.services import email_tasks
+from foodtracker_app.services.email_outbox import (
+    DEAD,
+    PENDING,
+    SENDING,
+    SENT,
+    enqueue_email,
+)
+from foodtracker_app.services.email_tasks import _drain_outbox_async
+from foodtracker_app.tests.conftest import TestingSessionLocal
+
+pytestmark = pytest.mark.asyncio
+
+
+class FakeSMTP:
+    def __init__(self, fail_for=(), disconnect_after=None):
+        self.connections = 0
+        self.sent = []
+        self.fail_for = set(fail_for)
+        self.disconnect_after = disconnect_after
+        self.status_probe = None
+        self.committed_status = []
+
+    @asynccontextmanager
+    async def connection(self):
+        self.connections += 1
+        yield self
+
+    async def send_message(self, message):
+        if self.disconnect_after is not None and (
+            len(self.sent) >= self.disconnect_after
+        ):
+            raise SMTPServerDisconnected("Connection lost")
+        if message["To"] in self.fail_for:
+            raise SMTPRecipientsRefused([])
+        if self.status_probe is not None:
+            self.committed_status.append(await self.status_probe(message["To"]))
+        self.sent.append(message["To"])
+
+
+@pytest.fixture
+def smtp(monkeypatch):
+    monkeypatch.setattr(email_tasks.settings, "DEMO_MODE", False)
+    fake = FakeSMTP()
+    monkeypatch.setattr(email_tasks, "smtp_connection", fake.connection)
+    return fake
+
+
+async def _queue(db: AsyncSession, *recipients: str) -> None:
+    for to_email in recipients:
+        enqueue_email(db, to_email=to_email, subject="Temat", body="Treść")
+    await db.commit()
+
+
+async def _outbox(db: AsyncSession) -> dict[str, EmailOutbox]:
+    db.expire_all()
+    emails = (await db.execute(select(EmailOutbox))).scalars().all()
+    return {email.to_email: email for email in emails}
+
+
+async def test_enqueue_is_part_of_callers_transaction(db: AsyncSession):
+    enqueue_email(db, to_email="rollback@example.com", subject="Temat", body="Treść")
+    await db.rollback()
+
+    assert await _outbox(db) == {}
+
+
+async def test_drain_sends_batch_over_one_connection(smtp, db: AsyncSession):
+    await _queue(db, "a@example.com", "b@example.com", "c@example.com")
+
+    result = await _drain_outbox_async(db=db)
+
+    assert result == {"sent": 3, "failed": 0}
+    assert smtp.connections == 1
+    assert smtp.sent == ["a@example.com", "b@example.com", "c@example.com"]
+    assert {email.status for email in (await _outbox(db)).values()} == {SENT}
+
+
+async def test_drain_uses_one_connection_per_batch(smtp, db: AsyncSession, monkeypatch):
+    monkeypatch.setattr(email_tasks.settings, "EMAIL_OUTBOX_BATCH_SIZE", 2)
+    await _queue(db, "a@example.com", "b@example.com", "c@example.com")
+
+    await _drain_outbox_async(db=db)
+
+    assert smtp.connections == 2
+    assert len(smtp.sent) == 3
+
+
+async def test_failed_email_is_retried_later(smtp, db: AsyncSession):
+    smtp.fail_for = {"bad@example.com"}
+    await _queue(db, "bad@example.com", "good@example.com")
+
+    result = await _drain_outbox_async(db=db)
+
+    assert result == {"sent": 1, "failed": 1}
+    outbox = await _outbox(db)
+    bad = outbox["bad@example.com"]
+    assert bad.status == PENDING
+    assert bad.attempts == 1
+    assert bad.next_attempt_at > datetime.now(timezone.utc)
+    assert outbox["good@example.com"].status == SENT
+
+    # Przed upływem odstępu mail nie jest ponawiany.
+    assert await _drain_outbox_async(db=db) == {"sent": 0, "failed": 0}
+
+
+async def test_email_is_dead_lettered_after_max_attempts(
+    smtp, db: AsyncSession, monkeypatch
+):
+    monkeypatch.setattr(email_tasks.settings, "EMAIL_OUTBOX_MAX_ATTEMPTS", 2)
+    smtp.fail_for = {"bad@example.com"}
+    await _queue(db, "bad@example.com")
+
+    await _drain_outbox_async(db=db)
+    email = (await _outbox(db))["bad@example.com"]
+    email.next_attempt_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    await db.commit()
+    await _drain_outbox_async(db=db)
+
+    email = (await _outbox(db))["bad@example.com"]
+    assert email.status == DEAD
+    assert email.attempts == 2
+    assert email.last_error
+
+
+async def test_lost_connection_defers_rest_of_batch(smtp, db: AsyncSession):
+    smtp.disconnect_after = 1
+    await _queue(db, "a@example.com", "b@example.com", "c@example.com")
+
+    result = await _drain_outbox_async(db=db)
+
+    assert result == {"sent": 1, "failed": 2}
+    outbox = await _outbox(db)
+    assert outbox["a@example.com"].status == SENT
+    assert all(outbox[to].attempts == 1 for to in ("b@example.com", "c@example.com"))
+
+
+async def test_claim_is_committed_before_sending(smtp, db: AsyncSession):
+    async def committed_status(to_email: str) -> str:
+        # Osobna sesja widzi tylko zatwierdzone dane.
+        async with TestingSessionLocal() as other:
+            return await other.scalar(
+                select(EmailOutbox.status).where(EmailOutbox.to_email == to_email)
+            )
+
+    smtp.status_probe = committed_status
+    await _queue(db, "a@example.com", "b@example.com")
+
+    await _drain_outbox_async(db=db)
+
+    # Blokady wierszy nie trwają przez rozmowę z serwerem SMTP.
+    assert smtp.committed_status == [SENDING, SENDING]
+    assert {email.status for email in (await _outbox(db)).values()} == {SENT}
+
+
+async def test_expired_lease_is_claimed_again(smtp, db: AsyncSession):
+    now = datetime.now(timezone.utc)
+    for to_email, lease_until in (
+        ("crashed@example.com", now - timedelta(seconds=1)),
+        ("in-flight@example.com", now + timedelta(minutes=5)),
+    ):
+        email = enqueue_email(db, to_email=to_email, subject="Temat", body="Treść")
+        email.status = SENDING
+        email.next_attempt_at = lease_until
+    await db.commit()
+
+    result = await _drain_outbox_async(db=db)
+
+    assert result == {"sent": 1, "failed": 0}
+    assert smtp.sent == ["crashed@example.com"]
+    assert (await _outbox(db))["in-flight@example.com"].status == SENDING
+
+
+async def test_password_reset_queues_email_without_smtp(
+    authenticated_client_factory, db: AsyncSession, mocker
+):
+    send = mocker.patch(
+        "foodtracker_app.utils.email_utils.SMTP", side_effect=AssertionError
+    )
+    client, _ = await authenticated_client_factory(
+        "outbox_reset@example.com", "x", login=False
+    )
+
+    res = await client.post(
+        "/auth/request-password-reset", json={"email": "outbox_reset@example.com"}
+    )
+
+    assert res.status_code == 200
+    send.assert_not_called()
+    email = (await _outbox(db))["outbox_reset@example.com"]
+    assert email.status == PENDING
+    assert "reset-password?token=" in email.html
@@ -0,0 +1,164 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from foodtracker_app.models import Product
+from foodtracker_app.services import product_service
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture(autouse=True)
+def no_settle_window(monkeypatch):
+    monkeypatch.setattr(product_service, "SYNC_SETTLE_SECONDS", 0)
+
+
+async def _create_product(
+    client: AsyncClient, pantry_id: int, name: str, expiration: date
+) -> dict:
+    response = await client.post(
+        f"/pantries/{pantry_id}/products/create",
+        json={
+            "name": name,
+            "expiration_date": str(expiration),
+            "price": 5.0,
+            "unit": "szt.",
+            "initial_amount": 1,
+        },
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+async def test_expiring_feed_merges_all_pantries(authenticated_client: AsyncClient):
+    today = date.today()
+    pantry_id = authenticated_client.pantry.id  # type: ignore
+    second = await authenticated_client.post("/pantries", json={"name": "Garaż"})
+    second_pantry_id = second.json()["id"]
+
+    later = await _create_product(
+        authenticated_client, pantry_id, "Mleko", today + timedelta(days=3)
+    )
+    sooner = await _create_product(
+        authenticated_client, second_pantry_id, "Chleb", today + timedelta(days=1)
+    )
+    await _create_product(
+        authenticated_client, pantry_id, "Konserwa", today + timedelta(days=60)
+    )
+
+    response = await authenticated_client.get("/me/expiring", params={"days": 7})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["id"] for item in data["items"]] == [sooner["id"], later["id"]]
+    assert data["items"][0]["pantry_name"] == "Garaż"
+    assert data["items"][0]["days_left"] == 1
+    assert data["removed_ids"] == []
+
+
+async def test_expiring_feed_delta_returns_only_changes(
+    authenticated_client: AsyncClient,
+):
+    today = date.today()
+    pantry_id = authenticated_client.pantry.id  # type: ignore
+    unchanged = await _create_product(
+        authenticated_client, pantry_id, "Jogurt", today + timedelta(days=2)
+    )
+    to_use = await _create_product(
+        authenticated_client, pantry_id, "Ser", today + timedelta(days=2)
+    )
+
+    first = await authenticated_client.get("/me/expiring")
+    since = first.json()["server_time"]
+    assert {item["id"] for item in first.json()["items"]} == {
+        unchanged["id"],
+        to_use["id"],
+    }
+
+    empty_delta = await authenticated_client.get(
+        "/me/expiring", params={"since": since}
+    )
+    assert empty_delta.json()["items"] == []
+    assert empty_delta.json()["removed_ids"] == []
+
+    await authenticated_client.post(
+        f"/pantries/{pantry_id}/products/use/{to_use['id']}", json={"amount": 1}
+    )
+    added = await _create_product(
+        authenticated_client, pantry_id, "Szynka", today + timedelta(days=4)
+    )
+
+    delta = await authenticated_client.get("/me/expiring", params={"since": since})
+
+    assert delta.status_code == 200
+    assert [item["id"] for item in delta.json()["items"]] == [added["id"]]
+    assert delta.json()["removed_ids"] == [to_use["id"]]
+
+
+async def test_expiring_feed_delta_reports_deleted_products(
+    authenticated_client: AsyncClient,
+):
+    today = date.today()
+    pantry_id = authenticated_client.pantry.id  # type: ignore
+    product = await _create_product(
+        authenticated_client, pantry_id, "Kefir", today + timedelta(days=2)
+    )
+    since = (await authenticated_client.get("/me/expiring")).json()["server_time"]
+
+    await authenticated_client.delete(
+        f"/pantries/{pantry_id}/products/delete/{product['id']}"
+    )
+    delta = await authenticated_client.get("/me/expiring", params={"since": since})
+
+    assert delta.json()["items"] == []
+    assert delta.json()["removed_ids"] == [product["id"]]
+
+
+async def test_expiring_feed_delta_reports_products_that_expired(
+    authenticated_client: AsyncClient, db: AsyncSession
+):
+    today = date.today()
+    pantry_id = authenticated_client.pantry.id  # type: ignore
+    product = await _create_product(
+        authenticated_client, pantry_id, "Twaróg", today + timedelta(days=1)
+    )
+    # Stan sprzed trzech dni: produkt był w oknie, od tamtej pory nikt go
+    # nie ruszał, a wczoraj minęła jego data ważności.
+    await db.execute(
+        update(Product)
+        .where(Product.id == product["id"])
+        .values(
+            expiration_date=today - timedelta(days=1),
+            updated_at=datetime.now(timezone.utc) - timedelta(days=3),
+        )
+    )
+    await db.commit()
+    since = datetime.now(timezone.utc) - timedelta(days=2)
+
+    delta = await authenticated_client.get(
+        "/me/expiring", params={"since": since.isoformat()}
+    )
+
+    assert delta.json()["items"] == []
+    assert delta.json()["removed_ids"] == [product["id"]]
+
+
+async def test_expiring_feed_server_time_leaves_settle_window(
+    authenticated_client: AsyncClient, monkeypatch
+):
+    monkeypatch.setattr(product_service, "SYNC_SETTLE_SECONDS", 60)
+    pantry_id = authenticated_client.pantry.id  # type: ignore
+    product = await _create_product(
+        authenticated_client, pantry_id, "Maślanka", date.today() + timedelta(days=2)
+    )
+
+    first = await authenticated_client.get("/me/expiring")
+    since = first.json()["server_time"]
+    delta = await authenticated_client.get("/me/expiring", params={"since": since})
+
+    # Zapis sprzed chwili może należeć do transakcji zatwierdzonej po
+    # zapytaniu - kolejna delta podaje go jeszcze raz.
+    assert [item["id"] for item in delta.json()["items"]] == [product["id"]]
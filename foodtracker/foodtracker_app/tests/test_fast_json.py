@@ -0,0 +1,80 @@
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import List
+
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from foodtracker_app.auth.schemas import ProductExpiringSoon
+from foodtracker_app.utils.fast_json import FastJSONResponse, fast_response
+
+
+def test_fast_json_response_handles_decimal_and_dates():
+    response = FastJSONResponse({"price": Decimal("2.50"), "day": date(2026, 1, 2)})
+    assert json.loads(response.body) == {"price": 2.5, "day": "2026-01-02"}
+
+
+def test_fast_response_validates_once_and_keeps_headers():
+    item = ProductExpiringSoon(
+        id=1,
+        name="Mleko",
+        expiration_date=date(2026, 1, 2),
+        days_left=3,
+        current_amount=1.0,
+        unit="l",
+    )
+    sub_response = Response()
+    sub_response.headers["ETag"] = 'W/"1-1"'
+
+    response = fast_response(List[ProductExpiringSoon], [item], sub_response)
+
+    assert response.headers["ETag"] == 'W/"1-1"'
+    assert json.loads(response.body) == [
+        {
+            "name": "Mleko",
+            "expiration_date": "2026-01-02",
+            "external_id": None,
+            "id": 1,
+            "days_left": 3,
+            "current_amount": 1.0,
+            "unit": "l",
+        }
+    ]
+
+
+class _Priced(BaseModel):
+    name: str
+    price: Decimal
+    created_at: datetime
+    bought_on: date
+
+
+def test_fast_response_matches_response_model_wire_format():
+    items = [
+        _Priced(
+            name="Ser",
+            price=Decimal("12.50"),
+            created_at=datetime(2026, 1, 2, 3, 4, 5, 600000, tzinfo=timezone.utc),
+            bought_on=date(2026, 1, 2),
+        )
+    ]
+    app = FastAPI()
+
+    @app.get("/default", response_model=List[_Priced])
+    def default_path():
+        return items
+
+    @app.get("/fast", response_model=List[_Priced])
+    def fast_path():
+        return fast_response(List[_Priced], items)
+
+    client = TestClient(app)
+    expected = client.get("/default")
+    actual = client.get("/fast")
+
+    assert actual.headers["content-type"] == expected.headers["content-type"]
+    assert actual.json() == expected.json()
+    assert actual.json()[0]["price"] == "12.50"
+    assert actual.json()[0]["created_at"] == "2026-01-02T03:04:05.600000Z"
@@ -0,0 +1,27 @@
+import pytest
+from httpx import AsyncClient
+
+from foodtracker_app.core import security
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_db_pool_stats_are_hidden_from_other_ips(
+    client: AsyncClient, monkeypatch
+):
+    monkeypatch.setattr(security.settings, "ALLOWED_IPS", [])
+
+    response = await client.get("/health/db-pool")
+
+    assert response.status_code == 403
+
+
+async def test_db_pool_stats_are_served_to_allowed_ips(
+    client: AsyncClient, monkeypatch
+):
+    monkeypatch.setattr(security.settings, "ALLOWED_IPS", ["127.0.0.1"])
+
+    response = await client.get("/health/db-pool")
+
+    assert response.status_code == 200
+    assert "pool_class" in response.json()
@@ -0,0 +1,130 @@
+import pytest
+from httpx import AsyncClient
+from starlette.requests import Request
+
+from foodtracker_app.auth import utils
+from foodtracker_app.core.login_throttle import LoginThrottle, lockout_seconds
+from foodtracker_app.core.security import get_client_ip
+from foodtracker_app.settings import settings
+
+
+async def _login(client: AsyncClient, email: str, password: str):
+    return await client.post("/auth/login", json={"email": email, "password": password})
+
+
+@pytest.mark.asyncio
+async def test_account_is_locked_after_repeated_failures(
+    authenticated_client_factory,
+):
+    client, _ = await authenticated_client_factory(
+        "throttle@example.com", "password123", login=False
+    )
+    for _ in range(settings.LOGIN_MAX_FAILURES_PER_ACCOUNT):
+        response = await _login(client, "throttle@example.com", "zle-haslo")
+        assert response.status_code == 401
+
+    locked = await _login(client, "throttle@example.com", "password123")
+
+    assert locked.status_code == 429
+    assert int(locked.headers["Retry-After"]) >= settings.LOGIN_LOCKOUT_BASE_SECONDS
+
+
+@pytest.mark.asyncio
+async def test_successful_login_resets_account_failures(
+    authenticated_client_factory,
+):
+    client, _ = await authenticated_client_factory(
+        "reset.throttle@example.com", "password123", login=False
+    )
+    attempts = settings.LOGIN_MAX_FAILURES_PER_ACCOUNT - 1
+    for _ in range(attempts):
+        await _login(client, "reset.throttle@example.com", "zle-haslo")
+    assert (
+        await _login(client, "reset.throttle@example.com", "password123")
+    ).status_code == 200
+
+    for _ in range(attempts):
+        response = await _login(client, "reset.throttle@example.com", "zle-haslo")
+        assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_unknown_account_still_pays_for_hash(monkeypatch):
+    calls = []
+    original = utils._verify_dummy
+
+    def counting_verify(password):
+        calls.append(password)
+        return original(password)
+
+    monkeypatch.setattr(utils, "_verify_dummy", counting_verify)
+
+    assert await utils.verify_and_update_password("haslo", None) == (False, None)
+    assert calls == ["haslo"]
+
+
+def test_lockout_grows_exponentially_up_to_max():
+    threshold = 5
+    assert lockout_seconds(threshold - 1, threshold) == 0
+    assert lockout_seconds(threshold, threshold) == settings.LOGIN_LOCKOUT_BASE_SECONDS
+    assert (
+        lockout_seconds(threshold + 2, threshold)
+        == 4 * settings.LOGIN_LOCKOUT_BASE_SECONDS
+    )
+    assert (
+        lockout_seconds(threshold + 50, threshold) == settings.LOGIN_LOCKOUT_MAX_SECONDS
+    )
+
+
+@pytest.mark.asyncio
+async def test_memory_locks_are_bounded(monkeypatch):
+    monkeypatch.setattr(settings, "MEMORY_FALLBACK_MAX_KEYS", 2)
+    throttle = LoginThrottle(None)
+    for ip in ("10.0.0.1", "10.0.0.2", "10.0.0.3"):
+        await throttle._lock(throttle._ip_key(ip), 60)
+
+    assert len(throttle._locked_until) == 2
+    assert throttle._memory_locked_for([throttle._ip_key("10.0.0.1")]) == 0
+    assert throttle._memory_locked_for([throttle._ip_key("10.0.0.3")]) > 0
+
+
+def _request(peer: str, forwarded_for: str | None = None) -> Request:
+    headers = []
+    if forwarded_for is not None:
+        headers.append((b"x-forwarded-for", forwarded_for.encode()))
+    return Request({"type": "http", "headers": headers, "client": (peer, 1234)})
+
+
+def test_client_ip_ignores_forwarded_for_from_untrusted_peer(monkeypatch):
+    monkeypatch.setattr(settings, "TRUSTED_PROXIES", [])
+
+    assert get_client_ip(_request("203.0.113.5", "198.51.100.1")) == "203.0.113.5"
+
+
+def test_client_ip_skips_trusted_proxies_from_the_right(monkeypatch):
+    monkeypatch.setattr(settings, "TRUSTED_PROXIES", ["10.0.0.0/8"])
+
+    # Pierwszy wpis dopisał sam klient - liczy się adres dodany przez proxy.
+    request = _request("10.0.0.2", "1.2.3.4, 198.51.100.7, 10.0.0.3")
+
+    assert get_client_ip(request) == "198.51.100.7"
+    assert get_client_ip(_request("10.0.0.2")) == "10.0.0.2"
+
+
+@pytest.mark.asyncio
+async def test_spoofed_forwarded_for_does_not_reset_ip_limit(
+    client: AsyncClient, monkeypatch
+):
+    monkeypatch.setattr(settings, "TRUSTED_PROXIES", [])
+    monkeypatch.setattr(settings, "LOGIN_MAX_FAILURES_PER_IP", 2)
+
+    statuses = []
+    for i in range(3):
+        response = await client.post(
+            "/auth/login",
+            json={"email": f"spoof{i}@example.com", "password": "zle-haslo"},
+            headers={"X-Forwarded-For": f"198.51.100.{i}"},
+        )
+        statuses.append(response.status_code)
+
+    assert statuses == [401, 401, 429]
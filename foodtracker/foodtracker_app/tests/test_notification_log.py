@@ -0,0 +1,117 @@
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import AsyncMock, patch
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from foodtracker_app.models import (
+    EmailOutbox,
+    NotificationLog,
+    NotificationRun,
+    Pantry,
+    PantryUser,
+    Product,
+    User,
+)
+from foodtracker_app.notifications import tasks
+from foodtracker_app.notifications.tasks import (
+    _run_notification_logic_async,
+    threshold_for,
+)
+
+pytestmark = pytest.mark.asyncio
+
+
+def _render(name, contexts, **common):
+    return ["<html>dummy</html>"] * len(contexts)
+
+
+async def _outbox(db: AsyncSession) -> list[EmailOutbox]:
+    return (await db.execute(select(EmailOutbox))).scalars().all()
+
+
+async def _user_with_product(db: AsyncSession, email: str, days_left: int):
+    user = User(
+        email=email,
+        hashed_password="pwd",
+        is_verified=True,
+        send_expiration_notifications=True,
+        timezone="UTC",
+    )
+    db.add(user)
+    await db.commit()
+    pantry = Pantry(name=f"Spiżarnia {email}", owner_id=user.id)
+    db.add(pantry)
+    await db.commit()
+    product = Product(
+        name="Jogurt",
+        pantry_id=pantry.id,
+        expiration_date=date.today() + timedelta(days=days_left),
+        price=Decimal("2.50"),
+        unit="szt.",
+        initial_amount=Decimal("1.0"),
+        current_amount=Decimal("1.0"),
+    )
+    db.add_all(
+        [PantryUser(user_id=user.id, pantry_id=pantry.id, role="owner"), product]
+    )
+    await db.commit()
+    return user, product
+
+
+async def test_threshold_for_picks_smallest_matching_threshold():
+    assert threshold_for(0, [0, 1, 3]) == 0
+    assert threshold_for(1, [0, 1, 3]) == 1
+    assert threshold_for(2, [0, 1, 3]) == 3
+    assert threshold_for(4, [0, 1, 3]) is None
+
+
+@patch.object(tasks, "render_batch", new_callable=AsyncMock, side_effect=_render)
+async def test_second_run_does_not_resend(_mock_render, db: AsyncSession):
+    user, product = await _user_with_product(db, "once@example.com", days_left=2)
+
+    await _run_notification_logic_async(db=db, run_key="run-1")
+    await _run_notification_logic_async(db=db, run_key="run-2")
+
+    assert len(await _outbox(db)) == 1
+    logs = (await db.execute(select(NotificationLog))).scalars().all()
+    assert [(log.user_id, log.product_id) for log in logs] == [(user.id, product.id)]
+
+
+@patch.object(tasks, "render_batch", new_callable=AsyncMock, side_effect=_render)
+async def test_product_is_announced_again_at_lower_threshold(
+    _mock_render, db: AsyncSession
+):
+    _, product = await _user_with_product(db, "twice@example.com", days_left=2)
+    await _run_notification_logic_async(db=db, run_key="day-1")
+
+    product.expiration_date = date.today() + timedelta(days=1)
+    await db.commit()
+    await _run_notification_logic_async(db=db, run_key="day-2")
+
+    assert len(await _outbox(db)) == 2
+    thresholds = (await db.execute(select(NotificationLog.threshold))).scalars().all()
+    assert sorted(thresholds) == [1, max(tasks.notification_thresholds())]
+
+
+@patch.object(tasks, "render_batch", new_callable=AsyncMock, side_effect=_render)
+async def test_interrupted_run_resumes_from_checkpoint(_mock_render, db: AsyncSession):
+    first, _ = await _user_with_product(db, "first@example.com", days_left=0)
+    second, _ = await _user_with_product(db, "second@example.com", days_left=0)
+    db.add(NotificationRun(run_key="crashed", last_user_id=first.id))
+    await db.commit()
+
+    result = await _run_notification_logic_async(db=db, run_key="crashed")
+
+    assert result == {"status": "success", "users_notified": 1}
+    assert [email.to_email for email in await _outbox(db)] == [second.email]
+    run = (
+        await db.execute(
+            select(NotificationRun).where(NotificationRun.run_key == "crashed")
+        )
+    ).scalar_one()
+    assert run.status == "completed"
+    assert run.last_user_id == second.id
+    assert run.finished_at is not None
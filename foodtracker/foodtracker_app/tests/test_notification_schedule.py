@@ -0,0 +1,154 @@
+import pytest
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from unittest.mock import AsyncMock, patch
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from foodtracker_app.models import (
+    EmailOutbox,
+    NotificationLog,
+    Pantry,
+    PantryUser,
+    Product,
+    User,
+)
+from foodtracker_app.notifications import tasks
+from foodtracker_app.notifications.tasks import _run_notification_logic_async
+
+pytestmark = pytest.mark.asyncio
+
+# 08:00 UTC w październiku to 10:00 w Warszawie (CEST) i 04:00 w Nowym Jorku.
+NOW = datetime(2026, 10, 19, 8, 0, tzinfo=timezone.utc)
+
+
+def _render(name, contexts, **common):
+    return ["<html>dummy</html>"] * len(contexts)
+
+
+async def _subscriber(db: AsyncSession, email: str, zone: str, hour: int) -> User:
+    user = User(
+        email=email,
+        hashed_password="pwd",
+        is_verified=True,
+        send_expiration_notifications=True,
+        timezone=zone,
+        notification_hour=hour,
+    )
+    db.add(user)
+    await db.commit()
+    pantry = Pantry(name=f"Spiżarnia {email}", owner_id=user.id)
+    db.add(pantry)
+    await db.commit()
+    db.add_all(
+        [
+            PantryUser(user_id=user.id, pantry_id=pantry.id, role="owner"),
+            Product(
+                name="Kefir",
+                pantry_id=pantry.id,
+                expiration_date=date(2026, 10, 20),
+                price=Decimal("3.00"),
+                unit="szt.",
+                initial_amount=Decimal("1.0"),
+                current_amount=Decimal("1.0"),
+            ),
+        ]
+    )
+    await db.commit()
+    return user
+
+
+@patch.object(tasks, "render_batch", new_callable=AsyncMock, side_effect=_render)
+async def test_hourly_run_notifies_only_due_bucket(_mock_render, db: AsyncSession):
+    due = await _subscriber(db, "warsaw@example.com", "Europe/Warsaw", 10)
+    await _subscriber(db, "utc@example.com", "UTC", 10)
+    await _subscriber(db, "ny@example.com", "America/New_York", 10)
+
+    result = await _run_notification_logic_async(
+        db=db, run_key="2026-10-19@08", now=NOW, due_only=True
+    )
+
+    assert result == {"status": "success", "users_notified": 1}
+    outbox = (await db.execute(select(EmailOutbox.to_email))).scalars().all()
+    assert outbox == [due.email]
+
+
+@patch.object(tasks, "render_batch", new_callable=AsyncMock, side_effect=_render)
+async def test_expiry_is_measured_in_user_local_date(_mock_render, db: AsyncSession):
+    # 23:30 UTC 19.10 to już 20.10 w Tokio - produkt wygasa "dziś", nie jutro.
+    late = datetime(2026, 10, 19, 23, 30, tzinfo=timezone.utc)
+    await _subscriber(db, "tokyo@example.com", "Asia/Tokyo", 8)
+
+    await _run_notification_logic_async(
+        db=db, run_key="2026-10-19@23", now=late, due_only=True
+    )
+
+    threshold = (await db.execute(select(NotificationLog.threshold))).scalar_one()
+    assert threshold == 0
+
+
+@patch.object(tasks, "render_batch", new_callable=AsyncMock, side_effect=_render)
+async def test_missed_send_hour_is_caught_up_once(_mock_render, db: AsyncSession):
+    # Przebieg o 09:00 w Warszawie (07:00 UTC) nie odbył się.
+    user = await _subscriber(db, "late@example.com", "Europe/Warsaw", 9)
+
+    caught_up = await _run_notification_logic_async(
+        db=db, run_key="2026-10-19@08", now=NOW, due_only=True
+    )
+    next_hour = await _run_notification_logic_async(
+        db=db,
+        run_key="2026-10-19@09",
+        now=NOW.replace(hour=9),
+        due_only=True,
+    )
+
+    assert caught_up == {"status": "success", "users_notified": 1}
+    assert next_hour["status"] == "success"
+    assert "users_notified" not in next_hour
+    outbox = (await db.execute(select(EmailOutbox.to_email))).scalars().all()
+    assert outbox == [user.email]
+    await db.refresh(user)
+    assert user.last_notified_on == date(2026, 10, 19)
+
+
+@patch.object(tasks, "render_batch", new_callable=AsyncMock, side_effect=_render)
+async def test_send_hour_skipped_by_dst_is_not_lost(_mock_render, db: AsyncSession):
+    # 8.03.2026 w Nowym Jorku zegar przeskakuje z 02:00 na 03:00.
+    await _subscriber(db, "dst@example.com", "America/New_York", 2)
+    dst_morning = datetime(2026, 3, 8, 7, 0, tzinfo=timezone.utc)
+
+    result = await _run_notification_logic_async(
+        db=db, run_key="2026-03-08@07", now=dst_morning, due_only=True
+    )
+
+    assert result["status"] == "success"
+    assert await db.scalar(select(User.last_notified_on)) == date(2026, 3, 8)
+
+
+async def test_update_settings_sets_schedule(authenticated_client):
+    response = await authenticated_client.patch(
+        "/auth/me/settings",
+        json={
+            "send_expiration_notifications": True,
+            "timezone": "Europe/London",
+            "notification_hour": 18,
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.json()["timezone"] == "Europe/London"
+    assert response.json()["notification_hour"] == 18
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [{"timezone": "Mars/Olympus_Mons"}, {"notification_hour": 24}],
+)
+async def test_update_settings_rejects_invalid_schedule(authenticated_client, payload):
+    response = await authenticated_client.patch(
+        "/auth/me/settings",
+        json={"send_expiration_notifications": True, **payload},
+    )
+
+    assert response.status_code == 422
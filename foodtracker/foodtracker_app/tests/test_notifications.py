@@ -1,25 +1,23 @@
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 import redis
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from foodtracker_app.models import EmailOutbox
 from foodtracker_app.notifications.tasks import _run_notification_logic_async
 from foodtracker_app.notifications.utils import send_email_reminder
 import foodtracker_app.notifications.celery_worker as worker
 
 
 @pytest.mark.asyncio
-async def test_notify_expiring_products_sends_mail(db: AsyncSession, mocker):
+async def test_notify_expiring_products_sends_mail(db: AsyncSession):
     """
     Testuje, czy funkcja NIE wysyła e-maili, gdy baza jest pusta.
     """
-    send_mail = mocker.patch(
-        "foodtracker_app.notifications.tasks.send_email_async", new=AsyncMock()
-    )
-
     await _run_notification_logic_async(db=db)
 
-    send_mail.assert_not_awaited()
+    assert (await db.execute(select(EmailOutbox))).scalars().all() == []
 
 
 @pytest.mark.asyncio
@@ -1,11 +1,12 @@
 import pytest
 from unittest.mock import patch, AsyncMock
 from datetime import date, timedelta
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from decimal import Decimal
 
 from foodtracker_app.notifications.tasks import _run_notification_logic_async
-from foodtracker_app.models import User, Pantry, PantryUser, Product
+from foodtracker_app.models import EmailOutbox, User, Pantry, PantryUser, Product
 
 pytestmark = pytest.mark.asyncio
 
@@ -48,10 +49,9 @@ async def pantry_with_users(db: AsyncSession):
 
 
 @pytest.mark.asyncio
-@patch("foodtracker_app.notifications.tasks.send_email_async", new_callable=AsyncMock)
-@patch("foodtracker_app.notifications.tasks.render_template", new_callable=AsyncMock)
+@patch("foodtracker_app.notifications.tasks.render_batch", new_callable=AsyncMock)
 async def test_notify_expiring_products_sends_to_correct_user(
-    mock_render, mock_send, pantry_with_users
+    mock_render, pantry_with_users
 ):
     db = pantry_with_users["db"]
     user_ok = pantry_with_users["user_ok"]
@@ -70,51 +70,20 @@ async def test_notify_expiring_products_sends_to_correct_user(
     await db.commit()
 
     db.expire_all()
+    mock_render.side_effect = lambda name, contexts, **common: [
+        "<html>dummy</html>"
+    ] * len(contexts)
     await _run_notification_logic_async(db=db)
 
-    mock_send.assert_awaited_once()
-    _args, kwargs = mock_send.await_args
-    assert kwargs["to_email"] == user_ok.email
+    outbox = (await db.execute(select(EmailOutbox))).scalars().all()
+    assert [email.to_email for email in outbox] == [user_ok.email]
+    assert outbox[0].html == "<html>dummy</html>"
 
 
 @pytest.mark.asyncio
-@patch("foodtracker_app.notifications.tasks.send_email_async", new_callable=AsyncMock)
-async def test_notify_no_expiring_products_does_nothing(mock_send, db: AsyncSession):
+async def test_notify_no_expiring_products_does_nothing(db: AsyncSession):
     await _run_notification_logic_async(db=db)
-    mock_send.assert_not_awaited()
-
-
-@pytest.mark.asyncio
-@patch("foodtracker_app.notifications.tasks.render_template", new_callable=AsyncMock)
-@patch("foodtracker_app.notifications.tasks.logger")
-@patch("foodtracker_app.notifications.tasks.send_email_async", new_callable=AsyncMock)
-async def test_notify_email_send_failure_is_logged(
-    mock_send, mock_logger, mock_render, pantry_with_users
-):
-    db = pantry_with_users["db"]
-    mock_render.return_value = "<html>dummy</html>"
-    pantry_id = pantry_with_users["pantry_id"]
-
-    product = Product(
-        name="Ser",
-        pantry_id=pantry_id,
-        expiration_date=date.today() + timedelta(days=1),
-        price=Decimal("10.0"),
-        unit="szt.",
-        initial_amount=Decimal("1.0"),
-        current_amount=Decimal("1.0"),
-    )
-    db.add(product)
-    await db.commit()
-    db.expire_all()
-
-    mock_send.side_effect = Exception("SMTP server is down")
-
-    await _run_notification_logic_async(db=db)
-
-    mock_logger.error.assert_called_once()
-    log_msg, *_ = mock_logger.error.call_args[0]
-    assert "Nie udało się wysłać emaila" in log_msg
+    assert (await db.execute(select(EmailOutbox))).scalars().all() == []
 
 
 @pytest.mark.asyncio
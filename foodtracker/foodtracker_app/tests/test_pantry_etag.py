@@ -0,0 +1,86 @@
+from datetime import date, timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from foodtracker_app.models import PantryUser
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _create_product(client: AsyncClient, pantry_id: int) -> dict:
+    response = await client.post(
+        f"/pantries/{pantry_id}/products/create",
+        json={
+            "name": "Masło",
+            "expiration_date": str(date.today() + timedelta(days=3)),
+            "price": 7.0,
+            "unit": "szt.",
+            "initial_amount": 2,
+        },
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+async def test_matching_etag_returns_304(authenticated_client: AsyncClient):
+    pantry_id = authenticated_client.pantry.id  # type: ignore
+    await _create_product(authenticated_client, pantry_id)
+    url = f"/pantries/{pantry_id}/products/get"
+
+    first = await authenticated_client.get(url)
+    etag = first.headers["ETag"]
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    second = await authenticated_client.get(url, headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["ETag"] == etag
+
+
+async def test_product_and_membership_writes_change_etag(
+    authenticated_client_factory, db: AsyncSession
+):
+    owner, pantry = await authenticated_client_factory(
+        "etag.owner@example.com", "password123"
+    )
+    url = f"/pantries/{pantry.id}/products/expiring-soon"
+    etags = [(await owner.get(url)).headers["ETag"]]
+
+    product = await _create_product(owner, pantry.id)
+    etags.append((await owner.get(url)).headers["ETag"])
+
+    await owner.post(
+        f"/pantries/{pantry.id}/products/use/{product['id']}", json={"amount": 1}
+    )
+    etags.append((await owner.get(url)).headers["ETag"])
+
+    _, member_pantry = await authenticated_client_factory(
+        "etag.member@example.com", "password456", login=False
+    )
+    db.add(PantryUser(pantry_id=pantry.id, user_id=member_pantry.owner_id))
+    await db.commit()
+    removed = await owner.delete(
+        f"/pantries/{pantry.id}/members/{member_pantry.owner_id}"
+    )
+    assert removed.status_code == 204
+    etags.append((await owner.get(url)).headers["ETag"])
+
+    assert len(set(etags)) == len(etags)
+    stale = await owner.get(url, headers={"If-None-Match": etags[0]})
+    assert stale.status_code == 200
+
+
+async def test_etag_lookup_checks_membership(authenticated_client_factory):
+    _, pantry = await authenticated_client_factory("etag.a@example.com", "password123")
+    outsider, _ = await authenticated_client_factory(
+        "etag.b@example.com", "password456"
+    )
+
+    response = await outsider.get(
+        f"/pantries/{pantry.id}/products/get", headers={"If-None-Match": "*"}
+    )
+
+    assert response.status_code == 404
@@ -0,0 +1,145 @@
+import asyncio
+import json
+from datetime import date, timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from foodtracker_app.models import PantryUser
+from foodtracker_app.services import pantry_events
+from foodtracker_app.services.pantry_events import PantryEventBroker
+
+pytestmark = pytest.mark.asyncio
+
+
+class _FakeRequest:
+    def __init__(self, checks_before_disconnect: int):
+        self.remaining = checks_before_disconnect
+
+    async def is_disconnected(self) -> bool:
+        self.remaining -= 1
+        return self.remaining < 0
+
+
+async def _create_product(client: AsyncClient, pantry_id: int) -> dict:
+    response = await client.post(
+        f"/pantries/{pantry_id}/products/create",
+        json={
+            "name": "Mleko",
+            "expiration_date": str(date.today() + timedelta(days=5)),
+            "price": 4.0,
+            "unit": "szt.",
+            "initial_amount": 2,
+        },
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+async def test_product_writes_publish_deltas(authenticated_client: AsyncClient):
+    pantry_id = authenticated_client.pantry.id  # type: ignore
+
+    async with pantry_events.broker.subscribe(pantry_id) as queue:
+        product = await _create_product(authenticated_client, pantry_id)
+        await authenticated_client.post(
+            f"/pantries/{pantry_id}/products/use/{product['id']}", json={"amount": 1}
+        )
+        await authenticated_client.delete(
+            f"/pantries/{pantry_id}/products/delete/{product['id']}"
+        )
+
+        events = [queue.get_nowait() for _ in range(queue.qsize())]
+
+    assert [event["type"] for event in events] == [
+        pantry_events.PRODUCT_CREATED,
+        pantry_events.PRODUCT_USED,
+        pantry_events.PRODUCT_DELETED,
+    ]
+    assert events[0]["product"]["name"] == "Mleko"
+    assert events[1]["product"]["current_amount"] == 1
+    assert events[2]["product"] == {"id": product["id"]}
+    assert all(event["pantry_id"] == pantry_id for event in events)
+
+
+async def test_broker_only_delivers_to_matching_pantry():
+    broker = PantryEventBroker()
+    async with broker.subscribe(1) as first, broker.subscribe(2) as second:
+        await broker.publish(1, {"type": "product.created", "pantry_id": 1})
+
+        assert first.get_nowait()["pantry_id"] == 1
+        assert second.empty()
+
+    assert broker._subscribers == {}
+
+
+async def test_slow_subscriber_gets_resync(monkeypatch):
+    monkeypatch.setattr(pantry_events, "SUBSCRIBER_QUEUE_SIZE", 2)
+    broker = PantryEventBroker()
+    async with broker.subscribe(1) as queue:
+        for i in range(3):
+            broker.dispatch(1, {"type": "product.updated", "pantry_id": 1, "n": i})
+
+        assert queue.qsize() == 1
+        assert queue.get_nowait()["type"] == pantry_events.RESYNC
+
+
+async def test_event_stream_formats_sse(monkeypatch):
+    broker = PantryEventBroker()
+    monkeypatch.setattr(pantry_events, "broker", broker)
+    stream = pantry_events.event_stream(_FakeRequest(2), 7, 1, heartbeat=0.01)
+
+    assert await anext(stream) == ": connected\n\n"
+    assert await anext(stream) == ": ping\n\n"
+
+    event = {"type": "product.deleted", "pantry_id": 7, "product": {"id": 3}}
+    await broker.publish(7, event)
+    chunk = await anext(stream)
+    assert chunk.startswith("event: product.deleted\ndata: ")
+    assert json.loads(chunk.split("data: ", 1)[1]) == event
+
+    with pytest.raises(StopAsyncIteration):
+        await asyncio.wait_for(anext(stream), timeout=1)
+
+
+async def test_event_stream_closes_when_member_is_removed(monkeypatch):
+    broker = PantryEventBroker()
+    monkeypatch.setattr(pantry_events, "broker", broker)
+    stream = pantry_events.event_stream(_FakeRequest(10), 7, 1, heartbeat=1)
+    assert await anext(stream) == ": connected\n\n"
+
+    other = {"type": pantry_events.MEMBER_REMOVED, "pantry_id": 7, "user_id": 2}
+    await broker.publish(7, other)
+    assert (await anext(stream)).startswith("event: member.removed")
+
+    removed = {"type": pantry_events.MEMBER_REMOVED, "pantry_id": 7, "user_id": 1}
+    await broker.publish(7, removed)
+    assert (await anext(stream)).startswith("event: member.removed")
+    with pytest.raises(StopAsyncIteration):
+        await asyncio.wait_for(anext(stream), timeout=1)
+
+
+async def test_membership_changes_publish_events(
+    authenticated_client_factory, db: AsyncSession
+):
+    owner, pantry = await authenticated_client_factory(
+        "events.owner@example.com", "password123"
+    )
+    _, member_pantry = await authenticated_client_factory(
+        "events.member@example.com", "password456", login=False
+    )
+    member_id = member_pantry.owner_id
+    db.add(PantryUser(pantry_id=pantry.id, user_id=member_id))
+    await db.commit()
+
+    async with pantry_events.broker.subscribe(pantry.id) as queue:
+        removed = await owner.delete(f"/pantries/{pantry.id}/members/{member_id}")
+        deleted = await owner.delete(f"/pantries/{pantry.id}")
+
+        events = [queue.get_nowait() for _ in range(queue.qsize())]
+
+    assert (removed.status_code, deleted.status_code) == (204, 204)
+    assert [(event["type"], event["user_id"]) for event in events] == [
+        (pantry_events.MEMBER_REMOVED, member_id),
+        (pantry_events.PANTRY_DELETED, None),
+    ]
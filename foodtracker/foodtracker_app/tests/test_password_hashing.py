@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from passlib.context import CryptContext
+from sqlalchemy.future import select
+
+from foodtracker_app.auth import utils
+from foodtracker_app.auth.utils import (
+    hash_password,
+    verify_and_update_password,
+    verify_password_async,
+)
+from foodtracker_app.models.user import User
+from foodtracker_app.tests.conftest import TestingSessionLocal
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_password_hashing_does_not_block_event_loop():
+    hashed = hash_password("secret123")
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.001)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    results = await asyncio.gather(
+        *(verify_password_async("secret123", hashed) for _ in range(4))
+    )
+    task.cancel()
+
+    assert all(results)
+    assert ticks > 10
+
+
+async def test_unknown_hash_never_verifies():
+    assert await verify_password_async("social", "social") is False
+    assert await verify_and_update_password("social", "social") == (False, None)
+
+
+async def test_login_rehashes_outdated_password(
+    authenticated_client_factory, monkeypatch
+):
+    await authenticated_client_factory("rehash@example.com", "password123", login=False)
+    monkeypatch.setattr(
+        utils,
+        "pwd_context",
+        CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=4),
+    )
+
+    client: AsyncClient
+    client, _ = await authenticated_client_factory("rehash@example.com", "password123")
+
+    async with TestingSessionLocal() as session:
+        user = await session.scalar(
+            select(User).where(User.email == "rehash@example.com")
+        )
+    assert user.hashed_password.startswith("$2b$04$")
+
+    relogin = await client.post(
+        "/auth/login", json={"email": "rehash@example.com", "password": "password123"}
+    )
+    assert relogin.status_code == 200
@@ -0,0 +1,98 @@
+import pytest
+from limits import parse
+from starlette.requests import Request
+
+import rate_limiter
+from foodtracker_app.auth import principal as principal_module
+from foodtracker_app.auth.utils import create_access_token
+
+
+def _request(authorization: str | None = None) -> Request:
+    headers = []
+    if authorization:
+        headers.append((b"authorization", authorization.encode()))
+    return Request({"type": "http", "headers": headers, "client": ("10.0.0.1", 1)})
+
+
+@pytest.mark.asyncio
+async def test_token_is_decoded_once_per_request(
+    authenticated_client_factory, monkeypatch
+):
+    client, _ = await authenticated_client_factory("once@example.com", "password123")
+    calls = []
+    original = principal_module.decode_token
+
+    def counting_decode(token):
+        calls.append(token)
+        return original(token)
+
+    monkeypatch.setattr(principal_module, "decode_token", counting_decode)
+
+    response = await client.get("/auth/me")
+
+    assert response.status_code == 200
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_invalid_token_keeps_original_error(client):
+    response = await client.get(
+        "/auth/me", headers={"Authorization": "Bearer nie-token"}
+    )
+
+    assert response.status_code == 401
+    assert response.json()["detail"].startswith("Could not validate credentials")
+
+
+@pytest.mark.asyncio
+async def test_user_limit_applies_across_routes(
+    authenticated_client_factory, monkeypatch
+):
+    monkeypatch.setattr(rate_limiter, "user_rate_limit", parse("2/minute"))
+    client, pantry = await authenticated_client_factory(
+        "limited@example.com", "password123"
+    )
+
+    assert (await client.get("/auth/me")).status_code == 200
+    assert (await client.get(f"/pantries/{pantry.id}/products/get")).status_code == 200
+    limited = await client.get("/pantries")
+
+    assert limited.status_code == 429
+    assert int(limited.headers["Retry-After"]) >= 1
+
+    other_token = create_access_token({"sub": "inny@example.com"})
+    other = await client.get(
+        "/auth/me", headers={"Authorization": f"Bearer {other_token}"}
+    )
+    assert other.status_code != 429
+
+
+@pytest.mark.asyncio
+async def test_user_key_uses_principal_or_ip():
+    token = create_access_token({"sub": "klucz@example.com"})
+    authenticated = _request(f"Bearer {token}")
+    anonymous = _request()
+    await principal_module.resolve_principal(authenticated)
+    await principal_module.resolve_principal(anonymous)
+
+    assert rate_limiter.get_user_key(authenticated) == "user:klucz@example.com"
+    assert rate_limiter.get_user_key(anonymous) == "10.0.0.1"
+
+
+@pytest.mark.asyncio
+async def test_user_limit_uses_async_storage(authenticated_client, monkeypatch):
+    def blocking_hit(*args, **kwargs):
+        raise AssertionError("synchroniczny Redis w middleware")
+
+    monkeypatch.setattr(rate_limiter.limiter.limiter, "hit", blocking_hit)
+    calls = []
+    original = rate_limiter.user_limiter.hit
+
+    async def counting_hit(*args, **kwargs):
+        calls.append(args)
+        return await original(*args, **kwargs)
+
+    monkeypatch.setattr(rate_limiter.user_limiter, "hit", counting_hit)
+
+    assert (await authenticated_client.get("/auth/me")).status_code == 200
+    assert len(calls) == 1
@@ -0,0 +1,161 @@
+import pytest
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from foodtracker_app.models import (
+    Category,
+    Pantry,
+    Product,
+    ProductArchive,
+    ProductRollup,
+    ProductTombstone,
+)
+from foodtracker_app.services import archive_tasks
+from foodtracker_app.services.archive_tasks import _archive_async
+
+pytestmark = pytest.mark.asyncio
+
+NOW = datetime.now(timezone.utc)
+LONG_AGO = NOW - timedelta(days=200)
+
+
+def _product(pantry_id: int, **kwargs) -> Product:
+    defaults = dict(
+        name="Produkt",
+        pantry_id=pantry_id,
+        expiration_date=date.today(),
+        price=Decimal("10.00"),
+        unit="szt.",
+        initial_amount=Decimal("1"),
+        current_amount=Decimal("0"),
+        wasted_amount=Decimal("0"),
+        created_at=LONG_AGO,
+        updated_at=LONG_AGO,
+    )
+    defaults.update(kwargs)
+    return Product(**defaults)
+
+
+@pytest.fixture
+async def archivable(db: AsyncSession, authenticated_client: AsyncClient) -> Pantry:
+    pantry = authenticated_client.pantry  # type: ignore
+    dairy = Category(name="Nabiał", icon_name="dairy")
+    db.add(dairy)
+    await db.flush()
+    db.add_all(
+        [
+            # Zużyte dawno - do archiwum.
+            _product(
+                pantry.id,
+                name="Ser żółty",
+                category_id=dairy.id,
+                price=Decimal("8.00"),
+                initial_amount=Decimal("4"),
+                wasted_amount=Decimal("1"),
+            ),
+            _product(
+                pantry.id,
+                name="Mąka",
+                unit="g",
+                price=Decimal("5.00"),
+                initial_amount=Decimal("500"),
+                wasted_amount=Decimal("400"),
+            ),
+            _product(
+                pantry.id,
+                name="Kawa",
+                unit="g",
+                price=Decimal("30.00"),
+                initial_amount=Decimal("250"),
+            ),
+            # Żywe: aktywny oraz zużyty niedawno.
+            _product(
+                pantry.id,
+                name="Ser biały",
+                category_id=dairy.id,
+                initial_amount=Decimal("3"),
+                current_amount=Decimal("2"),
+            ),
+            _product(
+                pantry.id,
+                name="Jogurt",
+                category_id=dairy.id,
+                price=Decimal("3.00"),
+                initial_amount=Decimal("2"),
+                wasted_amount=Decimal("2"),
+                updated_at=NOW - timedelta(days=1),
+            ),
+        ]
+    )
+    await db.commit()
+    return pantry
+
+
+async def _snapshot(client: AsyncClient, pantry_id: int) -> dict:
+    base = f"/pantries/{pantry_id}/products"
+    responses = {
+        "stats": await client.get(f"{base}/stats"),
+        "category_waste": await client.get(
+            f"{base}/stats/category-waste", params={"pantry_id": pantry_id}
+        ),
+        "most_wasted": await client.get(
+            f"{base}/stats/most-wasted-products", params={"pantry_id": pantry_id}
+        ),
+        "achievements": await client.get(f"{base}/achievements"),
+    }
+    for response in responses.values():
+        assert response.status_code == 200, response.text
+    return {name: response.json() for name, response in responses.items()}
+
+
+async def test_statistics_are_unchanged_by_archiving(
+    db: AsyncSession, authenticated_client: AsyncClient, archivable: Pantry
+):
+    before = await _snapshot(authenticated_client, archivable.id)
+
+    result = await _archive_async(db=db, now=NOW)
+
+    assert result == {"archived": 3}
+    after = await _snapshot(authenticated_client, archivable.id)
+    assert after == before
+    assert before["stats"] == {"total": 11, "used": 5, "wasted": 4, "active": 2}
+
+
+async def test_archiving_moves_rows_and_leaves_tombstones(
+    db: AsyncSession, archivable: Pantry, monkeypatch
+):
+    monkeypatch.setattr(archive_tasks.settings, "PRODUCT_ARCHIVE_BATCH_SIZE", 2)
+    revision_of = select(Pantry.revision).where(Pantry.id == archivable.id)
+    revision = await db.scalar(revision_of)
+
+    await _archive_async(db=db, now=NOW)
+
+    live = (await db.execute(select(Product.name))).scalars().all()
+    assert sorted(live) == ["Jogurt", "Ser biały"]
+    archived = {
+        row.name: row
+        for row in (await db.execute(select(ProductArchive))).scalars().all()
+    }
+    assert set(archived) == {"Ser żółty", "Mąka", "Kawa"}
+    assert archived["Ser żółty"].wasted_value == Decimal("2.00")
+    assert archived["Mąka"].wasted_value == Decimal("4.00")
+
+    tombstones = (await db.execute(select(ProductTombstone.product_id))).scalars()
+    assert sorted(tombstones) == sorted(row.id for row in archived.values())
+
+    assert await db.scalar(revision_of) > revision
+    # Dwie partie, ale rollup scalony per (kategoria, jednostka).
+    assert await db.scalar(select(func.count(ProductRollup.id))) == 2
+
+
+async def test_recent_and_active_products_are_not_archived(
+    db: AsyncSession, archivable: Pantry
+):
+    result = await _archive_async(db=db, now=LONG_AGO + timedelta(days=30))
+
+    assert result == {"archived": 0}
+    assert await db.scalar(select(func.count(ProductArchive.id))) == 0
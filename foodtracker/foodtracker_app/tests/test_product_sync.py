@@ -0,0 +1,106 @@
+from datetime import date, timedelta
+
+import pytest
+from httpx import AsyncClient
+
+from foodtracker_app.services import product_service
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture(autouse=True)
+def no_settle_window(monkeypatch):
+    monkeypatch.setattr(product_service, "SYNC_SETTLE_SECONDS", 0)
+
+
+async def _create_product(client: AsyncClient, pantry_id: int, name: str) -> dict:
+    response = await client.post(
+        f"/pantries/{pantry_id}/products/create",
+        json={
+            "name": name,
+            "expiration_date": str(date.today() + timedelta(days=10)),
+            "price": 3.0,
+            "unit": "szt.",
+            "initial_amount": 2,
+        },
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+async def test_changes_return_only_deltas_since_cursor(
+    authenticated_client: AsyncClient,
+):
+    pantry_id = authenticated_client.pantry.id  # type: ignore
+    url = f"/pantries/{pantry_id}/products/changes"
+    kept = await _create_product(authenticated_client, pantry_id, "Ryż")
+    updated = await _create_product(authenticated_client, pantry_id, "Makaron")
+    deleted = await _create_product(authenticated_client, pantry_id, "Kasza")
+
+    full = (await authenticated_client.get(url)).json()
+    assert {p["id"] for p in full["upserted"]} == {
+        kept["id"],
+        updated["id"],
+        deleted["id"],
+    }
+    assert full["deleted_ids"] == []
+
+    await authenticated_client.post(
+        f"/pantries/{pantry_id}/products/use/{updated['id']}", json={"amount": 1}
+    )
+    await authenticated_client.delete(
+        f"/pantries/{pantry_id}/products/delete/{deleted['id']}"
+    )
+
+    delta = await authenticated_client.get(url, params={"cursor": full["cursor"]})
+    data = delta.json()
+
+    assert delta.status_code == 200
+    assert [p["id"] for p in data["upserted"]] == [updated["id"]]
+    assert data["upserted"][0]["current_amount"] == 1
+    assert data["deleted_ids"] == [deleted["id"]]
+    assert data["has_more"] is False
+
+    again = await authenticated_client.get(url, params={"cursor": data["cursor"]})
+    assert again.json()["upserted"] == []
+    assert again.json()["deleted_ids"] == []
+
+
+async def test_changes_are_paginated(authenticated_client: AsyncClient):
+    pantry_id = authenticated_client.pantry.id  # type: ignore
+    url = f"/pantries/{pantry_id}/products/changes"
+    created = [
+        await _create_product(authenticated_client, pantry_id, f"Produkt {i}")
+        for i in range(3)
+    ]
+
+    first = (await authenticated_client.get(url, params={"limit": 2})).json()
+    second = (
+        await authenticated_client.get(
+            url, params={"limit": 2, "cursor": first["cursor"]}
+        )
+    ).json()
+
+    assert first["has_more"] is True
+    assert second["has_more"] is False
+    seen = [p["id"] for p in first["upserted"] + second["upserted"]]
+    assert seen == [p["id"] for p in created]
+
+
+async def test_changes_reject_invalid_cursor(authenticated_client: AsyncClient):
+    pantry_id = authenticated_client.pantry.id  # type: ignore
+    response = await authenticated_client.get(
+        f"/pantries/{pantry_id}/products/changes", params={"cursor": "nie-kursor"}
+    )
+    assert response.status_code == 400
+
+
+async def test_changes_require_membership(authenticated_client_factory):
+    _, pantry = await authenticated_client_factory("sync.a@example.com", "password123")
+    outsider, _ = await authenticated_client_factory(
+        "sync.b@example.com", "password456"
+    )
+
+    response = await outsider.get(f"/pantries/{pantry.id}/products/changes")
+
+    assert response.status_code == 404
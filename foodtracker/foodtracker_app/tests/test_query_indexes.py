@@ -0,0 +1,94 @@
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from foodtracker_app.models import FinancialStat, Pantry, PantryUser, Product, User
+
+pytestmark = pytest.mark.asyncio
+
+TODAY = date(2026, 1, 1)
+
+HOT_QUERIES = {
+    "get_products": (
+        select(Product)
+        .where(Product.pantry_id == 1)
+        .order_by(Product.expiration_date.asc()),
+        {"ix_products_pantry_id_expiration_date"},
+    ),
+    "expiring_soon": (
+        select(Product)
+        .where(
+            Product.pantry_id == 1,
+            Product.expiration_date <= TODAY + timedelta(days=7),
+            Product.expiration_date >= TODAY,
+            Product.current_amount > 0,
+        )
+        .order_by(Product.expiration_date),
+        {
+            "ix_products_active_by_expiration",
+            "ix_products_pantry_id_expiration_date",
+        },
+    ),
+    "active_products_count": (
+        select(func.count(Product.id)).where(
+            Product.pantry_id == 1, Product.current_amount > 0
+        ),
+        {
+            "ix_products_pantry_id_current_amount",
+            "ix_products_active_by_expiration",
+        },
+    ),
+    "calendar_month": (
+        select(Product.expiration_date, func.count(Product.id))
+        .where(
+            Product.pantry_id.in_(
+                select(PantryUser.pantry_id).where(PantryUser.user_id == 1)
+            ),
+            Product.expiration_date >= TODAY,
+            Product.expiration_date < TODAY + timedelta(days=31),
+            Product.current_amount > 0,
+        )
+        .group_by(Product.expiration_date),
+        {
+            "ix_products_active_by_expiration",
+            "ix_products_pantry_id_expiration_date",
+        },
+    ),
+    "user_pantries": (
+        select(Pantry).join(Pantry.member_associations).where(PantryUser.user_id == 1),
+        {"ix_pantry_users_user_id"},
+    ),
+    "owned_pantry_count": (
+        select(func.count(Pantry.id)).where(Pantry.owner_id == 1),
+        {"ix_pantries_owner_id"},
+    ),
+    "financial_stats": (
+        select(FinancialStat).where(FinancialStat.pantry_id == 1),
+        {"sqlite_autoindex_financial_stats_1"},
+    ),
+    "verify_account": (
+        select(User).where(User.verification_token == "token"),
+        {"ix_users_verification_token"},
+    ),
+    "reset_password": (
+        select(User).where(User.reset_password_token == "token"),
+        {"ix_users_reset_password_token"},
+    ),
+}
+
+
+async def _explain(db: AsyncSession, stmt) -> str:
+    sql = stmt.compile(dialect=db.bind.dialect, compile_kwargs={"literal_binds": True})
+    result = await db.execute(text(f"EXPLAIN QUERY PLAN {sql}"))
+    return "\n".join(row[-1] for row in result.all())
+
+
+@pytest.mark.parametrize("query_name", sorted(HOT_QUERIES))
+async def test_hot_queries_use_indexes(db: AsyncSession, query_name: str):
+    stmt, expected_indexes = HOT_QUERIES[query_name]
+
+    plan = await _explain(db, stmt)
+
+    assert any(index in plan for index in expected_indexes), plan
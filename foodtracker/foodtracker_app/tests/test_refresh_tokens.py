@@ -0,0 +1,137 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from foodtracker_app.auth import refresh_tokens as refresh_module
+from foodtracker_app.auth.refresh_tokens import RefreshTokenStore
+from foodtracker_app.auth.utils import (
+    create_access_token,
+    create_refresh_token,
+    decode_token,
+)
+
+
+@pytest.mark.asyncio
+async def test_login_cookie_rotates_on_refresh(authenticated_client_factory):
+    client, _ = await authenticated_client_factory(
+        "rotate@example.com", "password123", login=False
+    )
+    login = await client.post(
+        "/auth/login", json={"email": "rotate@example.com", "password": "password123"}
+    )
+    first = login.cookies["refresh_token"]
+
+    refreshed = await client.post("/auth/refresh", cookies={"refresh_token": first})
+
+    assert refreshed.status_code == 200
+    second = refreshed.cookies["refresh_token"]
+    assert second != first
+    first_claims, second_claims = decode_token(first), decode_token(second)
+    assert second_claims["fam"] == first_claims["fam"]
+    assert second_claims["exp"] == first_claims["exp"]
+    assert decode_token(refreshed.json()["access_token"])["sub"] == (
+        "rotate@example.com"
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_refreshes_share_one_rotation(authenticated_client_factory):
+    client, _ = await authenticated_client_factory(
+        "parallel@example.com", "password123", login=False
+    )
+    login = await client.post(
+        "/auth/login",
+        json={"email": "parallel@example.com", "password": "password123"},
+    )
+    first = login.cookies["refresh_token"]
+
+    responses = await asyncio.gather(
+        *(
+            client.post("/auth/refresh", cookies={"refresh_token": first})
+            for _ in range(3)
+        )
+    )
+
+    assert [r.status_code for r in responses] == [200, 200, 200]
+    jtis = {decode_token(r.cookies["refresh_token"])["jti"] for r in responses}
+    assert len(jtis) == 1
+    # Rodzina nie została unieważniona - wymieniony token działa dalej.
+    again = await client.post(
+        "/auth/refresh",
+        cookies={"refresh_token": responses[0].cookies["refresh_token"]},
+    )
+    assert again.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_reused_token_revokes_whole_family(monkeypatch):
+    store = RefreshTokenStore(None)
+    first = await store.issue("reuse@example.com", "password")
+    second, _ = await store.rotate(first)
+    later = time.time() + refresh_module.settings.REFRESH_TOKEN_REUSE_GRACE_SECONDS + 1
+    monkeypatch.setattr(refresh_module.time, "time", lambda: later)
+
+    with pytest.raises(HTTPException) as reused:
+        await store.rotate(first)
+    assert reused.value.status_code == 401
+
+    with pytest.raises(HTTPException):
+        await store.rotate(second)
+
+
+@pytest.mark.asyncio
+async def test_revoked_family_is_rejected():
+    store = RefreshTokenStore(None)
+    token = await store.issue("revoke@example.com")
+
+    await store.revoke(token)
+
+    with pytest.raises(HTTPException) as exc:
+        await store.rotate(token)
+    assert exc.value.detail == "Refresh token unieważniony"
+
+
+@pytest.mark.asyncio
+async def test_token_without_family_is_rejected():
+    store = RefreshTokenStore(None)
+    legacy = create_refresh_token({"sub": "legacy@example.com"})
+
+    with pytest.raises(HTTPException) as exc:
+        await store.rotate(legacy)
+    assert exc.value.detail == "Refresh token niepoprawny"
+
+
+@pytest.mark.asyncio
+async def test_refresh_token_is_not_a_bearer_token(authenticated_client_factory):
+    client, _ = await authenticated_client_factory(
+        "bearer@example.com", "password123", login=False
+    )
+    login = await client.post(
+        "/auth/login", json={"email": "bearer@example.com", "password": "password123"}
+    )
+    refresh_token = login.cookies["refresh_token"]
+
+    response = await client.get(
+        "/auth/me", headers={"Authorization": f"Bearer {refresh_token}"}
+    )
+
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_access_token_cannot_be_rotated_or_revoke_a_family():
+    store = RefreshTokenStore(None)
+    refresh_token = await store.issue("typ@example.com")
+    access_token = create_access_token(
+        {"sub": "typ@example.com", "fam": decode_token(refresh_token)["fam"]}
+    )
+
+    with pytest.raises(HTTPException) as exc:
+        await store.rotate(access_token)
+    assert exc.value.detail == "Refresh token niepoprawny"
+
+    await store.revoke(access_token)
+    new_token, _ = await store.rotate(refresh_token)
+    assert decode_token(new_token)["typ"] == "refresh"
@@ -0,0 +1,125 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import HTTPException
+from httpx import AsyncClient
+from starlette.requests import Request
+
+from foodtracker_app.core import security
+from foodtracker_app.core.sliding_window import (
+    MemorySlidingWindow,
+    SlidingWindowLimiter,
+)
+
+
+def _request(ip: str) -> Request:
+    return Request({"type": "http", "headers": [], "client": (ip, 1234)})
+
+
+@pytest.fixture
+def registration_limiter(monkeypatch):
+    limiter = SlidingWindowLimiter(
+        None,
+        prefix="test:registration:",
+        limit=security.settings.REGISTRATIONS_PER_IP_PER_DAY,
+        window=security.REGISTRATION_WINDOW_SECONDS,
+    )
+    monkeypatch.setattr(security, "registration_limiter", limiter)
+    monkeypatch.setattr(security.settings, "ALLOWED_IPS", [])
+    return limiter
+
+
+@pytest.mark.asyncio
+async def test_only_counted_registrations_use_the_limit(registration_limiter):
+    limit = security.settings.REGISTRATIONS_PER_IP_PER_DAY
+    for _ in range(limit + 3):
+        await security.limit_registration(_request("10.0.0.1"))
+    for _ in range(limit):
+        await security.count_registration(_request("10.0.0.1"))
+
+    with pytest.raises(HTTPException) as exc:
+        await security.limit_registration(_request("10.0.0.1"))
+
+    assert exc.value.status_code == 429
+    assert int(exc.value.headers["Retry-After"]) > 0
+    await security.limit_registration(_request("10.0.0.2"))
+
+
+@pytest.mark.asyncio
+async def test_allowed_ips_bypass_limit(registration_limiter, monkeypatch):
+    monkeypatch.setattr(security.settings, "ALLOWED_IPS", ["10.0.0.9"])
+
+    for _ in range(security.settings.REGISTRATIONS_PER_IP_PER_DAY + 3):
+        await security.count_registration(_request("10.0.0.9"))
+        await security.limit_registration(_request("10.0.0.9"))
+
+    assert len(registration_limiter.memory) == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_registrations_do_not_use_the_limit(
+    client: AsyncClient, registration_limiter, monkeypatch
+):
+    monkeypatch.setattr(registration_limiter, "limit", 1)
+    failed = [
+        (await client.post("/auth/register", json={})).status_code for _ in range(3)
+    ]
+
+    with patch(
+        "foodtracker_app.auth.routes.verify_recaptcha",
+        new_callable=AsyncMock,
+        return_value=True,
+    ):
+        payload = {"password": "password123", "recaptcha_token": "ok"}
+        created = await client.post(
+            "/auth/register", json={"email": "first@example.com", **payload}
+        )
+        blocked = await client.post(
+            "/auth/register", json={"email": "second@example.com", **payload}
+        )
+
+    assert failed == [400, 400, 400]
+    assert created.status_code == 201
+    assert blocked.status_code == 429
+
+
+def test_memory_window_slides():
+    window = MemorySlidingWindow()
+
+    assert window.hit("ip", limit=2, window=10, now=0)[0]
+    assert window.hit("ip", limit=2, window=10, now=5)[0]
+    allowed, retry_after = window.hit("ip", limit=2, window=10, now=6)
+    assert not allowed
+    assert retry_after == 4
+
+    assert window.hit("ip", limit=2, window=10, now=10.5)[0]
+
+
+def test_memory_window_evicts_stale_and_stays_bounded():
+    window = MemorySlidingWindow(max_keys=3)
+
+    for i in range(5):
+        window.hit(f"ip-{i}", limit=2, window=10, now=i)
+    assert len(window) == 3
+
+    window.hit("fresh", limit=2, window=10, now=100)
+    assert len(window) == 1
+
+
+def test_memory_window_counts_without_limit():
+    window = MemorySlidingWindow()
+
+    assert [window.record("ip", window=10, now=t) for t in (0, 1, 2)] == [1, 2, 3]
+    assert window.record("ip", window=10, now=11.5) == 2
+
+    window.reset("ip")
+    assert len(window) == 0
+
+
+def test_memory_peek_does_not_record():
+    window = MemorySlidingWindow()
+
+    assert window.peek("ip", limit=1, window=10, now=0) == (True, 0.0)
+    assert len(window) == 0
+    window.record("ip", window=10, now=1)
+    assert window.peek("ip", limit=1, window=10, now=2) == (False, 9)
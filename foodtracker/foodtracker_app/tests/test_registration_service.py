@@ -0,0 +1,70 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from foodtracker_app.auth.social import get_or_create_user
+from foodtracker_app.models import (
+    EmailOutbox,
+    FinancialStat,
+    Pantry,
+    PantryUser,
+    User,
+)
+from foodtracker_app.services import registration_service
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _account(db: AsyncSession, email: str):
+    user = (await db.execute(select(User).where(User.email == email))).scalar_one()
+    pantry = (
+        await db.execute(select(Pantry).where(Pantry.owner_id == user.id))
+    ).scalar_one()
+    membership = (
+        await db.execute(select(PantryUser).where(PantryUser.user_id == user.id))
+    ).scalar_one()
+    stat = (
+        await db.execute(
+            select(FinancialStat).where(FinancialStat.pantry_id == pantry.id)
+        )
+    ).scalar_one()
+    return user, pantry, membership, stat
+
+
+async def test_register_user_writes_everything_in_one_commit(db: AsyncSession, mocker):
+    commit = mocker.spy(db, "commit")
+
+    await registration_service.register_user(db, "fresh@example.com", "hash")
+
+    commit.assert_awaited_once()
+    db.expire_all()
+    user, pantry, membership, stat = await _account(db, "fresh@example.com")
+    assert pantry.name == registration_service.DEFAULT_PANTRY_NAME
+    assert (membership.pantry_id, membership.role) == (pantry.id, "owner")
+    assert stat.saved_value == 0
+    assert user.verification_token and user.token_expires_at
+    outbox = (await db.execute(select(EmailOutbox.to_email))).scalars().all()
+    assert outbox == ["fresh@example.com"]
+
+
+async def test_register_user_duplicate_email_leaves_nothing_behind(db: AsyncSession):
+    db.add(User(email="taken@example.com", hashed_password="x"))
+    await db.commit()
+
+    with pytest.raises(HTTPException) as exc:
+        await registration_service.register_user(db, "taken@example.com", "hash")
+
+    assert exc.value.status_code == 400
+    assert await db.scalar(select(func.count(Pantry.id))) == 0
+    assert await db.scalar(select(func.count(EmailOutbox.id))) == 0
+
+
+async def test_social_first_login_uses_registration_path(db: AsyncSession):
+    user = await get_or_create_user(db, "social_new@example.com", "github")
+
+    assert user.is_verified
+    db.expire_all()
+    _, pantry, membership, _ = await _account(db, "social_new@example.com")
+    assert membership.role == "owner"
+    assert pantry.owner_id == user.id
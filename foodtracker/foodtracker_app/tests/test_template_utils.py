@@ -0,0 +1,49 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from foodtracker_app.utils import template_utils
+
+
+def test_environment_writes_shared_bytecode_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(template_utils.settings, "TEMPLATE_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(template_utils.settings, "IS_PRODUCTION", True)
+    monkeypatch.setattr(template_utils, "env", template_utils.build_environment())
+
+    compiled = template_utils.precompile_templates()
+
+    expected = template_utils.env.list_templates(extensions=["html"])
+    assert compiled == len(expected) > 0
+    assert not template_utils.env.auto_reload
+    assert len(list(tmp_path.iterdir())) == compiled
+
+
+@pytest.mark.asyncio
+async def test_render_batch_renders_each_recipient_with_common_context():
+    now = datetime(2030, 1, 1, tzinfo=timezone.utc)
+    contexts = [
+        {"email": f"user{i}@example.com", "products": [{"name": f"Produkt {i}"}]}
+        for i in range(3)
+    ]
+
+    rendered = await template_utils.render_batch(
+        "email_expiration_notification.html", contexts, now=now
+    )
+
+    assert len(rendered) == 3
+    for i, html in enumerate(rendered):
+        assert f"user{i}@example.com" in html
+        assert f"Produkt {i}" in html
+        assert "2030" in html
+
+
+@pytest.mark.asyncio
+async def test_render_batch_escapes_and_handles_empty_batch():
+    assert await template_utils.render_batch("email_reminder.html", []) == []
+
+    [html] = await template_utils.render_batch(
+        "email_expiration_notification.html",
+        [{"email": "<script>@example.com", "products": []}],
+        now=datetime.now(timezone.utc),
+    )
+    assert "<script>" not in html
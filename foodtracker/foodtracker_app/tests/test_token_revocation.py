@@ -0,0 +1,102 @@
+import time
+from datetime import timedelta
+
+import pytest
+from httpx import AsyncClient
+
+from foodtracker_app.auth import utils
+from foodtracker_app.auth.refresh_tokens import refresh_tokens
+from foodtracker_app.auth.revocation import TokenDenylist
+from foodtracker_app.auth.utils import create_access_token
+
+
+@pytest.mark.asyncio
+async def test_logout_revokes_access_and_refresh_tokens(authenticated_client_factory):
+    client, _ = await authenticated_client_factory("logout@example.com", "password123")
+    refresh = await refresh_tokens.issue("logout@example.com")
+    assert (await client.get("/auth/me")).status_code == 200
+
+    logout = await client.post("/auth/logout", cookies={"refresh_token": refresh})
+    assert logout.status_code == 200
+
+    me = await client.get("/auth/me")
+    assert me.status_code == 401
+    assert me.json()["detail"] == "Token has been revoked"
+
+    refreshed = await client.post("/auth/refresh", cookies={"refresh_token": refresh})
+    assert refreshed.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_logout_does_not_revoke_other_sessions(
+    authenticated_client_factory, client: AsyncClient
+):
+    session, _ = await authenticated_client_factory("two@example.com", "password123")
+    other_token = create_access_token({"sub": "two@example.com"})
+
+    await session.post("/auth/logout")
+
+    other = await client.get(
+        "/auth/me", headers={"Authorization": f"Bearer {other_token}"}
+    )
+    assert other.status_code == 200
+
+
+def test_decode_token_verifies_each_token_once(monkeypatch):
+    calls = []
+    original = utils.jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(args[0])
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(utils.jwt, "decode", counting_decode)
+    token = create_access_token({"sub": "cache@example.com"})
+
+    first = utils.decode_token(token)
+    first["sub"] = "zmienione"
+    second = utils.decode_token(token)
+
+    assert second["sub"] == "cache@example.com"
+    assert len(calls) == 1
+
+
+def test_cached_claims_expire_with_token(monkeypatch):
+    token = create_access_token(
+        {"sub": "krotki@example.com"}, expires_delta=timedelta(seconds=30)
+    )
+    utils.decode_token(token)
+    calls = []
+    original = utils.jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(args[0])
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(utils.jwt, "decode", counting_decode)
+    later = time.time() + 60
+    monkeypatch.setattr(utils.time, "time", lambda: later)
+
+    utils.decode_token(token)
+
+    assert calls == [token]
+
+
+def test_claims_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(utils.settings, "JWT_CLAIMS_CACHE_SIZE", 3)
+    for i in range(10):
+        utils.decode_token(create_access_token({"sub": f"user{i}@example.com"}))
+
+    assert len(utils._claims_cache) == 3
+
+
+@pytest.mark.asyncio
+async def test_denylist_ignores_expired_tokens():
+    denylist = TokenDenylist(None)
+
+    await denylist.revoke({"jti": "stary", "exp": time.time() - 1})
+    await denylist.revoke({"jti": "aktualny", "exp": time.time() + 60})
+
+    assert not await denylist.is_revoked("stary")
+    assert await denylist.is_revoked("aktualny")
+    assert not await denylist.is_revoked(None)
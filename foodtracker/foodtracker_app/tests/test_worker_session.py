@@ -0,0 +1,17 @@
+from foodtracker_app.notifications import tasks
+
+
+def test_worker_tasks_share_one_engine(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        tasks.settings, "DATABASE_URL", f"sqlite+aiosqlite:///{tmp_path}/worker.db"
+    )
+
+    async def engine_in_use():
+        async with tasks.get_db_session() as session:
+            return session.bind
+
+    first = tasks.run_async(engine_in_use())
+    second = tasks.run_async(engine_in_use())
+
+    assert first is second
+    tasks.run_async(first.dispose())
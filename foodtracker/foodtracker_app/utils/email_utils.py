@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from email.message import EmailMessage
 
 from aiosmtplib import SMTP
@@ -11,28 +12,50 @@ MAIL_FROM = settings.MAIL_FROM
 MAIL_FROM_NAME = settings.MAIL_FROM_NAME
 
 
-async def send_email_async(to_email: str, subject: str, body: str, html: str = None):
-    if settings.DEMO_MODE:
-        print(f"[DEMO_MODE] NIE wysyłam maila do {to_email} (tytuł: {subject})")
-        return
+def build_message(
+    to_email: str, subject: str, body: str, html: str | None = None
+) -> EmailMessage:
     message = EmailMessage()
     message["From"] = f"{MAIL_FROM_NAME} <{MAIL_FROM}>"
     message["To"] = to_email
     message["Subject"] = subject
     message.set_content(body)
+    if html:
+        message.add_alternative(html, subtype="html")
+    return message
+
+
+@asynccontextmanager
+async def smtp_connection():
+    """
+    Jedno połączenie SMTP (TLS + logowanie) na wiele wiadomości - handshake
+    kosztuje więcej niż samo wysłanie maila.
+    """
+    smtp = SMTP(hostname=SMTP_HOST, port=SMTP_PORT, start_tls=True)
+    await smtp.connect()
+    try:
+        await smtp.login(SMTP_USER, SMTP_PASSWORD)
+        yield smtp
+    finally:
+        try:
+            await smtp.quit()
+        except Exception:
+            smtp.close()
+
+
+async def send_email_async(to_email: str, subject: str, body: str, html: str = None):
+    if settings.DEMO_MODE:
+        print(f"[DEMO_MODE] NIE wysyłam maila do {to_email} (tytuł: {subject})")
+        return
+    message = build_message(to_email, subject, body, html)
 
     print(f"📨 Wysyłam maila do {to_email}")
     print(f"Temat: {subject}")
     print(f"TREŚĆ (plain):\n{body}")
     print(f"TREŚĆ (html):\n{html}")
-    if html:
-        message.add_alternative(html, subtype="html")
 
-    smtp = SMTP(hostname=SMTP_HOST, port=SMTP_PORT, start_tls=True)
     try:
-        await smtp.connect()
-        await smtp.login(SMTP_USER, SMTP_PASSWORD)
-        await smtp.send_message(message)
-        await smtp.quit()
+        async with smtp_connection() as smtp:
+            await smtp.send_message(message)
     except Exception as e:
         print(f"❌ Błąd SMTP: {e}")
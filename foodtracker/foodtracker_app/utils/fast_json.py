@@ -0,0 +1,50 @@
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any
+
+import orjson
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class FastJSONResponse(JSONResponse):
+    """Odpowiedź JSON serializowana przez orjson (daty, UUID itp. natywnie)."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+@lru_cache(maxsize=None)
+def _adapter(schema: Any) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+def fast_response(
+    schema: Any, data: Any, sub_response: Response | None = None
+) -> Response:
+    """
+    Jednorazowa walidacja `data` (obiekty ORM albo gotowe modele) względem
+    `schema` i serializacja prosto do JSON przez pydantic-core. Endpoint
+    zwracający wprost Response pomija walidację `response_model` - zostaje
+    on tylko do dokumentacji. Gotowe instancje modeli nie są walidowane
+    ponownie. Format (daty, Decimal) jest ten sam co w trybie JSON Pydantica,
+    którego używa ścieżka `response_model`.
+
+    FastAPI nie przenosi nagłówków ustawionych przez zależności (np. ETag)
+    na zwracany wprost Response - stąd opcjonalny `sub_response`.
+    """
+    adapter = _adapter(schema)
+    validated = adapter.validate_python(data, from_attributes=True)
+    response = Response(adapter.dump_json(validated), media_type="application/json")
+    if sub_response is not None:
+        response.headers.update(sub_response.headers)
+    return response
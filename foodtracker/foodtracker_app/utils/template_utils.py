@@ -1,17 +1,63 @@
 import os
+import tempfile
 
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 from starlette.concurrency import run_in_threadpool
 
+from foodtracker_app.settings import settings
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
 
 if not os.path.exists(TEMPLATES_DIR):
     raise FileNotFoundError(f"Katalog szablonów nie istnieje: {TEMPLATES_DIR}")
 
-env = Environment(loader=FileSystemLoader(TEMPLATES_DIR), autoescape=True)
+
+def build_environment() -> Environment:
+    """
+    Skompilowane szablony trzymane są w pamięci procesu, a ich bytecode na
+    dysku (TEMPLATE_CACHE_DIR) - wspólnie dla API i workerów Celery, więc
+    kolejne procesy nie parsują szablonów od zera. Poza produkcją szablony
+    są przeładowywane po zmianie pliku.
+    """
+    cache_dir = settings.TEMPLATE_CACHE_DIR or os.path.join(
+        tempfile.gettempdir(), "foodtracker-jinja"
+    )
+    os.makedirs(cache_dir, exist_ok=True)
+    return Environment(
+        loader=FileSystemLoader(TEMPLATES_DIR),
+        autoescape=True,
+        auto_reload=not settings.IS_PRODUCTION,
+        bytecode_cache=FileSystemBytecodeCache(cache_dir),
+    )
+
+
+env = build_environment()
+
+
+def precompile_templates() -> int:
+    """Kompiluje wszystkie szablony z góry (start API / workera)."""
+    names = env.list_templates(extensions=["html"])
+    for name in names:
+        env.get_template(name)
+    return len(names)
 
 
 async def render_template(template_name: str, **context) -> str:
     template = env.get_template(template_name)
     return await run_in_threadpool(template.render, **context)
+
+
+def _render_all(template_name: str, contexts: list[dict], common: dict) -> list[str]:
+    template = env.get_template(template_name)
+    return [template.render({**common, **context}) for context in contexts]
+
+
+async def render_batch(template_name: str, contexts: list[dict], **common) -> list[str]:
+    """
+    Renderuje szablon dla wielu odbiorców w jednym przejściu do puli wątków.
+    `common` to wartości wspólne dla wszystkich (np. `now`).
+    """
+    if not contexts:
+        return []
+    return await run_in_threadpool(_render_all, template_name, contexts, common)
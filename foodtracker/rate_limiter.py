@@ -1,36 +1,62 @@
+import math
+import time
+
 from fastapi import Request
+from fastapi.responses import JSONResponse
+from foodtracker_app.auth.principal import resolve_principal
+from foodtracker_app.core.security import get_client_ip
 from foodtracker_app.settings import settings
+from limits import parse
+from limits.storage import storage_from_string
+from limits.aio.strategies import FixedWindowRateLimiter
 from slowapi import Limiter
-from slowapi.util import get_remote_address
 
 redis_url = "memory://"
 if not settings.SKIP_REDIS:
     redis_url = settings.REDIS_URL
 
 limiter = Limiter(
-    key_func=get_remote_address,
+    key_func=get_client_ip,
     storage_uri=redis_url,
 )
 
+user_rate_limit = parse(settings.RATE_LIMIT_PER_USER)
+# Wspólny limit użytkownika sprawdzany w middleware - asynchroniczny klient
+# Redisa, żeby nie blokować pętli zdarzeń (slowapi ma tylko synchroniczny).
+user_limiter = FixedWindowRateLimiter(
+    storage_from_string("async+memory://")
+    if settings.SKIP_REDIS
+    else storage_from_string(
+        settings.REDIS_URL.replace("redis", "async+redis", 1),
+        implementation="redispy",
+    )
+)
+
 
 def get_user_key(request: Request) -> str:
     """Per-user rate limiting key — używa emaila z JWT, fallback na IP."""
-    try:
-        auth = request.headers.get("Authorization", "")
-        if auth.startswith("Bearer "):
-            from jose import jwt as jose_jwt
-
-            token = auth[7:]
-            payload = jose_jwt.decode(
-                token,
-                settings.SECRET_KEY,
-                algorithms=[settings.jwt_algorithm],
-                audience="foodtracker-user",
-                issuer="foodtracker-api",
+    principal = getattr(request.state, "principal", None)
+    if principal:
+        return f"user:{principal.email}"
+    return get_client_ip(request)
+
+
+async def principal_middleware(request: Request, call_next):
+    """
+    Dekoduje token raz (request.state.principal) i pilnuje wspólnego limitu
+    zapytań zalogowanego użytkownika na wszystkich endpointach - zanim
+    żądanie dotknie bazy danych.
+    """
+    principal = await resolve_principal(request)
+    if principal and limiter.enabled:
+        key = get_user_key(request)
+        if not await user_limiter.hit(user_rate_limit, "global", key):
+            reset_at, _ = await user_limiter.get_window_stats(
+                user_rate_limit, "global", key
+            )
+            return JSONResponse(
+                {"error": f"Rate limit exceeded: {user_rate_limit}"},
+                status_code=429,
+                headers={"Retry-After": str(max(1, math.ceil(reset_at - time.time())))},
             )
-            email = payload.get("sub")
-            if email:
-                return f"user:{email}"
-    except Exception:
-        pass
-    return get_remote_address(request)
+    return await call_next(request)
@@ -21,6 +21,19 @@ import {
   CalendarDays,
 } from 'lucide-react';
 
+const AVATAR_POLL_INTERVAL_MS = 1500;
+const AVATAR_POLL_ATTEMPTS = 20;
+
+// Awatar przetwarza worker - czekamy, aż profil zwróci URL nowej wersji.
+const waitForAvatar = async (avatarUrl: string): Promise<boolean> => {
+  for (let attempt = 0; attempt < AVATAR_POLL_ATTEMPTS; attempt++) {
+    await new Promise((resolve) => setTimeout(resolve, AVATAR_POLL_INTERVAL_MS));
+    const res = await apiClient.get<{ avatar_url: string | null }>('/auth/me');
+    if (res.data.avatar_url === avatarUrl) return true;
+  }
+  return false;
+};
+
 const fadeUp = {
   initial: { opacity: 0, y: 16 },
   animate: { opacity: 1, y: 0 },
@@ -103,12 +116,16 @@ const UserProfilePage = () => {
     const data = new FormData();
     data.append('file', file);
     try {
-      const res = await apiClient.post<{ avatar_url: string }>(
+      const res = await apiClient.post<{ avatar_url: string; status: string }>(
         '/auth/me/avatar',
         data,
         { headers: { 'Content-Type': 'multipart/form-data' } }
       );
       const newAvatarUrl = res.data.avatar_url;
+      if (res.data.status === 'processing' && !(await waitForAvatar(newAvatarUrl))) {
+        toast.error(t('profilePage.avatarUploadFailed'));
+        return;
+      }
       setAvatar(newAvatarUrl);
       updateAvatar(newAvatarUrl);
       toast.success(t('profilePage.avatarUpdated'));
@@ -16,6 +16,26 @@ apiClient.interceptors.request.use(config => {
   return config;
 });
 
+// Jedno odświeżenie naraz: równoległe 401 czekają na ten sam request,
+// zamiast wysyłać kilka /auth/refresh z tym samym ciasteczkiem.
+let refreshPromise: Promise<string> | null = null;
+
+const refreshAccessToken = (): Promise<string> => {
+  if (!refreshPromise) {
+    refreshPromise = axios
+      .post<{ access_token: string }>(
+        `${API_BASE_URL}/auth/refresh`,
+        {},
+        { withCredentials: true }
+      )
+      .then(response => response.data.access_token)
+      .finally(() => {
+        refreshPromise = null;
+      });
+  }
+  return refreshPromise;
+};
+
 // Obsługa refresh tokenów
 apiClient.interceptors.response.use(
   response => response,
@@ -32,13 +52,7 @@ apiClient.interceptors.response.use(
       originalRequest._retry = true;
 
       try {
-        const refreshResponse = await axios.post<{ access_token: string }>(
-          `${API_BASE_URL}/auth/refresh`,
-          {},
-          { withCredentials: true }
-        );
-
-        const newAccessToken = refreshResponse.data.access_token;
+        const newAccessToken = await refreshAccessToken();
         localStorage.setItem('token', newAccessToken);
         apiClient.defaults.headers.common['Authorization'] = `Bearer ${newAccessToken}`;
         originalRequest.headers['Authorization'] = `Bearer ${newAccessToken}`;